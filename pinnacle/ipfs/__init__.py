@@ -2,17 +2,31 @@ from pinnacle.ipfs.api import AsyncLocalPin
 from pinnacle.ipfs.api import AsyncNFTStorage
 from pinnacle.ipfs.api import AsyncPinAPI
 from pinnacle.ipfs.api import AsyncPinata
+from pinnacle.ipfs.api import AsyncPinningServiceAPI
 from pinnacle.ipfs.api import AsyncWeb3Storage
 from pinnacle.ipfs.api import LocalPin
 from pinnacle.ipfs.api import NFTStorage
 from pinnacle.ipfs.api import PinAPI
 from pinnacle.ipfs.api import Pinata
+from pinnacle.ipfs.api import PinningServiceAPI
 from pinnacle.ipfs.api import Web3Storage
 from pinnacle.ipfs.config import AuthKeyNotFoundError
 from pinnacle.ipfs.config import BearerAuth
 from pinnacle.ipfs.config import Config
 from pinnacle.ipfs.config import ENVNotFoundError
 from pinnacle.ipfs.content.content import Content
+from pinnacle.ipfs.failover import AsyncFailoverPinAPI
+from pinnacle.ipfs.failover import FailoverPinAPI
+from pinnacle.ipfs.ledger import PinLedger
+from pinnacle.ipfs.metrics import METRICS
+from pinnacle.ipfs.metrics import Metrics
+from pinnacle.ipfs.profiling import Profiler
+from pinnacle.ipfs.progress import ProgressTracker
+from pinnacle.ipfs.reconciler import AsyncReconciler
+from pinnacle.ipfs.reconciler import Reconciler
+from pinnacle.ipfs.replicator import Replicator
+from pinnacle.ipfs.tracker import AsyncStatusTracker
+from pinnacle.ipfs.tracker import StatusTracker
 
 __all__ = [
     "BearerAuth",
@@ -20,14 +34,28 @@ __all__ = [
     "Config",
     "ENVNotFoundError",
     "Content",
+    "PinLedger",
+    "METRICS",
+    "Metrics",
+    "Profiler",
+    "ProgressTracker",
+    "Reconciler",
+    "AsyncReconciler",
+    "Replicator",
+    "StatusTracker",
+    "AsyncStatusTracker",
+    "FailoverPinAPI",
+    "AsyncFailoverPinAPI",
     "AsyncLocalPin",
     "AsyncNFTStorage",
     "AsyncPinAPI",
     "AsyncPinata",
+    "AsyncPinningServiceAPI",
     "AsyncWeb3Storage",
     "LocalPin",
     "NFTStorage",
     "PinAPI",
     "Pinata",
+    "PinningServiceAPI",
     "Web3Storage",
 ]
@@ -7,6 +7,8 @@ from .pin_api import PinAPI
 from .pin_api import PinMixin
 from .pinata import AsyncPinata
 from .pinata import Pinata
+from .pinning_service import AsyncPinningServiceAPI
+from .pinning_service import PinningServiceAPI
 from .web3_storage import AsyncWeb3Storage
 from .web3_storage import Web3Storage
 
@@ -17,6 +19,8 @@ __all__ = (
     "AsyncLocalPin",
     "Pinata",
     "AsyncPinata",
+    "PinningServiceAPI",
+    "AsyncPinningServiceAPI",
     "PinMixin",
     "AsyncNFTStorage",
     "NFTStorage",
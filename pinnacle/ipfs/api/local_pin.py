@@ -1,10 +1,31 @@
+import json
+import threading
+from collections import deque
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import Any
+from typing import cast
+from typing import Literal
+
 import httpx
-import psutil
 from pydantic import BaseModel
 from pydantic import Field
 
 from ..config import Config
+from ..content import AsyncContent
+from ..content import AsyncDirectoryContent
 from ..content import Content
+from ..content import DirectoryContent
+from ..content.content import BaseContent
+from ..content.directory import BaseDirectoryContent
+from ..content.stream import AsyncMultipartStream
+from ..content.stream import MultipartStream
+from ..daemon import DaemonProbe
+from ..daemon import probe
+from ..models import CollectionPin
 from ..models import Pin
 from ..models import PinMeta
 from .pin_api import AsyncPinAPI
@@ -16,6 +37,22 @@ class NoIPFSDaemonError(Exception):
     ...
 
 
+class IPFSStreamError(Exception):
+    """Error reported by the daemon in the middle of a streamed response"""
+
+
+# CIDs unpinned per pin/rm request, all passed as arguments of its URL
+PIN_RM_BATCH = 500
+# error of pin/rm for a CID without a direct pin
+NOT_PINNED = "not pinned or pinned indirectly"
+
+# the daemon may take long to answer while it fetches the contents of a pin,
+# or marks the blocks to keep before a garbage collection
+UNBOUNDED_READ = httpx.Timeout(5.0, read=None)
+
+PinType = Literal["all", "direct", "indirect", "recursive"]
+
+
 class LocalPinAdd(BaseModel):
     Name: str
     Hash: str
@@ -27,26 +64,171 @@ class LocalPinAdd(BaseModel):
         return self.Hash
 
 
-class LocalPinMixin(PinMixin):
-    global_config = Config(authless=True)
+class LocalPinProgress(BaseModel):
+    """Bytes of a file read by the daemon so far, sent with progress=true"""
 
-    @staticmethod
-    def ipfs_daemon_active() -> bool:
-        """Check if ipfs daemon is running"""
-        return "ipfs" in {p.name() for p in psutil.process_iter()}
+    Name: str
+    Bytes: int
+
+
+class LocalPinLs(BaseModel):
+    """A pin listed by pin/ls, with its name if listed with names"""
+
+    Cid: str
+    Type: str
+    Name: str | None = None
+
+    @property
+    def cid(self):
+        return self.Cid
+
+
+# contents of a multi-file add, by the name kubo reports them under
+PendingContents = dict[str, deque[BaseContent]]
+
+
+class _RepoConfig:
+    """
+    Config of the daemon of the IPFS repository, read from its `api` file on
+    first use rather than when the module is imported
+    """
+
+    def __init__(self) -> None:
+        self._config: Config | None = None
+        self._lock = threading.Lock()
 
-    def _add(self, content: Content, raw_response: httpx.Response, *args, **kwds):
-        response = super()._add(content, raw_response, LocalPinAdd)
+    def __get__(self, instance: object, owner: type) -> Config:
+        with self._lock:
+            if self._config is None:
+                self._config = Config.from_ipfs_repo(authless=True, shared=True)
+            return self._config
 
+
+class LocalPinMixin(PinMixin):
+    global_config = _RepoConfig()
+    config: Config
+
+    @property
+    def daemon(self) -> DaemonProbe:
+        return probe(self.config.url, self.config.uds)
+
+    @staticmethod
+    def _pin(added: LocalPinAdd, name: str | None = None) -> Pin:
         return Pin(
-            cid=response.cid,
-            name=response.Name,
-            meta=PinMeta.from_model(response, exclude={"Name", "Hash"}),
+            cid=added.cid,
+            name=added.Name if name is None else name,
+            meta=PinMeta.from_model(added, exclude={"Name", "Hash"}),
         )
 
+    def _add(self, content: BaseContent, raw_response: httpx.Response, *args, **kwds):
+        return self._pin(super()._add(content, raw_response, LocalPinAdd))
+
+    def _add_directory(
+        self, directory: BaseDirectoryContent, raw_response: httpx.Response
+    ) -> CollectionPin:
+        raw_response.raise_for_status()
+        # kubo streams one JSON object per added entry, the wrapping root last
+        added = [
+            LocalPinAdd.parse_raw(line) for line in raw_response.iter_lines() if line
+        ]
+        root = added[-1]
+        directory.set_pinned_status(root.cid)
+
+        pin = self._pin(root, directory.basename)
+        files = set(directory.files)
+
+        return self._collection(pin, {a.Name: a.cid for a in added if a.Name in files})
+
+    @staticmethod
+    def _pending(contents: Iterable[BaseContent]) -> PendingContents:
+        pending: PendingContents = {}
+        for content in contents:
+            pending.setdefault(content.basename, deque()).append(content)
+        return pending
+
+    def _added(
+        self, line: str, pending: PendingContents
+    ) -> tuple[BaseContent | None, Pin] | LocalPinProgress:
+        """Parse a line of a multi-file add: a file added, or a progress event"""
+        event = json.loads(line)
+        if "Hash" not in event:
+            return LocalPinProgress.parse_obj(event)
+
+        added = LocalPinAdd.parse_obj(event)
+        # kubo adds files in the order of the body, homonyms included
+        content = None
+        if queue := pending.get(added.Name):
+            content = queue.popleft()
+        return content, self._pin(added)
+
+    @staticmethod
+    def _event(line: str) -> dict[str, Any]:
+        """Parse a line of a streamed response, raising the errors it reports"""
+        event: dict[str, Any] = json.loads(line)
+        if event.get("Type") == "error":
+            raise IPFSStreamError(event.get("Message"))
+        if event.get("Error"):
+            raise IPFSStreamError(event["Error"])
+        return event
+
+    @staticmethod
+    def _listed(line: str) -> LocalPinLs:
+        # the daemon's own output is trusted, validating millions of pins
+        # would dominate the listing
+        return LocalPinLs.construct(**LocalPinMixin._event(line))
+
+    @staticmethod
+    def _pin_ls_params(type: PinType, names: bool):
+        return {"stream": "true", "type": type, "names": str(names).lower()}
+
+    @staticmethod
+    def _pin_params(cids: list[str], recursive: bool):
+        return {"arg": cids, "recursive": str(recursive).lower()}
+
+    @staticmethod
+    def _batches(cids: Iterable[str], size: int) -> Iterator[list[str]]:
+        batch: list[str] = []
+        for cid in cids:
+            batch.append(cid)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _not_pinned(error: httpx.HTTPStatusError) -> bool:
+        return NOT_PINNED in error.response.text
+
+    @staticmethod
+    def _files_params(cid_version: int, progress: bool):
+        return {"cid-version": cid_version, "progress": str(progress).lower()}
+
+    @staticmethod
+    def _directory_params(cid_version: int):
+        return {
+            "cid-version": cid_version,
+            "wrap-with-directory": True,
+            "recursive": True,
+        }
+
 
 class LocalPin(LocalPinMixin, PinAPI):
+    def ipfs_daemon_active(self) -> bool:
+        """Check if ipfs daemon is running, from a cached probe"""
+        return self.daemon.active(self.api_client)
+
+    def _request(self, *args, **kwargs) -> httpx.Response:
+        try:
+            return super()._request(*args, **kwargs)
+        except httpx.ConnectError:
+            self.daemon.invalidate()
+            raise
+
     def add(self, content: Content, *, cid_version: int = 1):
+        if (pin := self._cached(content, cid_version)) is not None:
+            return pin
+
         if not self.ipfs_daemon_active():
             raise NoIPFSDaemonError("IPFS daemon is not running")
 
@@ -56,18 +238,339 @@ class LocalPin(LocalPinMixin, PinAPI):
             **content._prepare_multipart(),
         )
 
-        return self._add(content, raw)
+        return self._record(content, self._add(content, raw), cid_version)
+
+    def add_directory(
+        self, directory: DirectoryContent, *, cid_version: int = 1
+    ) -> CollectionPin:
+        """Add a whole directory in one request, wrapped under a single root"""
+        if not self.ipfs_daemon_active():
+            raise NoIPFSDaemonError("IPFS daemon is not running")
+
+        raw = self._post(
+            "add",
+            query_params=self._directory_params(cid_version),
+            **directory._prepare_multipart(directories=True),
+        )
+
+        return self._add_directory(directory, raw)
 
+    def add_files(
+        self,
+        contents: Iterable[Content],
+        *,
+        cid_version: int = 1,
+        progress: bool = False,
+    ) -> Iterator[Pin | LocalPinProgress]:
+        """
+        Add several opened contents in one request. The response is parsed line
+        by line as kubo sends it, yielding the Pin of every file once added and,
+        with `progress`, kubo's progress events in between.
 
-class AsyncLocalPin(LocalPinMixin, AsyncPinAPI):
-    async def add(self, content: Content, *, cid_version: int = 1):
+        Contents unchanged since the ledger recorded their pin are yielded
+        first and left out of the request. The others share the request, so
+        they are not profiled one by one.
+        """
+        uploads = []
+        for content in contents:
+            if (pin := self._lookup(content, cid_version)) is not None:
+                yield pin
+            else:
+                uploads.append(content)
+        if not uploads:
+            return
+
+        if not self.ipfs_daemon_active():
+            raise NoIPFSDaemonError("IPFS daemon is not running")
+
+        pending = self._pending(uploads)
+        body = MultipartStream([content._multipart_file() for content in uploads])
+        params = self._files_params(cid_version, progress)
+
+        try:
+            with self._request_stream(
+                "POST", "add", params, body.headers, content=body
+            ) as raw:
+                raw.raise_for_status()
+                for line in raw.iter_lines():
+                    if not line:
+                        continue
+                    event = self._added(line, pending)
+                    if isinstance(event, LocalPinProgress):
+                        yield event
+                        continue
+
+                    added, pin = event
+                    if added is not None:
+                        pin = self._store(cast(Content, added), pin, cid_version)
+                    yield pin
+        except httpx.ConnectError:
+            self.daemon.invalidate()
+            raise
+
+    def iter_pins(
+        self, *, type: PinType = "recursive", names: bool = False
+    ) -> Generator[LocalPinLs, None, None]:
+        """
+        Pins of the node, streamed by the daemon and parsed line by line, so
+        that listing millions of them holds one at a time.
+        """
+        if not self.ipfs_daemon_active():
+            raise NoIPFSDaemonError("IPFS daemon is not running")
+
+        params = self._pin_ls_params(type, names)
+        try:
+            with self._request_stream("POST", "pin/ls", params) as raw:
+                raw.raise_for_status()
+                for line in raw.iter_lines():
+                    if line:
+                        yield self._listed(line)
+        except httpx.ConnectError:
+            self.daemon.invalidate()
+            raise
+
+    def pin(self, cids: list[str], *, recursive: bool = True) -> list[str]:
+        """Pin CIDs in one request, once the daemon fetched all their blocks"""
+        params = self._pin_params(cids, recursive)
+        raw = self._request(
+            "POST", "pin/add", params, idempotent=True, timeout=UNBOUNDED_READ
+        )
+        raw.raise_for_status()
+        return raw.json().get("Pins") or []
+
+    def unpin(self, cids: list[str], *, recursive: bool = True) -> list[str]:
+        """
+        Unpin CIDs in one request. The daemon unpins them in order and stops
+        at the first one it fails on, leaving the ones before it unpinned.
+        """
+        raw = self._post("pin/rm", query_params=self._pin_params(cids, recursive))
+        raw.raise_for_status()
+        return raw.json().get("Pins") or []
+
+    def unpin_many(
+        self,
+        cids: Iterable[str],
+        *,
+        recursive: bool = True,
+        batch_size: int = PIN_RM_BATCH,
+    ) -> Iterator[tuple[str, None | Exception]]:
+        """
+        Unpin CIDs `batch_size` per request, yielding (cid, None or the
+        exception raised). The daemon stops a batch at the first CID it fails
+        on, without naming it, after unpinning the CIDs before it. A failed
+        batch is then retried one CID at a time, where a CID reported as not
+        pinned counts as unpinned: the batch may have unpinned it.
+        """
+        for batch in self._batches(cids, batch_size):
+            try:
+                self.unpin(batch, recursive=recursive)
+            except httpx.HTTPStatusError:
+                for cid in batch:
+                    try:
+                        self.unpin([cid], recursive=recursive)
+                    except httpx.HTTPStatusError as error:
+                        yield cid, None if self._not_pinned(error) else error
+                    else:
+                        yield cid, None
+            else:
+                for cid in batch:
+                    yield cid, None
+
+    def repo_gc(self) -> Iterator[str]:
+        """Collect the garbage of the repository, yielding each CID removed"""
         if not self.ipfs_daemon_active():
             raise NoIPFSDaemonError("IPFS daemon is not running")
 
+        try:
+            with self._request_stream("POST", "repo/gc", timeout=UNBOUNDED_READ) as raw:
+                raw.raise_for_status()
+                for line in raw.iter_lines():
+                    if line:
+                        yield self._event(line)["Key"]["/"]
+        except httpx.ConnectError:
+            self.daemon.invalidate()
+            raise
+
+
+class AsyncLocalPin(LocalPinMixin, AsyncPinAPI):
+    async def ipfs_daemon_active(self) -> bool:
+        """Check if ipfs daemon is running, from a cached probe"""
+        return await self.daemon.aactive(self.api_client)
+
+    async def _request(self, *args, **kwargs) -> httpx.Response:
+        try:
+            return await super()._request(*args, **kwargs)
+        except httpx.ConnectError:
+            self.daemon.invalidate()
+            raise
+
+    async def add(self, content: AsyncContent, *, cid_version: int = 1):
+        if (pin := await self._cached(content, cid_version)) is not None:
+            return pin
+
+        if not await self.ipfs_daemon_active():
+            raise NoIPFSDaemonError("IPFS daemon is not running")
+
         raw = await self._post(
             "add",
             query_params={"cid-version": cid_version},
             **content._prepare_multipart(),
         )
 
-        return self._add(content, raw)
+        return await self._record(content, self._add(content, raw), cid_version)
+
+    async def add_directory(
+        self, directory: AsyncDirectoryContent, *, cid_version: int = 1
+    ) -> CollectionPin:
+        """Add a whole directory in one request, wrapped under a single root"""
+        if not await self.ipfs_daemon_active():
+            raise NoIPFSDaemonError("IPFS daemon is not running")
+
+        raw = await self._post(
+            "add",
+            query_params=self._directory_params(cid_version),
+            **directory._prepare_multipart(directories=True),
+        )
+
+        return self._add_directory(directory, raw)
+
+    async def add_files(
+        self,
+        contents: Iterable[AsyncContent],
+        *,
+        cid_version: int = 1,
+        progress: bool = False,
+    ) -> AsyncIterator[Pin | LocalPinProgress]:
+        """
+        Add several opened contents in one request. The response is parsed line
+        by line as kubo sends it, yielding the Pin of every file once added and,
+        with `progress`, kubo's progress events in between.
+
+        Contents unchanged since the ledger recorded their pin are yielded
+        first and left out of the request. The others share the request, so
+        they are not profiled one by one.
+        """
+        uploads = []
+        for content in contents:
+            if (pin := await self._lookup(content, cid_version)) is not None:
+                yield pin
+            else:
+                uploads.append(content)
+        if not uploads:
+            return
+
+        if not await self.ipfs_daemon_active():
+            raise NoIPFSDaemonError("IPFS daemon is not running")
+
+        pending = self._pending(uploads)
+        body = AsyncMultipartStream([c._multipart_file() for c in uploads])
+        params = self._files_params(cid_version, progress)
+
+        try:
+            async with self._request_stream(
+                "POST", "add", params, body.headers, content=body
+            ) as raw:
+                raw.raise_for_status()
+                async for line in raw.aiter_lines():
+                    if not line:
+                        continue
+                    event = self._added(line, pending)
+                    if isinstance(event, LocalPinProgress):
+                        yield event
+                        continue
+
+                    added, pin = event
+                    if added is not None:
+                        pin = await self._store(
+                            cast(AsyncContent, added), pin, cid_version
+                        )
+                    yield pin
+        except httpx.ConnectError:
+            self.daemon.invalidate()
+            raise
+
+    async def iter_pins(
+        self, *, type: PinType = "recursive", names: bool = False
+    ) -> AsyncGenerator[LocalPinLs, None]:
+        """
+        Pins of the node, streamed by the daemon and parsed line by line, so
+        that listing millions of them holds one at a time.
+        """
+        if not await self.ipfs_daemon_active():
+            raise NoIPFSDaemonError("IPFS daemon is not running")
+
+        params = self._pin_ls_params(type, names)
+        try:
+            async with self._request_stream("POST", "pin/ls", params) as raw:
+                raw.raise_for_status()
+                async for line in raw.aiter_lines():
+                    if line:
+                        yield self._listed(line)
+        except httpx.ConnectError:
+            self.daemon.invalidate()
+            raise
+
+    async def pin(self, cids: list[str], *, recursive: bool = True) -> list[str]:
+        """Pin CIDs in one request, once the daemon fetched all their blocks"""
+        params = self._pin_params(cids, recursive)
+        raw = await self._request(
+            "POST", "pin/add", params, idempotent=True, timeout=UNBOUNDED_READ
+        )
+        raw.raise_for_status()
+        return raw.json().get("Pins") or []
+
+    async def unpin(self, cids: list[str], *, recursive: bool = True) -> list[str]:
+        """
+        Unpin CIDs in one request. The daemon unpins them in order and stops
+        at the first one it fails on, leaving the ones before it unpinned.
+        """
+        params = self._pin_params(cids, recursive)
+        raw = await self._post("pin/rm", query_params=params)
+        raw.raise_for_status()
+        return raw.json().get("Pins") or []
+
+    async def unpin_many(
+        self,
+        cids: Iterable[str],
+        *,
+        recursive: bool = True,
+        batch_size: int = PIN_RM_BATCH,
+    ) -> AsyncGenerator[tuple[str, None | Exception], None]:
+        """
+        Unpin CIDs `batch_size` per request, yielding (cid, None or the
+        exception raised). The daemon stops a batch at the first CID it fails
+        on, without naming it, after unpinning the CIDs before it. A failed
+        batch is then retried one CID at a time, where a CID reported as not
+        pinned counts as unpinned: the batch may have unpinned it.
+        """
+        for batch in self._batches(cids, batch_size):
+            try:
+                await self.unpin(batch, recursive=recursive)
+            except httpx.HTTPStatusError:
+                for cid in batch:
+                    try:
+                        await self.unpin([cid], recursive=recursive)
+                    except httpx.HTTPStatusError as error:
+                        yield cid, None if self._not_pinned(error) else error
+                    else:
+                        yield cid, None
+            else:
+                for cid in batch:
+                    yield cid, None
+
+    async def repo_gc(self) -> AsyncIterator[str]:
+        """Collect the garbage of the repository, yielding each CID removed"""
+        if not await self.ipfs_daemon_active():
+            raise NoIPFSDaemonError("IPFS daemon is not running")
+
+        try:
+            async with self._request_stream(
+                "POST", "repo/gc", timeout=UNBOUNDED_READ
+            ) as raw:
+                raw.raise_for_status()
+                async for line in raw.aiter_lines():
+                    if line:
+                        yield self._event(line)["Key"]["/"]
+        except httpx.ConnectError:
+            self.daemon.invalidate()
+            raise
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Any
 
 import httpx
 from pydantic import BaseModel
@@ -6,12 +7,32 @@ from pydantic import Field
 
 from ...constants.pin_services import NFT_STORAGE_SERVICE
 from ..config import Config
+from ..content import AsyncCar
+from ..content import AsyncContent
+from ..content import AsyncDirectoryContent
+from ..content import AsyncShardedCar
+from ..content import Car
 from ..content import Content
+from ..content import DirectoryContent
+from ..content import ShardedCar
+from ..content.car import BaseCar
+from ..content.car import DEFAULT_SHARD_SIZE
+from ..content.content import BaseContent
+from ..models import CollectionPin
 from ..models import Pin
 from ..models import PinMeta
+from ..models import Status
+from ..ratelimit import RateLimit
+from ..ratelimit import RateLimiter
 from .pin_api import AsyncPinAPI
 from .pin_api import PinAPI
 from .pin_api import PinMixin
+from .pin_api import SHARD_CONCURRENCY
+from .pin_api import SHARD_RETRIES
+
+
+# 30 uploads per 10 seconds per API token
+NFT_STORAGE_RATE_LIMIT = RateLimit(30, 10)
 
 
 class NFT(BaseModel):
@@ -41,10 +62,34 @@ class NFTStorageAdd(BaseModel):
         return self.value.cid
 
 
+class NFTCheckPin(BaseModel):
+    cid: str
+    status: Status
+    size: float | None = None
+    created: datetime | None = None
+
+
+class NFTCheck(BaseModel):
+    cid: str
+    pin: NFTCheckPin | None = None
+    deals: list[dict[str, Any]] = []
+
+
+class NFTStorageCheck(BaseModel):
+    ok: bool
+    value: NFTCheck
+
+
 class NFTStorageMixin(PinMixin):
-    global_config = Config(base_url=NFT_STORAGE_SERVICE)
+    global_config = Config(
+        base_url=NFT_STORAGE_SERVICE,
+        shared=True,
+        rate_limit=RateLimiter(upload=NFT_STORAGE_RATE_LIMIT),
+    )
+    # larger files are uploaded as CAR shards
+    max_request_size = DEFAULT_SHARD_SIZE
 
-    def _add(self, content: Content, raw_response: httpx.Response, *args, **kwds):
+    def _add(self, content: BaseContent, raw_response: httpx.Response, *args, **kwds):
         response = super()._add(content, raw_response, NFTStorageAdd)
 
         nft = response.value
@@ -55,16 +100,136 @@ class NFTStorageMixin(PinMixin):
             meta=PinMeta.from_model(nft, exclude={"cid"}),
         )
 
+    def _add_shards(self, content: BaseContent, raw_responses: list[httpx.Response]):
+        return self._add(content, raw_responses[-1])
+
+    def _add_car(self, car: BaseCar, raw_response: httpx.Response) -> CollectionPin:
+        response = self.transform_response(raw_response, NFTStorageAdd)
+        nft = response.value
+        pin = nft.pin or Pin(cid=nft.cid, meta=PinMeta.from_model(nft, {"cid"}))
+
+        return self._collection(pin, car.files)
+
 
 class NFTStorage(NFTStorageMixin, PinAPI):
     def add(self, content: Content, *, cid_version: int = 1):
+        if content.size > self.max_request_size:
+            return self.add_sharded(content, cid_version=cid_version)
+
+        if (pin := self._cached(content, cid_version)) is not None:
+            return pin
+
         raw = self._post("upload", **content._prepare())
 
-        return self._add(content, raw)
+        return self._record(content, self._add(content, raw), cid_version)
+
+    def add_sharded(
+        self,
+        content: Content,
+        *,
+        cid_version: int = 1,
+        shard_size: int | None = None,
+        retries: int = SHARD_RETRIES,
+    ) -> Pin:
+        """Upload a file as several CARs, each under the request size limit"""
+        if (pin := self._cached(content, cid_version)) is not None:
+            return pin
+
+        car = ShardedCar(
+            content.path, shard_size or self.max_request_size, cid_version=cid_version
+        ).build()
+        raw = self._upload_shards("upload", car, "application/car", retries)
+
+        return self._record(content, self._add_shards(content, raw), cid_version)
+
+    def add_directory(
+        self, directory: DirectoryContent, *, file_cids: bool = False
+    ) -> CollectionPin:
+        """
+        Upload a whole directory in one multipart request. The service only
+        returns the root CID, `file_cids` computes the CID of every file
+        locally, reading the directory a second time.
+        """
+        raw = self._post("upload", **directory._prepare_multipart())
+
+        return self._collect(directory, self._add(directory, raw), file_cids=file_cids)
+
+    def add_car(self, car: Car) -> CollectionPin:
+        """Upload a whole collection as a single CAR"""
+        if not car.built:
+            car.build()
+
+        raw = self._post("upload", **car._prepare("application/car"))
+
+        return self._add_car(car, raw)
+
+    def check(self, cid: str) -> NFTCheck:
+        """Pinning status and storage deals of a CID"""
+        raw = self._get(f"check/{cid}")
+        return self.transform_response(raw, NFTStorageCheck).value
 
 
 class AsyncNFTStorage(NFTStorageMixin, AsyncPinAPI):
-    async def add(self, content: Content, *, cid_version: int = 1):
+    async def add(self, content: AsyncContent, *, cid_version: int = 1):
+        if content.size > self.max_request_size:
+            return await self.add_sharded(content, cid_version=cid_version)
+
+        if (pin := await self._cached(content, cid_version)) is not None:
+            return pin
+
         raw = await self._post("upload", **content._prepare())
 
-        return self._add(content, raw)
+        return await self._record(content, self._add(content, raw), cid_version)
+
+    async def add_sharded(
+        self,
+        content: AsyncContent,
+        *,
+        cid_version: int = 1,
+        shard_size: int | None = None,
+        retries: int = SHARD_RETRIES,
+        concurrency: int = SHARD_CONCURRENCY,
+    ) -> Pin:
+        """
+        Upload a file as several CARs, each under the request size limit.
+        Shards are uploaded concurrently and a failed one is retried alone.
+        """
+        if (pin := await self._cached(content, cid_version)) is not None:
+            return pin
+
+        car = await AsyncShardedCar(
+            content.path, shard_size or self.max_request_size, cid_version=cid_version
+        ).build()
+        raw = await self._upload_shards(
+            "upload", car, "application/car", retries, concurrency
+        )
+
+        return await self._record(content, self._add_shards(content, raw), cid_version)
+
+    async def add_directory(
+        self, directory: AsyncDirectoryContent, *, file_cids: bool = False
+    ) -> CollectionPin:
+        """
+        Upload a whole directory in one multipart request. The service only
+        returns the root CID, `file_cids` computes the CID of every file
+        locally, reading the directory a second time.
+        """
+        raw = await self._post("upload", **directory._prepare_multipart())
+
+        return await self._collect(
+            directory, self._add(directory, raw), file_cids=file_cids
+        )
+
+    async def add_car(self, car: AsyncCar) -> CollectionPin:
+        """Upload a whole collection as a single CAR"""
+        if not car.built:
+            await car.build()
+
+        raw = await self._post("upload", **car._prepare("application/car"))
+
+        return self._add_car(car, raw)
+
+    async def check(self, cid: str) -> NFTCheck:
+        """Pinning status and storage deals of a CID"""
+        raw = await self._get(f"check/{cid}")
+        return self.transform_response(raw, NFTStorageCheck).value
@@ -1,12 +1,37 @@
+import time
+import uuid
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from contextlib import asynccontextmanager
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from typing import cast
 from typing import ClassVar
+from typing import Generic
 from typing import Literal
+from typing import Self
 from typing import TypeVar
 from urllib.parse import quote as urlquote
 
+import anyio
 import httpx
 import pydantic
+from anyio.abc import TaskGroup
+from anyio.streams.memory import MemoryObjectReceiveStream
+from anyio.streams.memory import MemoryObjectSendStream
 from httpx._types import HeaderTypes
 from httpx._types import QueryParamTypes
 from httpx._types import RequestContent
@@ -14,12 +39,49 @@ from httpx._types import RequestData
 from httpx._types import RequestFiles
 from pydantic import BaseModel
 
+from ..clients import CLIENTS
 from ..config import BearerAuth
 from ..config import Config
+from ..content import AsyncContent
+from ..content import AsyncDirectoryContent
+from ..content import AsyncShardedCar
 from ..content import Content
+from ..content import DirectoryContent
+from ..content import ShardedCar
+from ..content.car import CarShard
+from ..content.content import BaseContent
+from ..ledger import PinLedger
+from ..metrics import CountedStream
+from ..profiling import phase
+from ..profiling import Profiler
+from ..progress import ProgressTracker
+from ..progress import Upload
+from ..ratelimit import TokenBucket
+from ..retry import IDEMPOTENT_METHODS
+from ..retry import replayable
+from ..retry import Retrying
+from ..retry import RetryPolicy
+from pinnacle.ipfs.models.collection import CollectionPin
 from pinnacle.ipfs.models.models import Pin
 
 ModelT = TypeVar("ModelT", bound=BaseModel)
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+DEFAULT_CONCURRENCY = 8
+
+# a page of a listing: the count of items it reports, and the raw items
+Page = tuple[int, list[dict[str, Any]]]
+
+SHARD_RETRIES = 3
+SHARD_CONCURRENCY = 4
+
+
+# content being uploaded, naming the progress of its requests
+uploading: ContextVar[BaseContent | None] = ContextVar("uploading", default=None)
+
+# request arguments of httpx's send, and not of build_request
+SEND_PARAMS = ("auth", "follow_redirects")
 
 
 class MissingConfigurationError(AttributeError):
@@ -28,6 +90,17 @@ class MissingConfigurationError(AttributeError):
         super().__init__(msg, *args)
 
 
+def _has_body(request: httpx.Request) -> bool:
+    length = request.headers.get("Content-Length")
+    return (
+        length != "0" if length is not None else "Transfer-Encoding" in request.headers
+    )
+
+
+def _is_chunked(request: httpx.Request) -> bool:
+    return "Transfer-Encoding" in request.headers
+
+
 def urljoin(base: str, endpoint: str):
     base = base.rstrip("/")
     endpoint = urlquote(endpoint.lstrip("/"), safe=":/?=&")
@@ -35,15 +108,97 @@ def urljoin(base: str, endpoint: str):
     return "/".join([base, endpoint])
 
 
+class AsyncResults(Generic[ResultT]):
+    """
+    Results sent by a producer task in batches, iterated one by one inside
+    `async with`. Leaving the block cancels the producer, unlike an async
+    generator holding a task group that is only closed once garbage collected.
+    """
+
+    def __init__(
+        self,
+        produce: Callable[[MemoryObjectSendStream[Iterable[ResultT]]], Awaitable[None]],
+    ) -> None:
+        self._produce = produce
+        self._receive: MemoryObjectReceiveStream[Iterable[ResultT]] | None = None
+        self._task_group: TaskGroup | None = None
+        self._batch: Iterator[ResultT] = iter(())
+
+    async def _run(self, send: MemoryObjectSendStream[Iterable[ResultT]]) -> None:
+        async with send:
+            await self._produce(send)
+
+    async def __aenter__(self) -> Self:
+        # without a buffer, the producer waits for every batch to be taken
+        send, self._receive = anyio.create_memory_object_stream(0)
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+        self._task_group.start_soon(self._run, send)
+        return self
+
+    async def __aexit__(self, exc_type, exc_instance, traceback):
+        assert self._task_group is not None and self._receive is not None
+        self._task_group.cancel_scope.cancel()
+        try:
+            return await self._task_group.__aexit__(exc_type, exc_instance, traceback)
+        finally:
+            await self._receive.aclose()
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> ResultT:
+        if self._receive is None:
+            raise RuntimeError("Results are only iterated inside `async with`")
+        while True:
+            for result in self._batch:
+                return result
+            try:
+                self._batch = iter(await self._receive.receive())
+            except anyio.EndOfStream:
+                raise StopAsyncIteration
+
+
 class BasePinAPI:
     global_config: ClassVar[Config]
 
-    def __init__(self, config: Config | None = None, *args, **kwds) -> None:
+    def __init__(
+        self,
+        config: Config | None = None,
+        *args,
+        ledger: PinLedger | None = None,
+        progress: ProgressTracker | None = None,
+        profiler: Profiler | None = None,
+        **kwds,
+    ) -> None:
         try:
             self.config = self.global_config if config is None else config
         except AttributeError:
             raise MissingConfigurationError
 
+        self.ledger = ledger
+        self.progress = progress
+        self.profiler = profiler
+
+    def _build_request(
+        self, client: httpx.Client | httpx.AsyncClient, method: str, params: dict
+    ) -> tuple[httpx.Request, dict, Upload | None]:
+        """Build a request, its body tracked if a progress tracker is attached"""
+        params = dict(params)
+        send = {key: params.pop(key) for key in SEND_PARAMS if key in params}
+        with phase("encode"):
+            request = client.build_request(method, **params)
+        upload = None
+        if self.progress is not None and _has_body(request):
+            content = uploading.get()
+            name = request.url.path if content is None else content.basename
+            upload = self.progress.track(request, name)
+
+        # bodies of unknown length are counted for the metrics as they are sent
+        if self.config.metrics is not None and _is_chunked(request):
+            request.stream = CountedStream(request.stream)
+        return request, send, upload
+
     def _build_request_params(
         self,
         endpoint: str,
@@ -63,6 +218,62 @@ class BasePinAPI:
 
         return request_params | self.config.setup()
 
+    def _bucket(self, method: str) -> TokenBucket | None:
+        if self.config.rate_limit is None:
+            return None
+        return self.config.rate_limit.bucket(self.config, method)
+
+    def _begin(self, content: BaseContent) -> None:
+        if self.profiler is not None:
+            self.profiler.begin(content, content.basename)
+
+    def _end(self, content: BaseContent) -> None:
+        if self.profiler is not None:
+            self.profiler.end(content)
+
+    def _observe(self, endpoint: str, response: httpx.Response, started: float) -> None:
+        if self.config.metrics is not None:
+            elapsed = time.perf_counter() - started
+            self.config.metrics.observe(self.provider, endpoint, response, elapsed)
+
+    def _observe_error(
+        self, method: str, endpoint: str, error: BaseException, started: float
+    ) -> None:
+        if self.config.metrics is not None:
+            elapsed = time.perf_counter() - started
+            self.config.metrics.observe_error(
+                self.provider, method, endpoint, error, elapsed
+            )
+
+    def _observe_retry(self, method: str, endpoint: str) -> None:
+        if self.config.metrics is not None:
+            self.config.metrics.observe_retry(self.provider, method, endpoint)
+
+    def _retrying(
+        self,
+        method: str,
+        params: dict,
+        idempotent: bool | None = None,
+        retry: RetryPolicy | None = None,
+    ) -> Retrying:
+        """
+        Attempts of a request. Requests are idempotent by their method, unless
+        told otherwise; a key is added to the others when the policy has an
+        idempotency header. A body that cannot be replayed is sent only once.
+        """
+        policy = self.config.retry if retry is None else retry
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+            if not idempotent and policy.idempotency_header is not None:
+                headers = httpx.Headers(params.get("headers"))
+                headers[policy.idempotency_header] = uuid.uuid4().hex
+                params["headers"] = headers
+                idempotent = True
+
+        if not replayable(params.get("content")):
+            policy = policy.replace(retries=0)
+        return policy.start(idempotent)
+
     def authenticate_with_token(self, token: str):
         auth = BearerAuth(token)
         self.config.update_authentication(auth)
@@ -75,6 +286,16 @@ class BasePinAPI:
     def authless(self):
         return self.config.authless
 
+    @property
+    def provider(self) -> str:
+        """Identifier of the pinning service, shared by its sync and async clients"""
+        return self.config.url
+
+    @property
+    def account(self) -> str:
+        """Identifier of the account on the pinning service, its pins are its own"""
+        return self.config.account
+
 
 class PinAPI(BasePinAPI, ABC):
     global_config: ClassVar[Config]
@@ -83,34 +304,302 @@ class PinAPI(BasePinAPI, ABC):
         self,
         config: Config | None = None,
         api_client: httpx.Client | None = None,
+        ledger: PinLedger | None = None,
+        progress: ProgressTracker | None = None,
+        profiler: Profiler | None = None,
     ) -> None:
-        super().__init__(config)
-        self.api_client = api_client or httpx.Client()
+        super().__init__(config, ledger=ledger, progress=progress, profiler=profiler)
+        if api_client is None and not self.config.shared:
+            api_client = httpx.Client(**self.config.client_options())
+        self._api_client = api_client
+
+    @property
+    def shared(self) -> bool:
+        return self._api_client is None
+
+    @property
+    def api_client(self) -> httpx.Client:
+        if self._api_client is None:
+            return CLIENTS.client(self.config)
+        return self._api_client
 
     @abstractmethod
     def add(self, content: Content, *, cid_version: int = 1) -> Pin:
         ...  # pragma: no cover
 
     def __enter__(self):
-        self.api_client.__enter__()
+        # shared clients outlive the instance, they are closed at exit
+        if not self.shared:
+            self.api_client.__enter__()
         return self
 
     def __exit__(self, exc_type, exc_instance, traceback):
-        return self.api_client.__exit__(exc_type, exc_instance, traceback)
+        if not self.shared:
+            return self.api_client.__exit__(exc_type, exc_instance, traceback)
+
+    def _head(self) -> None:
+        try:
+            self.api_client.head(self.config.url)
+        except httpx.HTTPError:
+            pass
+
+    def prewarm(self, connections: int = 1) -> None:
+        """Open `connections` connections to the service ahead of the first pins"""
+        with ThreadPoolExecutor(connections) as executor:
+            for _ in range(connections):
+                executor.submit(self._head)
+
+    def _add_one(self, content: Content, cid_version: int) -> Pin:
+        # a pin held by the ledger is returned before the content is read
+        if (pin := self._lookup(content, cid_version)) is not None:
+            return pin
+
+        # contents are only opened for their upload, bounding memory to the window
+        self._begin(content)
+        if content.opened:
+            return self.add(content, cid_version=cid_version)
+
+        with content:
+            return self.add(content, cid_version=cid_version)
+
+    def add_many(
+        self,
+        contents: Iterable[Content],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        cid_version: int = 1,
+    ) -> Iterator[tuple[Content, Pin | Exception]]:
+        """
+        Pin many contents over a pool of `concurrency` threads.
+
+        Yield (content, Pin or the exception raised) in completion order.
+        `contents` is consumed lazily: once `concurrency` uploads are in
+        flight, the next content is only taken when one of them completes.
+        """
+        return self._map_concurrently(
+            lambda content: self._add_one(content, cid_version), contents, concurrency
+        )
+
+    def _map_concurrently(
+        self,
+        function: Callable[[ItemT], ResultT],
+        items: Iterable[ItemT],
+        concurrency: int,
+    ) -> Iterator[tuple[ItemT, ResultT | Exception]]:
+        """
+        Call a function on items over a pool of `concurrency` threads,
+        yielding (item, result or the exception raised) in completion order.
+        """
+        pending: dict[Future[ResultT], ItemT] = {}
+        queue = iter(items)
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            try:
+                while True:
+                    for item in queue:
+                        pending[executor.submit(function, item)] = item
+                        if len(pending) >= concurrency:
+                            break
+
+                    if not pending:
+                        return
+
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        item = pending.pop(future)
+                        if (error := future.exception()) is not None:
+                            yield item, cast(Exception, error)
+                        else:
+                            yield item, future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _iter_pages(
+        self,
+        get_page: Callable[[dict], Page],
+        next_page: Callable[[dict, Page], dict | None],
+        parse: Callable[[dict[str, Any]], ModelT],
+        params: dict,
+    ) -> Generator[ModelT, None, None]:
+        """
+        Items of a paged listing, parsed as they are consumed. The next page
+        is fetched while the current one is consumed, so at most two pages
+        are held at once.
+        """
+        with ThreadPoolExecutor(1) as executor:
+            future: Future[Page] | None = executor.submit(get_page, params)
+            while future is not None:
+                page, future = future.result(), None
+                if (next_params := next_page(params, page)) is not None:
+                    params = next_params
+                    future = executor.submit(get_page, params)
+
+                for item in page[1]:
+                    yield parse(item)
+
+    def _cached(self, content: Content, cid_version: int) -> Pin | None:
+        """
+        Pin recorded in the ledger if content is unchanged since it was pinned.
+        Called first by every upload, naming the progress of its requests.
+        """
+        uploading.set(content)
+        self._begin(content)
+        return self._lookup(content, cid_version)
+
+    def _lookup(self, content: Content, cid_version: int) -> Pin | None:
+        if self.ledger is None:
+            return None
+
+        pin = self.ledger.lookup(content.path, self.account, cid_version)
+        if pin is not None:
+            content.set_pinned_status(pin.cid, self.provider)
+        return pin
+
+    def _record(self, content: Content, pin: Pin, cid_version: int) -> Pin:
+        uploading.set(None)
+        self._end(content)
+        return self._store(content, pin, cid_version)
+
+    def _store(self, content: Content, pin: Pin, cid_version: int) -> Pin:
+        content.set_pinned_status(pin.cid, self.provider)
+        if self.ledger is not None:
+            self.ledger.record(content.path, self.account, pin, cid_version)
+        return pin
+
+    def _collect(
+        self,
+        directory: DirectoryContent,
+        pin: Pin,
+        cid_version: int = 1,
+        file_cids: bool = False,
+    ) -> CollectionPin:
+        """
+        Collection of a directory whose upload only returned the root CID.
+        With `file_cids`, file CIDs are computed locally, reading every file
+        again, and only kept if the roots match.
+        """
+        if not file_cids:
+            return PinMixin._collection(pin, {})
+
+        root, files = directory.compute_cids(cid_version=cid_version)
+        return PinMixin._collection(pin, files if root == pin.cid else {})
+
+    def _upload_shard(
+        self,
+        endpoint: str,
+        car: ShardedCar,
+        shard: CarShard,
+        mimetype: str | None = None,
+        retries: int = SHARD_RETRIES,
+    ) -> httpx.Response:
+        """Upload a CAR shard, retrying it alone on network or server errors"""
+        # a CAR is content-addressed, uploading it twice pins the same blocks
+        raw = self._request(
+            "POST",
+            endpoint,
+            idempotent=True,
+            retry=self.config.retry.replace(retries=retries),
+            **car._prepare(shard, mimetype),
+        )
+
+        # a shard failing for good stops the upload of the others
+        raw.raise_for_status()
+        return raw
+
+    def _upload_shards(
+        self,
+        endpoint: str,
+        car: ShardedCar,
+        mimetype: str | None = None,
+        retries: int = SHARD_RETRIES,
+    ) -> list[httpx.Response]:
+        return [
+            self._upload_shard(endpoint, car, shard, mimetype, retries)
+            for shard in car.shards
+        ]
 
     def _request(
         self,
-        method: Literal["GET", "POST", "DELETE"],
+        method: Literal["GET", "POST", "PUT", "DELETE"],
         endpoint: str,
         query_params: QueryParamTypes | None = None,
         headers: HeaderTypes | None = None,
         *args,
+        idempotent: bool | None = None,
+        retry: RetryPolicy | None = None,
         **kwargs,
-    ):
+    ) -> httpx.Response:
+        """
+        Send a request within the configuration's rate limit, retrying it as
+        its retry policy allows. The last response is returned whatever its status.
+        """
+        _params = self._build_request_params(endpoint, query_params, headers)
+        _params |= kwargs
+
+        retrying = self._retrying(method, _params, idempotent, retry)
+        bucket = self._bucket(method)
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                response = self._send(method, endpoint, _params)
+            except httpx.TransportError as error:
+                if (delay := retrying.next_delay(error=error)) is None:
+                    raise
+            else:
+                if (delay := retrying.next_delay(response)) is None:
+                    return response
+                response.close()
+            self._observe_retry(method, endpoint)
+            time.sleep(delay)
+
+    @contextmanager
+    def _request_stream(
+        self,
+        method: Literal["GET", "POST", "PUT", "DELETE"],
+        endpoint: str,
+        query_params: QueryParamTypes | None = None,
+        headers: HeaderTypes | None = None,
+        **kwargs,
+    ) -> Iterator[httpx.Response]:
+        """
+        Send a request within the rate limit, its response being read as it
+        arrives. It is not retried, its body may have been partly consumed.
+        """
         _params = self._build_request_params(endpoint, query_params, headers)
         _params |= kwargs
 
-        return self.api_client.request(method, *args, **_params)
+        if (bucket := self._bucket(method)) is not None:
+            bucket.acquire()
+        started = time.perf_counter()
+        response = self._send(method, endpoint, _params, stream=True)
+        try:
+            yield response
+        finally:
+            response.close()
+            self._observe(endpoint, response, started)
+
+    def _send(
+        self, method: str, endpoint: str, params: dict, stream: bool = False
+    ) -> httpx.Response:
+        """Send a request, recorded once read unless its response is streamed"""
+        client = self.api_client
+        request, send, upload = self._build_request(client, method, params)
+        started = time.perf_counter()
+        try:
+            with phase("network"):
+                response = client.send(request, stream=stream, **send)
+        except Exception as error:
+            self._observe_error(method, endpoint, error, started)
+            raise
+        finally:
+            if upload is not None:
+                upload.finish()
+
+        if not stream:
+            self._observe(endpoint, response, started)
+        return response
 
     def _post(
         self,
@@ -121,7 +610,7 @@ class PinAPI(BasePinAPI, ABC):
         data: RequestData | None = None,
         query_params: QueryParamTypes | None = None,
         headers: HeaderTypes | None = None,
-    ):
+    ) -> httpx.Response:
         return self._request(
             "POST",
             endpoint,
@@ -138,7 +627,7 @@ class PinAPI(BasePinAPI, ABC):
         *,
         query_params: QueryParamTypes | None = None,
         headers: HeaderTypes | None = None,
-    ):
+    ) -> httpx.Response:
         return self._request("GET", endpoint, query_params, headers=headers)
 
 
@@ -149,34 +638,324 @@ class AsyncPinAPI(BasePinAPI, ABC):
         self,
         config: Config | None = None,
         api_client: httpx.AsyncClient | None = None,
+        ledger: PinLedger | None = None,
+        progress: ProgressTracker | None = None,
+        profiler: Profiler | None = None,
     ) -> None:
-        super().__init__(config)
-        self.api_client = api_client or httpx.AsyncClient()
+        super().__init__(config, ledger=ledger, progress=progress, profiler=profiler)
+        if api_client is None and not self.config.shared:
+            api_client = httpx.AsyncClient(
+                **self.config.client_options(asynchronous=True)
+            )
+        self._api_client = api_client
+
+    @property
+    def shared(self) -> bool:
+        return self._api_client is None
+
+    @property
+    def api_client(self) -> httpx.AsyncClient:
+        if self._api_client is None:
+            return CLIENTS.async_client(self.config)
+        return self._api_client
 
     @abstractmethod
-    async def add(self, content: Content, *, cid_version: int = 1) -> Pin:
+    async def add(self, content: AsyncContent, *, cid_version: int = 1) -> Pin:
         ...  # pragma: no cover
 
     async def __aenter__(self):
-        await self.api_client.__aenter__()
+        # shared clients outlive the instance, they are closed at exit
+        if not self.shared:
+            await self.api_client.__aenter__()
         return self
 
     async def __aexit__(self, exc_type, exc_instance, traceback):
-        return await self.api_client.__aexit__(exc_type, exc_instance, traceback)
+        if not self.shared:
+            return await self.api_client.__aexit__(exc_type, exc_instance, traceback)
+
+    async def _head(self) -> None:
+        try:
+            await self.api_client.head(self.config.url)
+        except httpx.HTTPError:
+            pass
+
+    async def prewarm(self, connections: int = 1) -> None:
+        """Open `connections` connections to the service ahead of the first pins"""
+        async with anyio.create_task_group() as tg:
+            for _ in range(connections):
+                tg.start_soon(self._head)
+
+    async def _add_one(self, content: AsyncContent, cid_version: int) -> Pin:
+        # a pin held by the ledger is returned before the content is read
+        if (pin := await self._lookup(content, cid_version)) is not None:
+            return pin
+
+        # contents are only opened for their upload, bounding memory to the window
+        self._begin(content)
+        if content.opened:
+            return await self.add(content, cid_version=cid_version)
+
+        async with content:
+            return await self.add(content, cid_version=cid_version)
+
+    def add_many(
+        self,
+        contents: Iterable[AsyncContent] | AsyncIterable[AsyncContent],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        cid_version: int = 1,
+    ) -> AsyncResults[tuple[AsyncContent, Pin | Exception]]:
+        """
+        Pin many contents, `concurrency` at a time, inside `async with`.
+
+        Yield (content, Pin or the exception raised) in completion order.
+        `contents` is consumed lazily: a content is only taken once a slot of
+        the window is free, and a slot is only freed once its result is taken.
+        Leaving the `async with` block early cancels the uploads in flight.
+        """
+
+        async def add(content: AsyncContent) -> Pin:
+            return await self._add_one(content, cid_version)
+
+        return self._map_concurrently(add, contents, concurrency)
+
+    def _map_concurrently(
+        self,
+        function: Callable[[ItemT], Awaitable[ResultT]],
+        items: Iterable[ItemT] | AsyncIterable[ItemT],
+        concurrency: int,
+    ) -> AsyncResults[tuple[ItemT, ResultT | Exception]]:
+        """
+        Await a function on items, `concurrency` at a time, yielding (item,
+        result or the exception raised) in completion order.
+        """
+        slots = anyio.Semaphore(concurrency)
+
+        async def produce(
+            send: MemoryObjectSendStream[Iterable[tuple[ItemT, ResultT | Exception]]]
+        ) -> None:
+            async def call(item: ItemT):
+                result: ResultT | Exception
+                try:
+                    result = await function(item)
+                except Exception as error:
+                    result = error
+
+                await send.send([(item, result)])
+                slots.release()
+
+            async with anyio.create_task_group() as tg:
+                if isinstance(items, AsyncIterable):
+                    async for item in items:
+                        await slots.acquire()
+                        tg.start_soon(call, item)
+                else:
+                    for item in items:
+                        await slots.acquire()
+                        tg.start_soon(call, item)
+
+        return AsyncResults(produce)
+
+    def _iter_pages(
+        self,
+        get_page: Callable[[dict], Awaitable[Page]],
+        next_page: Callable[[dict, Page], dict | None],
+        parse: Callable[[dict[str, Any]], ModelT],
+        params: dict,
+    ) -> AsyncResults[ModelT]:
+        """
+        Items of a paged listing inside `async with`, parsed as they are
+        consumed. The next page is fetched while the current one is consumed,
+        so at most two pages are held at once.
+        """
+
+        async def produce(send: MemoryObjectSendStream[Iterable[ModelT]]) -> None:
+            next_params: dict | None = params
+            while next_params is not None:
+                page = await get_page(next_params)
+                next_params = next_page(next_params, page)
+                await send.send(map(parse, page[1]))
+
+        return AsyncResults(produce)
+
+    async def _cached(self, content: AsyncContent, cid_version: int) -> Pin | None:
+        """
+        Pin recorded in the ledger if content is unchanged since it was pinned.
+        Called first by every upload, naming the progress of its requests.
+        """
+        uploading.set(content)
+        self._begin(content)
+        return await self._lookup(content, cid_version)
+
+    async def _lookup(self, content: AsyncContent, cid_version: int) -> Pin | None:
+        if self.ledger is None:
+            return None
+
+        pin = await anyio.to_thread.run_sync(
+            self.ledger.lookup, content.path, self.account, cid_version
+        )
+        if pin is not None:
+            content.set_pinned_status(pin.cid, self.provider)
+        return pin
+
+    async def _record(self, content: AsyncContent, pin: Pin, cid_version: int) -> Pin:
+        uploading.set(None)
+        self._end(content)
+        return await self._store(content, pin, cid_version)
+
+    async def _store(self, content: AsyncContent, pin: Pin, cid_version: int) -> Pin:
+        content.set_pinned_status(pin.cid, self.provider)
+        if self.ledger is not None:
+            await anyio.to_thread.run_sync(
+                self.ledger.record, content.path, self.account, pin, cid_version
+            )
+        return pin
+
+    async def _collect(
+        self,
+        directory: AsyncDirectoryContent,
+        pin: Pin,
+        cid_version: int = 1,
+        file_cids: bool = False,
+    ) -> CollectionPin:
+        """
+        Collection of a directory whose upload only returned the root CID.
+        With `file_cids`, file CIDs are computed locally, reading every file
+        again, and only kept if the roots match.
+        """
+        if not file_cids:
+            return PinMixin._collection(pin, {})
+
+        root, files = await directory.compute_cids(cid_version=cid_version)
+        return PinMixin._collection(pin, files if root == pin.cid else {})
+
+    async def _upload_shard(
+        self,
+        endpoint: str,
+        car: AsyncShardedCar,
+        shard: CarShard,
+        mimetype: str | None = None,
+        retries: int = SHARD_RETRIES,
+    ) -> httpx.Response:
+        """Upload a CAR shard, retrying it alone on network or server errors"""
+        # a CAR is content-addressed, uploading it twice pins the same blocks
+        raw = await self._request(
+            "POST",
+            endpoint,
+            idempotent=True,
+            retry=self.config.retry.replace(retries=retries),
+            **car._prepare(shard, mimetype),
+        )
+
+        # a shard failing for good stops the upload of the others
+        raw.raise_for_status()
+        return raw
+
+    async def _upload_shards(
+        self,
+        endpoint: str,
+        car: AsyncShardedCar,
+        mimetype: str | None = None,
+        retries: int = SHARD_RETRIES,
+        concurrency: int = SHARD_CONCURRENCY,
+    ) -> list[httpx.Response]:
+        """Upload every shard of a CAR, `concurrency` at a time"""
+        responses: list[httpx.Response] = [None] * len(car.shards)  # type: ignore
+        limiter = anyio.CapacityLimiter(concurrency)
+
+        async def upload(index: int, shard: CarShard):
+            async with limiter:
+                responses[index] = await self._upload_shard(
+                    endpoint, car, shard, mimetype, retries
+                )
+
+        async with anyio.create_task_group() as tg:
+            for index, shard in enumerate(car.shards):
+                tg.start_soon(upload, index, shard)
+
+        return responses
 
     async def _request(
         self,
-        method: Literal["GET", "POST", "DELETE"],
+        method: Literal["GET", "POST", "PUT", "DELETE"],
         endpoint: str,
         query_params: QueryParamTypes | None = None,
         headers: HeaderTypes | None = None,
         *args,
+        idempotent: bool | None = None,
+        retry: RetryPolicy | None = None,
         **kwargs,
-    ):
+    ) -> httpx.Response:
+        """
+        Send a request within the configuration's rate limit, retrying it as
+        its retry policy allows. The last response is returned whatever its status.
+        """
+        _params = self._build_request_params(endpoint, query_params, headers)
+        _params |= kwargs
+
+        retrying = self._retrying(method, _params, idempotent, retry)
+        bucket = self._bucket(method)
+        while True:
+            if bucket is not None:
+                await bucket.aacquire()
+            try:
+                response = await self._send(method, endpoint, _params)
+            except httpx.TransportError as error:
+                if (delay := retrying.next_delay(error=error)) is None:
+                    raise
+            else:
+                if (delay := retrying.next_delay(response)) is None:
+                    return response
+                await response.aclose()
+            self._observe_retry(method, endpoint)
+            await anyio.sleep(delay)
+
+    @asynccontextmanager
+    async def _request_stream(
+        self,
+        method: Literal["GET", "POST", "PUT", "DELETE"],
+        endpoint: str,
+        query_params: QueryParamTypes | None = None,
+        headers: HeaderTypes | None = None,
+        **kwargs,
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Send a request within the rate limit, its response being read as it
+        arrives. It is not retried, its body may have been partly consumed.
+        """
         _params = self._build_request_params(endpoint, query_params, headers)
         _params |= kwargs
 
-        return await self.api_client.request(method, *args, **_params)
+        if (bucket := self._bucket(method)) is not None:
+            await bucket.aacquire()
+        started = time.perf_counter()
+        response = await self._send(method, endpoint, _params, stream=True)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+            self._observe(endpoint, response, started)
+
+    async def _send(
+        self, method: str, endpoint: str, params: dict, stream: bool = False
+    ) -> httpx.Response:
+        """Send a request, recorded once read unless its response is streamed"""
+        client = self.api_client
+        request, send, upload = self._build_request(client, method, params)
+        started = time.perf_counter()
+        try:
+            with phase("network"):
+                response = await client.send(request, stream=stream, **send)
+        except Exception as error:
+            self._observe_error(method, endpoint, error, started)
+            raise
+        finally:
+            if upload is not None:
+                upload.finish()
+
+        if not stream:
+            self._observe(endpoint, response, started)
+        return response
 
     async def _post(
         self,
@@ -187,7 +966,7 @@ class AsyncPinAPI(BasePinAPI, ABC):
         data: RequestData | None = None,
         query_params: QueryParamTypes | None = None,
         headers: HeaderTypes | None = None,
-    ):
+    ) -> httpx.Response:
         return await self._request(
             "POST",
             endpoint,
@@ -204,7 +983,7 @@ class AsyncPinAPI(BasePinAPI, ABC):
         *,
         query_params: QueryParamTypes | None = None,
         headers: HeaderTypes | None = None,
-    ):
+    ) -> httpx.Response:
         return await self._request("GET", endpoint, query_params, headers=headers)
 
 
@@ -221,16 +1000,18 @@ class PinMixin:
     ) -> ModelT:
         """Static method to transfrom raw response to pydantic model"""
         raw_response.raise_for_status()
-        raw_json = raw_response.json()
+        with phase("decode"):
+            raw_json = raw_response.json()
 
-        try:
-            return response_model.parse_obj(raw_json)
-        except pydantic.ValidationError:
-            return response_model.parse_raw(raw_json)
+        with phase("validate"):
+            try:
+                return response_model.parse_obj(raw_json)
+            except pydantic.ValidationError:
+                return response_model.parse_raw(raw_json)
 
     def _add(
         self,
-        content: Content,
+        content: BaseContent,
         raw_response: httpx.Response,
         response_model: type[ModelT],
     ) -> ModelT:
@@ -238,3 +1019,9 @@ class PinMixin:
         content.set_pinned_status(getattr(response, "cid"))
 
         return response
+
+    @staticmethod
+    def _collection(pin: Pin, files: Mapping[str, object]) -> CollectionPin:
+        return CollectionPin(
+            pin=pin, files={path: str(cid) for path, cid in files.items()}
+        )
@@ -1,5 +1,12 @@
 import json
+from collections.abc import AsyncIterable
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
 from datetime import datetime
+from typing import Any
+from typing import Literal
 
 import httpx
 from pydantic import BaseModel
@@ -7,14 +14,34 @@ from pydantic import Field
 
 from ...constants import PINATA_SERVICE
 from ..config import Config
+from ..content import AsyncContent
+from ..content import AsyncDirectoryContent
 from ..content import Content
+from ..content import DirectoryContent
+from ..content.content import BaseContent
+from ..models import CollectionPin
 from ..models import Pin
 from ..models import PinMeta
+from ..profiling import phase
+from ..ratelimit import RateLimit
+from ..ratelimit import RateLimiter
 from .pin_api import AsyncPinAPI
+from .pin_api import AsyncResults
+from .pin_api import DEFAULT_CONCURRENCY
+from .pin_api import Page
 from .pin_api import PinAPI
 from .pin_api import PinMixin
 
 
+# 180 requests a minute per API key, all endpoints together
+PINATA_RATE_LIMIT = RateLimit(180, 60)
+
+# largest page of pins data/pinList returns
+MAX_PAGE_SIZE = 1000
+
+PinataStatus = Literal["all", "pinned", "unpinned"]
+
+
 class PinataAdd(BaseModel):
     IpfsHash: str = Field(description="IPFS multi-hash for the content")
     PinSize: int = Field(description="The pinned content size (in bytes)", gt=0)
@@ -28,10 +55,35 @@ class PinataAdd(BaseModel):
         return self.IpfsHash
 
 
+class PinataMetadata(BaseModel):
+    name: str | None = None
+    # a key set to None is removed from the pin's metadata on update
+    keyvalues: dict[str, Any] | None = None
+
+
+class PinataPin(BaseModel):
+    id: str
+    ipfs_pin_hash: str
+    size: int
+    user_id: str | None = None
+    date_pinned: datetime
+    date_unpinned: datetime | None = None
+    metadata: PinataMetadata = PinataMetadata()
+    regions: list[dict[str, Any]] = []
+
+    @property
+    def cid(self):
+        return self.ipfs_pin_hash
+
+
 class PinantaMixin(PinMixin):
-    global_config = Config(base_url=PINATA_SERVICE)
+    global_config = Config(
+        base_url=PINATA_SERVICE,
+        shared=True,
+        rate_limit=RateLimiter(PINATA_RATE_LIMIT, PINATA_RATE_LIMIT),
+    )
 
-    def _add(self, content: Content, raw_response: httpx.Response, *args, **kwds):
+    def _add(self, content: BaseContent, raw_response: httpx.Response, *args, **kwds):
         response = super()._add(content, raw_response, PinataAdd)
 
         return Pin(
@@ -40,22 +92,256 @@ class PinantaMixin(PinMixin):
             meta=PinMeta.from_model(response, {"IpfsHash"}),
         )
 
+    @staticmethod
+    def _pin_list_params(
+        status: PinataStatus = "pinned",
+        cid: str | None = None,
+        name: str | None = None,
+        keyvalues: Mapping[str, Any] | None = None,
+        pinned_after: datetime | None = None,
+        pinned_before: datetime | None = None,
+        limit: int = MAX_PAGE_SIZE,
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {"status": status, "pageLimit": limit}
+        if cid is not None:
+            params["hashContains"] = cid
+        if name is not None:
+            params["metadata[name]"] = name
+        if keyvalues is not None:
+            params["metadata[keyvalues]"] = json.dumps(keyvalues)
+        if pinned_after is not None:
+            params["pinStart"] = pinned_after.isoformat()
+        if pinned_before is not None:
+            params["pinEnd"] = pinned_before.isoformat()
+        return params
+
+    @staticmethod
+    def _page(raw_response: httpx.Response) -> Page:
+        # rows are validated one at a time, as they are consumed
+        raw_response.raise_for_status()
+        with phase("decode"):
+            page = raw_response.json()
+        return page["count"], page["rows"]
+
+    @staticmethod
+    def _next_page(params: dict, page: Page) -> dict | None:
+        """Parameters of the page following a page, None if it was the last"""
+        count, rows = page
+        offset = params.get("pageOffset", 0) + len(rows)
+        if not rows or offset >= count:
+            return None
+        return params | {"pageOffset": offset}
+
+    @staticmethod
+    def _metadata_body(cid: str, metadata: PinataMetadata) -> dict[str, Any]:
+        return dict(json={"ipfsPinHash": cid} | metadata.dict(exclude_none=True))
+
+    @staticmethod
+    def _pin_by_hash_body(cid: str, metadata: PinataMetadata | None) -> dict[str, Any]:
+        body: dict[str, Any] = {"hashToPin": cid}
+        if metadata is not None:
+            body["pinataMetadata"] = metadata.dict(exclude_none=True)
+        return dict(json=body)
+
 
 class Pinata(PinantaMixin, PinAPI):
     def add(self, content: Content, *, cid_version: int = 1):
+        if (pin := self._cached(content, cid_version)) is not None:
+            return pin
+
         payload = {"pinataOptions": json.dumps({"cidVersion": cid_version})}
         raw = self._post(
-            "pinning/pinFileToIPFS", data=payload, **content._prepare_multipart()
+            "pinning/pinFileToIPFS", **content._prepare_multipart(data=payload)
+        )
+
+        return self._record(content, self._add(content, raw), cid_version)
+
+    def add_directory(
+        self,
+        directory: DirectoryContent,
+        *,
+        cid_version: int = 1,
+        file_cids: bool = False,
+    ) -> CollectionPin:
+        """
+        Pin a whole directory in one request, using the folder upload form.
+        Pinata only returns the root CID, `file_cids` computes the CID of every
+        file locally, reading the directory a second time.
+        """
+        payload = {"pinataOptions": json.dumps({"cidVersion": cid_version})}
+        body = directory._prepare_multipart(data=payload, prefix=directory.basename)
+        raw = self._post("pinning/pinFileToIPFS", **body)
+
+        return self._collect(
+            directory, self._add(directory, raw), cid_version, file_cids
+        )
+
+    def _get_page(self, params: dict) -> Page:
+        return self._page(self._get("data/pinList", query_params=params))
+
+    def iter_pins(
+        self,
+        *,
+        status: PinataStatus = "pinned",
+        cid: str | None = None,
+        name: str | None = None,
+        keyvalues: Mapping[str, Any] | None = None,
+        pinned_after: datetime | None = None,
+        pinned_before: datetime | None = None,
+        limit: int = MAX_PAGE_SIZE,
+    ) -> Generator[PinataPin, None, None]:
+        """
+        Pins of the account matching the filters, in pages of `limit` pins.
+        The next page is fetched while the current one is consumed. Pages
+        are taken by offset: pins unpinned during the listing shift the
+        following ones, list them before unpinning them.
+        """
+        params = self._pin_list_params(
+            status, cid, name, keyvalues, pinned_after, pinned_before, limit
+        )
+        return self._iter_pages(
+            self._get_page, self._next_page, PinataPin.parse_obj, params
         )
 
-        return self._add(content, raw)
+    def pin_by_hash(self, cid: str, metadata: PinataMetadata | None = None) -> None:
+        """Queue the pin of a CID, which Pinata fetches from the IPFS network"""
+        body = self._pin_by_hash_body(cid, metadata)
+        self._request("POST", "pinning/pinByHash", **body).raise_for_status()
+
+    def unpin(self, cid: str) -> None:
+        self._request("DELETE", f"pinning/unpin/{cid}").raise_for_status()
+
+    def unpin_many(
+        self, cids: Iterable[str], *, concurrency: int = DEFAULT_CONCURRENCY
+    ) -> Iterator[tuple[str, None | Exception]]:
+        """
+        Unpin many CIDs over a pool of `concurrency` threads, yielding (cid,
+        None or the exception raised) in completion order. Requests share
+        the client and rate limit of the instance.
+        """
+        return self._map_concurrently(self.unpin, cids, concurrency)
+
+    def update_metadata(self, cid: str, metadata: PinataMetadata) -> None:
+        """Set the name and key-values of a pin, leaving other keys as they are"""
+        body = self._metadata_body(cid, metadata)
+        self._request("PUT", "pinning/hashMetadata", **body).raise_for_status()
+
+    def update_metadata_many(
+        self,
+        updates: Iterable[tuple[str, PinataMetadata]],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> Iterator[tuple[tuple[str, PinataMetadata], None | Exception]]:
+        """
+        Update the metadata of many pins over a pool of `concurrency` threads,
+        yielding ((cid, metadata), None or the exception raised).
+        """
+        return self._map_concurrently(
+            lambda update: self.update_metadata(*update), updates, concurrency
+        )
 
 
 class AsyncPinata(PinantaMixin, AsyncPinAPI):
-    async def add(self, content: Content, *, cid_version: int = 1):
+    async def add(self, content: AsyncContent, *, cid_version: int = 1):
+        if (pin := await self._cached(content, cid_version)) is not None:
+            return pin
+
         payload = {"pinataOptions": json.dumps({"cidVersion": cid_version})}
         raw = await self._post(
-            "pinning/pinFileToIPFS", data=payload, **content._prepare_multipart()
+            "pinning/pinFileToIPFS", **content._prepare_multipart(data=payload)
+        )
+
+        return await self._record(content, self._add(content, raw), cid_version)
+
+    async def add_directory(
+        self,
+        directory: AsyncDirectoryContent,
+        *,
+        cid_version: int = 1,
+        file_cids: bool = False,
+    ) -> CollectionPin:
+        """
+        Pin a whole directory in one request, using the folder upload form.
+        Pinata only returns the root CID, `file_cids` computes the CID of every
+        file locally, reading the directory a second time.
+        """
+        payload = {"pinataOptions": json.dumps({"cidVersion": cid_version})}
+        body = directory._prepare_multipart(data=payload, prefix=directory.basename)
+        raw = await self._post("pinning/pinFileToIPFS", **body)
+
+        return await self._collect(
+            directory, self._add(directory, raw), cid_version, file_cids
+        )
+
+    async def _get_page(self, params: dict) -> Page:
+        return self._page(await self._get("data/pinList", query_params=params))
+
+    def iter_pins(
+        self,
+        *,
+        status: PinataStatus = "pinned",
+        cid: str | None = None,
+        name: str | None = None,
+        keyvalues: Mapping[str, Any] | None = None,
+        pinned_after: datetime | None = None,
+        pinned_before: datetime | None = None,
+        limit: int = MAX_PAGE_SIZE,
+    ) -> AsyncResults[PinataPin]:
+        """
+        Pins of the account matching the filters, in pages of `limit` pins.
+        The next page is fetched while the current one is consumed. Pages
+        are taken by offset: pins unpinned during the listing shift the
+        following ones, list them before unpinning them.
+        Iterated inside `async with`.
+        """
+        params = self._pin_list_params(
+            status, cid, name, keyvalues, pinned_after, pinned_before, limit
+        )
+        return self._iter_pages(
+            self._get_page, self._next_page, PinataPin.parse_obj, params
         )
 
-        return self._add(content, raw)
+    async def pin_by_hash(
+        self, cid: str, metadata: PinataMetadata | None = None
+    ) -> None:
+        """Queue the pin of a CID, which Pinata fetches from the IPFS network"""
+        body = self._pin_by_hash_body(cid, metadata)
+        (await self._request("POST", "pinning/pinByHash", **body)).raise_for_status()
+
+    async def unpin(self, cid: str) -> None:
+        (await self._request("DELETE", f"pinning/unpin/{cid}")).raise_for_status()
+
+    def unpin_many(
+        self,
+        cids: Iterable[str] | AsyncIterable[str],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> AsyncResults[tuple[str, None | Exception]]:
+        """
+        Unpin many CIDs, `concurrency` at a time inside `async with`, yielding
+        (cid, None or the exception raised) in completion order. Requests share
+        the client and rate limit of the instance.
+        """
+        return self._map_concurrently(self.unpin, cids, concurrency)
+
+    async def update_metadata(self, cid: str, metadata: PinataMetadata) -> None:
+        """Set the name and key-values of a pin, leaving other keys as they are"""
+        body = self._metadata_body(cid, metadata)
+        (await self._request("PUT", "pinning/hashMetadata", **body)).raise_for_status()
+
+    def update_metadata_many(
+        self,
+        updates: Iterable[tuple[str, PinataMetadata]]
+        | AsyncIterable[tuple[str, PinataMetadata]],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> AsyncResults[tuple[tuple[str, PinataMetadata], None | Exception]]:
+        """
+        Update the metadata of many pins, `concurrency` at a time inside `async
+        with`, yielding ((cid, metadata), None or the exception raised).
+        """
+
+        async def update(update: tuple[str, PinataMetadata]) -> None:
+            await self.update_metadata(*update)
+
+        return self._map_concurrently(update, updates, concurrency)
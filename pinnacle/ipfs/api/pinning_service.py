@@ -0,0 +1,205 @@
+import json
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any
+
+import httpx
+
+from ..content import AsyncContent
+from ..content import Content
+from ..models import Pin
+from ..models import PinMeta
+from ..models import PinStatus
+from ..models import Status
+from ..models import TextMatchingStrategy
+from ..profiling import phase
+from .pin_api import AsyncPinAPI
+from .pin_api import AsyncResults
+from .pin_api import Page
+from .pin_api import PinAPI
+from .pin_api import PinMixin
+
+# largest page of pins the spec allows
+MAX_PAGE_SIZE = 1000
+
+
+class PinningServiceMixin(PinMixin):
+    """
+    Client of a service implementing the IPFS Pinning Services API, whose
+    configuration is the service's endpoint and access token.
+    https://ipfs.github.io/pinning-services-api-spec/
+
+    Contents are pinned by their CID, computed locally: the service fetches
+    them from the IPFS network, where they must be provided.
+    """
+
+    @staticmethod
+    def _pin_body(pin: Pin) -> dict[str, Any]:
+        return dict(
+            content=pin.json(exclude_none=True),
+            headers={"Content-Type": "application/json"},
+        )
+
+    @staticmethod
+    def _pin(status: PinStatus) -> Pin:
+        return Pin(
+            cid=status.pin.cid,
+            name=status.pin.name,
+            origins=status.pin.origins,
+            meta=PinMeta.from_model(status, {"pin", "delegates", "info"}),
+        )
+
+    @staticmethod
+    def _list_params(
+        cid: Iterable[str] | None = None,
+        name: str | None = None,
+        match: TextMatchingStrategy | None = None,
+        status: Iterable[Status] | None = None,
+        before: datetime | None = None,
+        after: datetime | None = None,
+        meta: Mapping[str, str] | None = None,
+        limit: int = MAX_PAGE_SIZE,
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {"limit": limit}
+        if cid is not None:
+            params["cid"] = ",".join(cid)
+        if name is not None:
+            params["name"] = name
+        if match is not None:
+            params["match"] = match
+        if status is not None:
+            params["status"] = ",".join(status)
+        if before is not None:
+            params["before"] = before.isoformat()
+        if after is not None:
+            params["after"] = after.isoformat()
+        if meta is not None:
+            params["meta"] = json.dumps(meta)
+        return params
+
+    @staticmethod
+    def _page(raw_response: httpx.Response) -> Page:
+        # results are validated one at a time, as they are consumed
+        raw_response.raise_for_status()
+        with phase("decode"):
+            page = raw_response.json()
+        return page["count"], page["results"]
+
+    @staticmethod
+    def _next_page(params: dict, page: Page) -> dict | None:
+        """Parameters of the page following a page, None if it was the last"""
+        count, results = page
+        if not results or len(results) >= count:
+            return None
+        # pins are listed newest first, the next page is before the oldest
+        return params | {"before": results[-1]["created"]}
+
+
+class PinningServiceAPI(PinningServiceMixin, PinAPI):
+    def add(self, content: Content, *, cid_version: int = 1) -> Pin:
+        """Request the pin of a content, which the service may still be pinning"""
+        if (pin := self._cached(content, cid_version)) is not None:
+            return pin
+
+        cid = content.compute_cid(cid_version=cid_version)
+        status = self.add_pin(Pin(cid=cid, name=content.basename))
+
+        return self._record(content, self._pin(status), cid_version)
+
+    def add_pin(self, pin: Pin) -> PinStatus:
+        raw = self._post("pins", **self._pin_body(pin))
+        return self.transform_response(raw, PinStatus)
+
+    def get(self, requestid: str) -> PinStatus:
+        raw = self._get(f"pins/{requestid}")
+        return self.transform_response(raw, PinStatus)
+
+    def replace(self, requestid: str, pin: Pin) -> PinStatus:
+        """Replace a pin, the old one being removed once the new one is pinned"""
+        raw = self._post(f"pins/{requestid}", **self._pin_body(pin))
+        return self.transform_response(raw, PinStatus)
+
+    def remove(self, requestid: str) -> None:
+        self._request("DELETE", f"pins/{requestid}").raise_for_status()
+
+    def _get_page(self, params: dict) -> Page:
+        return self._page(self._get("pins", query_params=params))
+
+    def iter_pins(
+        self,
+        *,
+        cid: Iterable[str] | None = None,
+        name: str | None = None,
+        match: TextMatchingStrategy | None = None,
+        status: Iterable[Status] | None = None,
+        before: datetime | None = None,
+        after: datetime | None = None,
+        meta: Mapping[str, str] | None = None,
+        limit: int = MAX_PAGE_SIZE,
+    ) -> Generator[PinStatus, None, None]:
+        """
+        Pins matching the filters, newest first, in pages of `limit` pins.
+        The next page is fetched while the current one is consumed, so at
+        most two pages are held at once. Only pinned pins are listed unless
+        `status` says otherwise.
+        """
+        params = self._list_params(cid, name, match, status, before, after, meta, limit)
+        return self._iter_pages(
+            self._get_page, self._next_page, PinStatus.parse_obj, params
+        )
+
+
+class AsyncPinningServiceAPI(PinningServiceMixin, AsyncPinAPI):
+    async def add(self, content: AsyncContent, *, cid_version: int = 1) -> Pin:
+        """Request the pin of a content, which the service may still be pinning"""
+        if (pin := await self._cached(content, cid_version)) is not None:
+            return pin
+
+        cid = await content.compute_cid(cid_version=cid_version)
+        status = await self.add_pin(Pin(cid=cid, name=content.basename))
+
+        return await self._record(content, self._pin(status), cid_version)
+
+    async def add_pin(self, pin: Pin) -> PinStatus:
+        raw = await self._post("pins", **self._pin_body(pin))
+        return self.transform_response(raw, PinStatus)
+
+    async def get(self, requestid: str) -> PinStatus:
+        raw = await self._get(f"pins/{requestid}")
+        return self.transform_response(raw, PinStatus)
+
+    async def replace(self, requestid: str, pin: Pin) -> PinStatus:
+        """Replace a pin, the old one being removed once the new one is pinned"""
+        raw = await self._post(f"pins/{requestid}", **self._pin_body(pin))
+        return self.transform_response(raw, PinStatus)
+
+    async def remove(self, requestid: str) -> None:
+        (await self._request("DELETE", f"pins/{requestid}")).raise_for_status()
+
+    async def _get_page(self, params: dict) -> Page:
+        return self._page(await self._get("pins", query_params=params))
+
+    def iter_pins(
+        self,
+        *,
+        cid: Iterable[str] | None = None,
+        name: str | None = None,
+        match: TextMatchingStrategy | None = None,
+        status: Iterable[Status] | None = None,
+        before: datetime | None = None,
+        after: datetime | None = None,
+        meta: Mapping[str, str] | None = None,
+        limit: int = MAX_PAGE_SIZE,
+    ) -> AsyncResults[PinStatus]:
+        """
+        Pins matching the filters, newest first, in pages of `limit` pins.
+        The next page is fetched while the current one is consumed, so at
+        most two pages are held at once. Only pinned pins are listed unless
+        `status` says otherwise. Iterated inside `async with`.
+        """
+        params = self._list_params(cid, name, match, status, before, after, meta, limit)
+        return self._iter_pages(
+            self._get_page, self._next_page, PinStatus.parse_obj, params
+        )
@@ -3,12 +3,32 @@ from pydantic import BaseModel
 
 from ...constants.pin_services import WEB3_STORAGE_SERVICE
 from ..config import Config
+from ..content import AsyncCar
+from ..content import AsyncContent
+from ..content import AsyncDirectoryContent
+from ..content import AsyncShardedCar
+from ..content import Car
 from ..content import Content
+from ..content import DirectoryContent
+from ..content import ShardedCar
+from ..content.car import BaseCar
+from ..content.car import DEFAULT_SHARD_SIZE
+from ..content.content import BaseContent
+from ..content.directory import BaseDirectoryContent
+from ..models import CollectionPin
 from ..models import Pin
 from ..models import PinMeta
+from ..ratelimit import RateLimit
+from ..ratelimit import RateLimiter
 from .pin_api import AsyncPinAPI
 from .pin_api import PinAPI
 from .pin_api import PinMixin
+from .pin_api import SHARD_CONCURRENCY
+from .pin_api import SHARD_RETRIES
+
+
+# 30 requests per 10 seconds per API token, all endpoints together
+WEB3_STORAGE_RATE_LIMIT = RateLimit(30, 10)
 
 
 class Web3StorageAdd(BaseModel):
@@ -16,10 +36,20 @@ class Web3StorageAdd(BaseModel):
     carCid: str
 
 
+class Web3StorageCarAdd(BaseModel):
+    cid: str
+
+
 class Web3StorageMixin(PinMixin):
-    global_config = Config(base_url=WEB3_STORAGE_SERVICE)
+    global_config = Config(
+        base_url=WEB3_STORAGE_SERVICE,
+        shared=True,
+        rate_limit=RateLimiter(WEB3_STORAGE_RATE_LIMIT, WEB3_STORAGE_RATE_LIMIT),
+    )
+    # larger files are uploaded as CAR shards
+    max_request_size = DEFAULT_SHARD_SIZE
 
-    def _add(self, content: Content, raw_response: httpx.Response, *args, **kwds):
+    def _add(self, content: BaseContent, raw_response: httpx.Response, *args, **kwds):
         response = super()._add(content, raw_response, Web3StorageAdd)
         return Pin(
             cid=response.cid,
@@ -27,16 +57,136 @@ class Web3StorageMixin(PinMixin):
             meta=PinMeta.from_model(response, exclude={"cid"}),
         )
 
+    def _add_shards(
+        self, content: BaseContent, raw_responses: list[httpx.Response]
+    ) -> Pin:
+        response = self.transform_response(raw_responses[-1], Web3StorageCarAdd)
+        content.set_pinned_status(response.cid)
+
+        return Pin(cid=response.cid, name=content.basename)
+
+    def _add_directory(
+        self, directory: BaseDirectoryContent, raw_response: httpx.Response
+    ) -> Pin:
+        response = self.transform_response(raw_response, Web3StorageCarAdd)
+        directory.set_pinned_status(response.cid)
+
+        return Pin(cid=response.cid, name=directory.basename)
+
+    def _add_car(self, car: BaseCar, raw_response: httpx.Response) -> CollectionPin:
+        response = self.transform_response(raw_response, Web3StorageCarAdd)
+        return self._collection(Pin(cid=response.cid), car.files)
+
 
 class Web3Storage(Web3StorageMixin, PinAPI):
     def add(self, content: Content, *, cid_version: int = 1):
+        if content.size > self.max_request_size:
+            return self.add_sharded(content, cid_version=cid_version)
+
+        if (pin := self._cached(content, cid_version)) is not None:
+            return pin
+
         raw = self._post("upload", **content._prepare_multipart())
 
-        return self._add(content, raw)
+        return self._record(content, self._add(content, raw), cid_version)
+
+    def add_sharded(
+        self,
+        content: Content,
+        *,
+        cid_version: int = 1,
+        shard_size: int | None = None,
+        retries: int = SHARD_RETRIES,
+    ) -> Pin:
+        """Upload a file as several CARs, each under the request size limit"""
+        if (pin := self._cached(content, cid_version)) is not None:
+            return pin
+
+        car = ShardedCar(
+            content.path, shard_size or self.max_request_size, cid_version=cid_version
+        ).build()
+        raw = self._upload_shards("car", car, None, retries)
+
+        return self._record(content, self._add_shards(content, raw), cid_version)
+
+    def add_directory(
+        self, directory: DirectoryContent, *, file_cids: bool = False
+    ) -> CollectionPin:
+        """
+        Upload a whole directory in one multipart request. The service only
+        returns the root CID, `file_cids` computes the CID of every file
+        locally, reading the directory a second time.
+        """
+        raw = self._post("upload", **directory._prepare_multipart())
+
+        return self._collect(
+            directory, self._add_directory(directory, raw), file_cids=file_cids
+        )
+
+    def add_car(self, car: Car) -> CollectionPin:
+        """Upload a whole collection as a single CAR"""
+        if not car.built:
+            car.build()
+
+        raw = self._post("car", **car._prepare())
+
+        return self._add_car(car, raw)
 
 
 class AsyncWeb3Storage(Web3StorageMixin, AsyncPinAPI):
-    async def add(self, content: Content, *, cid_version: int = 1):
+    async def add(self, content: AsyncContent, *, cid_version: int = 1):
+        if content.size > self.max_request_size:
+            return await self.add_sharded(content, cid_version=cid_version)
+
+        if (pin := await self._cached(content, cid_version)) is not None:
+            return pin
+
         raw = await self._post("upload", **content._prepare_multipart())
 
-        return self._add(content, raw)
+        return await self._record(content, self._add(content, raw), cid_version)
+
+    async def add_sharded(
+        self,
+        content: AsyncContent,
+        *,
+        cid_version: int = 1,
+        shard_size: int | None = None,
+        retries: int = SHARD_RETRIES,
+        concurrency: int = SHARD_CONCURRENCY,
+    ) -> Pin:
+        """
+        Upload a file as several CARs, each under the request size limit.
+        Shards are uploaded concurrently and a failed one is retried alone.
+        """
+        if (pin := await self._cached(content, cid_version)) is not None:
+            return pin
+
+        car = await AsyncShardedCar(
+            content.path, shard_size or self.max_request_size, cid_version=cid_version
+        ).build()
+        raw = await self._upload_shards("car", car, None, retries, concurrency)
+
+        return await self._record(content, self._add_shards(content, raw), cid_version)
+
+    async def add_directory(
+        self, directory: AsyncDirectoryContent, *, file_cids: bool = False
+    ) -> CollectionPin:
+        """
+        Upload a whole directory in one multipart request. The service only
+        returns the root CID, `file_cids` computes the CID of every file
+        locally, reading the directory a second time.
+        """
+        raw = await self._post("upload", **directory._prepare_multipart())
+
+        return await self._collect(
+            directory, self._add_directory(directory, raw), file_cids=file_cids
+        )
+
+    async def add_car(self, car: AsyncCar) -> CollectionPin:
+        """Upload a whole collection as a single CAR"""
+        if not car.built:
+            await car.build()
+
+        raw = await self._post("car", **car._prepare())
+
+        return self._add_car(car, raw)
@@ -0,0 +1,115 @@
+import threading
+import time
+from typing import Literal
+
+import httpx
+
+State = Literal["closed", "open", "half-open"]
+
+
+def is_outage(error: BaseException) -> bool:
+    """Whether an error tells the service is unavailable, not the request wrong"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, httpx.TransportError | TimeoutError)
+
+
+class CircuitBreaker:
+    """
+    Health of a pinning service, to stop sending it requests while it is down.
+
+    The breaker opens after `failures` consecutive outages, or once the moving
+    average of its latency exceeds `max_latency` seconds. After `reset_timeout`
+    seconds it half-opens: `probes` requests are let through, the first one
+    succeeding closes it, a failing one opens it again.
+    """
+
+    # weight of the last call in the latency average
+    smoothing = 0.3
+
+    def __init__(
+        self,
+        failures: int = 5,
+        *,
+        max_latency: float | None = None,
+        reset_timeout: float = 30.0,
+        probes: int = 1,
+    ) -> None:
+        self.failures = failures
+        self.max_latency = max_latency
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+
+        self._lock = threading.Lock()
+        self._state: State = "closed"
+        self._failed = 0
+        self._latency: float | None = None
+        self._opened_at = 0.0
+        self._probing = 0
+
+    @property
+    def state(self) -> State:
+        with self._lock:
+            if self._state == "open" and self._reset_due():
+                return "half-open"
+            return self._state
+
+    @property
+    def latency(self) -> float | None:
+        """Moving average of the latency, in seconds"""
+        return self._latency
+
+    def _reset_due(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.reset_timeout
+
+    def _open(self) -> None:
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._probing = 0
+
+    def _close(self) -> None:
+        self._state = "closed"
+        self._failed = 0
+        self._latency = None
+        self._probing = 0
+
+    def allow(self) -> bool:
+        """Whether a request may be sent, taking a probe slot if half-open"""
+        with self._lock:
+            if self._state == "open" and self._reset_due():
+                self._state = "half-open"
+
+            if self._state == "closed":
+                return True
+            if self._state == "half-open" and self._probing < self.probes:
+                self._probing += 1
+                return True
+            return False
+
+    def record_success(self, elapsed: float) -> None:
+        with self._lock:
+            if self._state == "half-open":
+                self._close()
+                return
+
+            self._failed = 0
+            if self._latency is None:
+                self._latency = elapsed
+            else:
+                self._latency += self.smoothing * (elapsed - self._latency)
+
+            if self.max_latency is not None and self._latency > self.max_latency:
+                self._open()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failed += 1
+            if self._state == "half-open" or self._failed >= self.failures:
+                self._open()
+
+    def release(self) -> None:
+        """Give back a probe slot, for a request neither failing nor succeeding"""
+        with self._lock:
+            if self._state == "half-open":
+                self._probing = max(self._probing - 1, 0)
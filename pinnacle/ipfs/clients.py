@@ -0,0 +1,97 @@
+"""
+Process-wide registry of HTTP clients, shared by pinning services.
+
+Clients are keyed by origin and pool options, so every service talking to
+the same host reuses the same connection pool (and TLS sessions), whatever
+the number of PinAPI instances. Async clients are also keyed by event loop:
+their connections cannot outlive the loop that opened them.
+"""
+import asyncio
+import atexit
+import threading
+from typing import Any
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+
+import httpx
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .config import Config
+
+ClientKey = tuple[str, str | None, tuple[Any, ...], bool]
+
+
+def _client_key(config: "Config") -> ClientKey:
+    url = urlsplit(config.url)
+    limits = config.limits
+    pool = (
+        limits.max_connections,
+        limits.max_keepalive_connections,
+        limits.keepalive_expiry,
+    )
+    return f"{url.scheme}://{url.netloc}", config.uds, pool, config.use_http2
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class ClientRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clients: dict[ClientKey, httpx.Client] = {}
+        self._async_clients: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[ClientKey, httpx.AsyncClient]
+        ] = WeakKeyDictionary()
+        # async clients created outside of a running loop
+        self._unbound_clients: dict[ClientKey, httpx.AsyncClient] = {}
+
+    def client(self, config: "Config") -> httpx.Client:
+        """Shared client for the host of a configuration"""
+        key = _client_key(config)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or client.is_closed:
+                client = self._clients[key] = httpx.Client(**config.client_options())
+            return client
+
+    def async_client(self, config: "Config") -> httpx.AsyncClient:
+        """Shared async client for the host of a configuration, in the running loop"""
+        key = _client_key(config)
+        with self._lock:
+            if (loop := _running_loop()) is None:
+                clients = self._unbound_clients
+            else:
+                clients = self._async_clients.setdefault(loop, {})
+
+            client = clients.get(key)
+            if client is None or client.is_closed:
+                client = clients[key] = httpx.AsyncClient(
+                    **config.client_options(asynchronous=True)
+                )
+            return client
+
+    def close(self) -> None:
+        """Close every shared sync client"""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close every shared async client of the running loop"""
+        with self._lock:
+            if (loop := _running_loop()) is None:
+                clients, self._unbound_clients = self._unbound_clients, {}
+            else:
+                clients = self._async_clients.pop(loop, {})
+        for client in clients.values():
+            await client.aclose()
+
+
+CLIENTS = ClientRegistry()
+atexit.register(CLIENTS.close)
@@ -1,5 +1,9 @@
+import hashlib
+import importlib.util
+import logging
 import os
 from collections.abc import Generator
+from pathlib import Path
 from typing import Any
 from typing import Self
 from urllib.parse import quote
@@ -12,8 +16,17 @@ from dotenv import dotenv_values
 from httpx import Request
 from httpx import Response
 
+from .daemon import api_address
+from .daemon import parse_multiaddr
+from .metrics import METRICS
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from .retry import DEFAULT_RETRY
+from .retry import RetryPolicy
 from pinnacle.constants.pin_services import LOCAL_SERVICE
 
+logger = logging.getLogger(__name__)
+
 
 class ENVNotFoundError(KeyError):
     pass
@@ -45,6 +58,13 @@ class BearerAuth(httpx.Auth):
         """Authentication property. Formated to be ready for request"""
         return f"Bearer {self.token}" if self.token else None
 
+    @property
+    def fingerprint(self) -> str | None:
+        """Short digest of the token, telling accounts apart without exposing it"""
+        if not self.token:
+            return None
+        return hashlib.sha256(self.token.encode()).hexdigest()[:16]
+
     def auth_flow(self, request: Request) -> Generator[Request, Response, None]:
         if self.bearer_token:
             request.headers["Authorization"] = self.bearer_token
@@ -74,6 +94,16 @@ def sanitize_url(url: str) -> str:
     return urlunsplit(parts)
 
 
+# connections are kept longer than httpx's 5 seconds, pins come in bursts
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0
+)
+
+
+def _h2_installed() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
 class Config:
     def __init__(
         self,
@@ -81,11 +111,36 @@ class Config:
         auth: httpx.Auth | None = None,
         extra_params: dict[str, Any] | None = None,
         authless: bool = False,
+        *,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        http2: bool | None = None,
+        shared: bool = False,
+        retry: RetryPolicy = DEFAULT_RETRY,
+        rate_limit: RateLimiter | None = None,
+        uds: str | None = None,
+        metrics: Metrics | None = METRICS,
     ) -> None:
         self.url = sanitize_url(base_url)
         self.auth = auth
         self.authless = authless
 
+        # pool of the HTTP clients, http2=None negotiates HTTP/2 when h2 is
+        # installed (the `http2` extra), http2=True requires it. A shared
+        # configuration takes its clients from CLIENTS, one per host, instead
+        # of a client per PinAPI instance.
+        self.limits = limits
+        self.http2 = http2
+        self.shared = shared
+        # path of a unix socket the service listens on, instead of TCP
+        self.uds = uds
+
+        # failed requests are retried by the PinAPI, RetryPolicy(0) disables it
+        self.retry = retry
+        # requests wait on the limiter before being sent, retries included
+        self.rate_limit = rate_limit
+        # requests are recorded to the registry, metrics=None disables it
+        self.metrics = metrics
+
         # extra_params is optional arguments of httpx methods.
         # https://www.python-httpx.org/api/#helper-functions
         self.extra_params = {} if extra_params is None else extra_params
@@ -100,6 +155,45 @@ class Config:
     def update_params(self, params: dict[str, Any]) -> None:
         self.extra_params.update(params)
 
+    @classmethod
+    def from_multiaddr(cls, multiaddr: str, **kwds) -> Self:
+        """Alternative constructor for a service listening on a multiaddr"""
+        url, uds = parse_multiaddr(multiaddr)
+        return cls(url, uds=uds, **kwds)
+
+    @classmethod
+    def from_ipfs_repo(cls, repo: Path | None = None, **kwds) -> Self:
+        """Alternative constructor for the daemon of an IPFS repository"""
+        url, uds = api_address(repo)
+        return cls(url, uds=uds, **kwds)
+
+    @property
+    def account(self) -> str:
+        """URL of the service, suffixed by the fingerprint of its token if any"""
+        if isinstance(self.auth, BearerAuth) and self.auth.fingerprint is not None:
+            return f"{self.url}#{self.auth.fingerprint}"
+        return self.url
+
+    @property
+    def use_http2(self) -> bool:
+        if self.http2 is not None:
+            return self.http2
+        if _h2_installed():
+            return True
+
+        logger.debug("h2 is not installed, %s is reached over HTTP/1.1", self.url)
+        return False
+
+    def client_options(self, asynchronous: bool = False) -> dict[str, Any]:
+        """Setup a parameter dict ready for httpx client creation"""
+        if self.uds is None:
+            return dict(limits=self.limits, http2=self.use_http2)
+
+        transport = httpx.AsyncHTTPTransport if asynchronous else httpx.HTTPTransport
+        return dict(
+            transport=transport(uds=self.uds, limits=self.limits, http2=self.use_http2)
+        )
+
     def setup(self) -> dict[str, Any]:
         """Setup a parameter dict ready for httpx operation"""
         if self.auth:
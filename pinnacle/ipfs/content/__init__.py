@@ -1,11 +1,33 @@
+from .car import AsyncCar
+from .car import AsyncShardedCar
+from .car import Car
+from .car import ShardedCar
 from .content import AsyncContent
 from .content import Content
 from .content import Gateway
 from .content import GATEWAYS_STORE
+from .directory import AsyncDirectoryContent
+from .directory import DirectoryContent
+from .mapped import AsyncMappedContent
+from .mapped import MappedContent
+from .parallel import compute_cids
+from .unixfs import CID
+from .unixfs import compute_cid
 
 __all__ = (
     "Content",
     "AsyncContent",
+    "MappedContent",
+    "AsyncMappedContent",
+    "DirectoryContent",
+    "AsyncDirectoryContent",
+    "Car",
+    "AsyncCar",
+    "ShardedCar",
+    "AsyncShardedCar",
     "Gateway",
     "GATEWAYS_STORE",
+    "CID",
+    "compute_cid",
+    "compute_cids",
 )
@@ -0,0 +1,369 @@
+"""
+Streaming CARv1 writer, packing a collection of files into a single upload.
+
+A CAR starts with a header naming its root, so the DAG is built twice: a first
+pass only hashes the files to find the root CID, the CID of every file and
+the exact length of the archive. The second pass streams the blocks as they
+are built: file data is never held, but the CID of every block written is,
+to skip duplicates, so memory still grows with the number of distinct blocks.
+"""
+import os
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from itertools import chain
+from typing import Any
+from typing import BinaryIO
+from typing import Self
+
+import anyio
+
+from .content import BaseContent
+from .stream import DEFAULT_CHUNK_SIZE
+from .unixfs import Block
+from .unixfs import CID
+from .unixfs import DEFAULT_CHUNKER
+from .unixfs import iter_file_chunks
+from .unixfs import Link
+from .unixfs import parse_chunker
+from .unixfs import Tree
+from .unixfs import UnixFSBuilder
+from .unixfs import varint
+from .unixfs import walk_tree
+from pinnacle.type_aliases import PathType
+
+# providers cap request bodies at 100 MB
+DEFAULT_SHARD_SIZE = 100 * 1000 * 1000
+
+
+def _cbor_head(major: int, n: int) -> bytes:
+    if n < 24:
+        return bytes([major << 5 | n])
+    if n < 0x100:
+        return bytes([major << 5 | 24, n])
+    if n < 0x10000:
+        return bytes([major << 5 | 25]) + n.to_bytes(2, "big")
+    return bytes([major << 5 | 26]) + n.to_bytes(4, "big")
+
+
+def encode_car_header(roots: list[CID]) -> bytes:
+    """Encode a CARv1 header: a varint-prefixed dag-cbor {roots, version} map"""
+    cbor = _cbor_head(5, 2)  # map of 2 pairs, keys in dag-cbor canonical order
+    cbor += _cbor_head(3, 5) + b"roots" + _cbor_head(4, len(roots))
+    for root in roots:
+        # CIDs are tag 42 over their binary form, prefixed by the identity multibase
+        cid = b"\x00" + root.buffer
+        cbor += b"\xd8\x2a" + _cbor_head(2, len(cid)) + cid
+    cbor += _cbor_head(3, 7) + b"version" + _cbor_head(0, 1)
+
+    return varint(len(cbor)) + cbor
+
+
+def _frame_head(block: Block) -> bytes:
+    # a block frame is the varint length of CID and data, the CID, the data
+    cid = block.cid.buffer
+    return varint(len(cid) + len(block.data)) + cid
+
+
+def _frame_size(cid: CID, length: int) -> int:
+    buffer = cid.buffer
+    return len(varint(len(buffer) + length)) + len(buffer) + length
+
+
+class BaseCar:
+    """A collection of files, packed as a UnixFS directory in a CARv1 archive"""
+
+    mimetype = "application/vnd.ipld.car"
+
+    def __init__(
+        self,
+        tree: Tree,
+        *,
+        cid_version: int = 1,
+        chunker: str = DEFAULT_CHUNKER,
+        raw_leaves: bool | None = None,
+    ) -> None:
+        self.tree = tree
+        self.builder = UnixFSBuilder(cid_version, raw_leaves)
+        self.chunk_size = parse_chunker(chunker)
+
+        self.root: CID | None = None
+        self.files: dict[str, CID] = {}
+        self.size = 0
+
+    @classmethod
+    def from_directory(cls, path: PathType, **kwds) -> Self:
+        """Pack a directory, its CID is the root of the CAR"""
+        return cls(walk_tree(path), **kwds)
+
+    @classmethod
+    def from_contents(cls, contents: Iterable[BaseContent], **kwds) -> Self:
+        """Pack contents in a directory, like kubo's wrap-with-directory"""
+        tree: dict[str, PathType | Tree] = {}
+        for content in contents:
+            if content.basename in tree:
+                raise ValueError(
+                    f"Duplicate name in the collection: {content.basename}"
+                )
+            tree[content.basename] = content.path
+        return cls(tree, **kwds)
+
+    @property
+    def built(self) -> bool:
+        return self.root is not None
+
+    def _blocks(self, files: dict[str, CID] | None = None) -> Iterator[Block]:
+        """Build every distinct block of the DAG, the root directory is last"""
+        # CIDs are kept in their binary form, smaller than CID instances
+        seen: set[bytes] = set()
+        for block in self.builder.build_tree(self.tree, self.chunk_size, files):
+            if (cid := block.cid.buffer) not in seen:
+                seen.add(cid)
+                yield block
+
+    def _index(self):
+        """First pass: hash the collection without keeping any block"""
+        files: dict[str, CID] = {}
+        size = 0
+        for block in self._blocks(files):
+            size += len(_frame_head(block)) + len(block.data)
+
+        self.root = block.cid
+        self.files = files
+        self.size = len(encode_car_header([self.root])) + size
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self.root is None:
+            raise ValueError("Car has not been built")
+
+        yield encode_car_header([self.root])
+        for block in self._blocks():
+            yield _frame_head(block)
+            yield block.data
+
+    def write(self, file: BinaryIO) -> int:
+        """Write the CAR to a binary file, returning the number of bytes written"""
+        return sum(file.write(frame) for frame in self)
+
+    def _stream(self) -> Any:
+        raise NotImplementedError  # pragma: no cover
+
+    def _prepare(self, mimetype: str | None = None):
+        """Prepare the CAR for upload request"""
+        if not self.built:
+            raise ValueError("Car has not been built")
+
+        return dict(
+            content=self._stream(),
+            headers={
+                "Content-Type": mimetype or self.mimetype,
+                "Content-Length": str(self.size),
+            },
+        )
+
+
+class CarStream:
+    """Re-iterable byte stream of a built CAR"""
+
+    def __init__(self, car: Iterable[bytes]) -> None:
+        self.car = car
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self.car)
+
+
+def _take(frames: Iterator[bytes], limit: int) -> list[bytes]:
+    """Pull frames until at least `limit` bytes are gathered or frames run out"""
+    batch, size = [], 0
+    for frame in frames:
+        batch.append(frame)
+        size += len(frame)
+        if size >= limit:
+            break
+    return batch
+
+
+class AsyncCarStream:
+    """
+    Async byte stream of a built CAR. Blocks are built in a worker thread,
+    in batches so that collections of small files don't cost a thread hop each.
+    """
+
+    def __init__(
+        self, car: Iterable[bytes], batch_size: int = DEFAULT_CHUNK_SIZE
+    ) -> None:
+        self.car = car
+        self.batch_size = batch_size
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        frames = iter(self.car)
+        while batch := await anyio.to_thread.run_sync(_take, frames, self.batch_size):
+            for frame in batch:
+                yield frame
+
+
+class Car(BaseCar):
+    def build(self) -> Self:
+        self._index()
+        return self
+
+    def _stream(self) -> CarStream:
+        return CarStream(self)
+
+
+class AsyncCar(BaseCar):
+    async def build(self) -> Self:
+        await anyio.to_thread.run_sync(self._index)
+        return self
+
+    def _stream(self) -> AsyncCarStream:
+        return AsyncCarStream(self)
+
+
+class CarShard:
+    """
+    One CAR of a sharded file: a contiguous range of the file's leaves, plus the
+    inner nodes built while reading it. Leaves are rebuilt from the file when
+    the shard is streamed, only inner nodes (a fraction of a percent of the
+    file) are kept in memory.
+    """
+
+    def __init__(self, car: "BaseShardedCar", start: int) -> None:
+        self.car = car
+        self.start = self.stop = start
+        self.blocks: list[Block] = []
+        self.frames = 0  # length of the shard without its header
+
+    @property
+    def size(self) -> int:
+        return len(encode_car_header([self.car.root])) + self.frames
+
+    def __iter__(self) -> Iterator[bytes]:
+        car = self.car
+        yield encode_car_header([car.root])
+
+        chunks = iter_file_chunks(car.path, car.chunk_size, self.start, self.stop)
+        leaves = car.builder.leaves(chunks, first=self.start == 0)
+        for block in chain(leaves, self.blocks):
+            yield _frame_head(block)
+            yield block.data
+
+
+# header length with the longest CID the builder produces, to size shards
+# before the root is known
+_HEADER_BOUND = len(encode_car_header([CID.hash(b"")]))
+
+
+class BaseShardedCar:
+    """
+    A single file packed in several CARs, each under `max_size` bytes.
+
+    Every shard names the root of the whole file in its header. Providers
+    assemble the DAG once all shards are uploaded, so shards can be sent
+    concurrently and a failed one retried alone.
+    """
+
+    mimetype = BaseCar.mimetype
+
+    def __init__(
+        self,
+        path: PathType,
+        max_size: int = DEFAULT_SHARD_SIZE,
+        *,
+        cid_version: int = 1,
+        chunker: str = DEFAULT_CHUNKER,
+        raw_leaves: bool | None = None,
+    ) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.builder = UnixFSBuilder(cid_version, raw_leaves)
+        self.chunk_size = parse_chunker(chunker)
+
+        self._root: CID | None = None
+        self.shards: list[CarShard] = []
+
+    @property
+    def built(self) -> bool:
+        return self._root is not None
+
+    @property
+    def root(self) -> CID:
+        if self._root is None:
+            raise ValueError("Car has not been built")
+        return self._root
+
+    @property
+    def size(self) -> int:
+        return sum(shard.size for shard in self.shards)
+
+    def _fit(self, offset: int, frame: int) -> CarShard:
+        """Shard to add a frame to, a new one is started once it is full"""
+        if _HEADER_BOUND + frame > self.max_size:
+            raise ValueError(f"A block does not fit in a CAR of {self.max_size} bytes")
+
+        if not self.shards or (
+            _HEADER_BOUND + self.shards[-1].frames + frame > self.max_size
+        ):
+            self.shards.append(CarShard(self, offset))
+
+        shard = self.shards[-1]
+        shard.frames += frame
+        return shard
+
+    def _index(self):
+        """First pass: hash the file, split its blocks and keep its inner nodes"""
+        if os.path.getsize(self.path) == 0:
+            raise ValueError("An empty file cannot be sharded")
+
+        self.shards = []
+        offset = 0
+
+        def leaves() -> Iterator[Link]:
+            nonlocal offset
+            chunks = iter_file_chunks(self.path, self.chunk_size)
+            for link in self.builder.leaf_links(chunks):
+                shard = self._fit(offset, _frame_size(link.cid, link.tsize))
+                offset = shard.stop = offset + link.filesize
+                yield link
+
+        nodes = self.builder.build_links(leaves())
+        while True:
+            try:
+                block = next(nodes)
+            except StopIteration as stop:
+                self._root = stop.value.cid
+                break
+
+            shard = self._fit(offset, len(_frame_head(block)) + len(block.data))
+            shard.blocks.append(block)
+
+    def _stream(self, shard: CarShard) -> Any:
+        raise NotImplementedError  # pragma: no cover
+
+    def _prepare(self, shard: CarShard, mimetype: str | None = None):
+        """Prepare a shard for upload request"""
+        return dict(
+            content=self._stream(shard),
+            headers={
+                "Content-Type": mimetype or self.mimetype,
+                "Content-Length": str(shard.size),
+            },
+        )
+
+
+class ShardedCar(BaseShardedCar):
+    def build(self) -> Self:
+        self._index()
+        return self
+
+    def _stream(self, shard: CarShard) -> CarStream:
+        return CarStream(shard)
+
+
+class AsyncShardedCar(BaseShardedCar):
+    async def build(self) -> Self:
+        await anyio.to_thread.run_sync(self._index)
+        return self
+
+    def _stream(self, shard: CarShard) -> AsyncCarStream:
+        return AsyncCarStream(shard)
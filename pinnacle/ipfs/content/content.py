@@ -1,13 +1,31 @@
 import mimetypes
+import os
 import posixpath
+from collections.abc import AsyncIterable
+from collections.abc import Iterable
 from io import UnsupportedOperation
+from typing import Any
 from typing import cast
+from typing import ClassVar
 from typing import IO
 from typing import Literal
 
 import anyio
 from anyio import AsyncFile
 
+from ..profiling import phase
+from .stream import AsyncFileStream
+from .stream import AsyncMemoryStream
+from .stream import AsyncMultipartStream
+from .stream import BaseMultipartStream
+from .stream import Chunk
+from .stream import DEFAULT_CHUNK_SIZE
+from .stream import FileStream
+from .stream import MemoryStream
+from .stream import MultipartFile
+from .stream import MultipartStream
+from .unixfs import compute_cid
+from .unixfs import DEFAULT_CHUNKER
 from pinnacle.type_aliases import PathType
 
 
@@ -74,10 +92,23 @@ GatewayName = Literal["local", "local_ip", "ipfs", "nftstorage", "pinata", "w3s"
 
 
 class BaseContent:
-    def __init__(self, path: PathType) -> None:
+    _multipart_stream: ClassVar[type[BaseMultipartStream]] = MultipartStream
+    _memory_stream: ClassVar[type[MemoryStream | AsyncMemoryStream]] = MemoryStream
+
+    def __init__(
+        self,
+        path: PathType,
+        *,
+        streaming: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
         self.path = path
+        self.streaming = streaming
+        self.chunk_size = chunk_size
         self.is_pinned = False
         self.cid: str | None = None
+        # CID of the content on every provider it was pinned to
+        self.cids: dict[str, str] = {}
 
         self._gateway: Gateway | None = None
         self._file: IO[bytes] | AsyncFile[bytes] | None = None
@@ -90,6 +121,10 @@ class BaseContent:
     def basename(self) -> str:
         return posixpath.basename(self.path)
 
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
     @property
     def opened(self):
         return self._file is not None
@@ -119,33 +154,71 @@ class BaseContent:
 
         return f"ipfs://{self.cid}"
 
-    def set_pinned_status(self, cid: str):
+    def set_pinned_status(self, cid: str, provider: str | None = None):
         self.is_pinned = True
         self.cid = cid
+        if provider is not None:
+            self.cids[provider] = cid
+
+    def _stream(self) -> Any:
+        """Chunked byte stream over the content's file, used in streaming mode"""
+        raise NotImplementedError  # pragma: no cover
 
     def _prepare(self):
         """Prepare the content for pinning request"""
+        with phase("encode"):
+            if self.streaming:
+                return dict(
+                    content=self._stream(),
+                    headers={
+                        "Content-Type": self.mimetype,
+                        "Content-Length": str(self.size),
+                    },
+                )
+
+            if self._bytes is None:
+                raise ValueError("Content's bytes has not been read")
+
+            return dict(
+                content=self._bytes,
+                headers={"Content-Type": self.mimetype},
+            )
+
+    def _multipart_file(self, include_mimetype: bool = False) -> MultipartFile:
+        """The content as a part of a multipart body, with other contents"""
+        mimetype = self.mimetype if include_mimetype else None
+        if self.streaming:
+            return MultipartFile(self.basename, self._stream(), self.size, mimetype)
 
         if self._bytes is None:
             raise ValueError("Content's bytes has not been read")
 
-        return dict(
-            content=self._bytes,
-            headers={"Content-Type": self.mimetype},
-        )
+        stream = self._memory_stream(memoryview(self._bytes), self.chunk_size)
+        return MultipartFile(self.basename, stream, len(self._bytes), mimetype)
 
-    def _prepare_multipart(self, include_mimetype: bool = False):
+    def _prepare_multipart(
+        self,
+        include_mimetype: bool = False,
+        data: dict[str, Any] | None = None,
+    ):
         """Prepare the content for MULTIPART pinning request"""
+        with phase("encode"):
+            if self.streaming:
+                body = self._multipart_stream(
+                    [self._multipart_file(include_mimetype)], data
+                )
 
-        if self._bytes is None:
-            raise ValueError("Content's bytes has not been read")
+                return dict(content=body, headers=body.headers)
 
-        if include_mimetype:
-            files = {"file": (self.basename, self._bytes, self.mimetype)}
-        else:
-            files = {"file": (self.basename, self._bytes)}  # type: ignore
+            if self._bytes is None:
+                raise ValueError("Content's bytes has not been read")
 
-        return dict(files=files)
+            if include_mimetype:
+                files = {"file": (self.basename, self._bytes, self.mimetype)}
+            else:
+                files = {"file": (self.basename, self._bytes)}  # type: ignore
+
+            return dict(files=files) if data is None else dict(files=files, data=data)
 
     def add_gateway(self, gateway: Gateway):
         """Register a new gateway to use when calling get_gateway"""
@@ -182,8 +255,10 @@ class Content(BaseContent):
         if self.opened:
             raise UnsupportedOperation("Content is already opened")
 
-        self._file = open(self.path, "rb")
-        self._bytes = self._file.read()
+        with phase("open"):
+            self._file = open(self.path, "rb")
+            if not self.streaming:
+                self._bytes = self._file.read()
         return self
 
     def close(self):
@@ -191,6 +266,23 @@ class Content(BaseContent):
             raise UnsupportedOperation("Content is not yet opened")
 
         cast(IO[bytes], self._file).close()
+        self._bytes = None
+
+    def _stream(self) -> Iterable[Chunk]:
+        if self._file is None:
+            raise ValueError("Content's file has not been opened")
+
+        return FileStream(cast(IO[bytes], self._file), self.chunk_size)
+
+    def compute_cid(
+        self,
+        *,
+        cid_version: int = 1,
+        chunker: str = DEFAULT_CHUNKER,
+        raw_leaves: bool | None = None,
+    ) -> str:
+        """Compute the content's CID locally, as kubo would with the same options"""
+        return compute_cid(self.path, cid_version, chunker, raw_leaves)
 
     def __enter__(self):
         return self.open()
@@ -206,12 +298,17 @@ class Content(BaseContent):
 class AsyncContent(BaseContent):
     """Content Object with IPFS object properties."""
 
+    _multipart_stream = AsyncMultipartStream
+    _memory_stream = AsyncMemoryStream
+
     async def open(self):
         if self.opened:
             raise UnsupportedOperation("Content is already opened")
 
-        self._file = await anyio.open_file(self.path, "rb")
-        self._bytes = await self._file.read()
+        with phase("open"):
+            self._file = await anyio.open_file(self.path, "rb")
+            if not self.streaming:
+                self._bytes = await self._file.read()
         return self
 
     async def close(self):
@@ -219,6 +316,25 @@ class AsyncContent(BaseContent):
             raise UnsupportedOperation("Content is not yet opened")
 
         await cast(AsyncFile[bytes], self._file).aclose()
+        self._bytes = None
+
+    def _stream(self) -> AsyncIterable[Chunk]:
+        if self._file is None:
+            raise ValueError("Content's file has not been opened")
+
+        return AsyncFileStream(cast(AsyncFile[bytes], self._file), self.chunk_size)
+
+    async def compute_cid(
+        self,
+        *,
+        cid_version: int = 1,
+        chunker: str = DEFAULT_CHUNKER,
+        raw_leaves: bool | None = None,
+    ) -> str:
+        """Compute the content's CID locally in a worker thread"""
+        return await anyio.to_thread.run_sync(
+            compute_cid, self.path, cid_version, chunker, raw_leaves
+        )
 
     async def __aenter__(self):
         return await self.open()
@@ -0,0 +1,240 @@
+import mimetypes
+import os
+import posixpath
+from collections.abc import AsyncIterable
+from collections.abc import Iterable
+from collections.abc import Mapping
+from io import UnsupportedOperation
+from typing import Any
+from typing import NamedTuple
+from urllib.parse import quote as urlquote
+
+import anyio
+
+from .content import BaseContent
+from .stream import AsyncMemoryStream
+from .stream import AsyncMultipartStream
+from .stream import AsyncPathStream
+from .stream import Chunk
+from .stream import DEFAULT_CHUNK_SIZE
+from .stream import MemoryStream
+from .stream import MultipartFile
+from .stream import PathStream
+from .unixfs import compute_tree_cids
+from .unixfs import DEFAULT_CHUNKER
+from .unixfs import Tree
+from .unixfs import walk_tree
+from pinnacle.type_aliases import PathType
+
+DIRECTORY_MIMETYPE = "application/x-directory"
+
+
+class Entry(NamedTuple):
+    path: str  # posix path relative to the directory
+    file: PathType | None  # None for sub-directories
+    size: int
+
+
+def _entries(tree: Tree, prefix: str = "") -> list[Entry]:
+    """Flatten a tree, every directory comes before its children"""
+    entries = []
+    for name, entry in sorted(tree.items()):
+        path = f"{prefix}{name}"
+        if isinstance(entry, Mapping):
+            entries.append(Entry(path, None, 0))
+            entries.extend(_entries(entry, f"{path}/"))
+        else:
+            entries.append(Entry(path, entry, os.path.getsize(entry)))
+    return entries
+
+
+def _guess_mimetype(path: str) -> str:
+    guess, _ = mimetypes.guess_type(path)
+    return guess or "application/octet-stream"
+
+
+class BaseDirectoryContent(BaseContent):
+    """
+    A directory pinned as a collection, under a single root CID.
+
+    Opening the content walks the directory once. Files are streamed one after
+    the other in a single multipart body, each file being opened only while its
+    part is sent.
+    """
+
+    def __init__(self, path: PathType, *, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(path, streaming=True, chunk_size=chunk_size)
+        self._tree: Tree | None = None
+        self._entries: list[Entry] | None = None
+        self._closed = False
+
+    @property
+    def basename(self) -> str:
+        return os.path.basename(os.path.normpath(self.path))
+
+    @property
+    def opened(self):
+        return self._entries is not None
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def tree(self) -> Tree:
+        if self._tree is None:
+            raise ValueError("Directory has not been walked")
+        return self._tree
+
+    @property
+    def entries(self) -> list[Entry]:
+        if self._entries is None:
+            raise ValueError("Directory has not been walked")
+        return self._entries
+
+    @property
+    def files(self) -> list[str]:
+        """Path of every file, relative to the directory"""
+        return [entry.path for entry in self.entries if entry.file is not None]
+
+    @property
+    def size(self) -> int:
+        return sum(entry.size for entry in self.entries)
+
+    def _walk(self):
+        self._tree = walk_tree(self.path)
+        self._entries = _entries(self._tree)
+        self._closed = False
+
+    def _clear(self):
+        self._tree, self._entries = None, None
+        self._closed = True
+
+    def _file_stream(self, path: PathType) -> Any:
+        raise NotImplementedError  # pragma: no cover
+
+    def _empty_stream(self) -> Any:
+        raise NotImplementedError  # pragma: no cover
+
+    def _prepare(self):
+        raise UnsupportedOperation("A directory can only be uploaded as multipart")
+
+    def _prepare_multipart(
+        self,
+        include_mimetype: bool = False,
+        data: dict[str, Any] | None = None,
+        *,
+        prefix: str = "",
+        directories: bool = False,
+    ):
+        """
+        Prepare the directory for MULTIPART pinning request, one part per file.
+        Filenames are the file paths relative to the directory, under `prefix`.
+        With `directories`, sub-directories get their own part and filenames are
+        URL-escaped, as kubo expects.
+        """
+        parts = []
+        for entry in self.entries:
+            filename = posixpath.join(prefix, entry.path)
+            if directories:
+                filename = urlquote(filename)
+
+            if entry.file is not None:
+                mimetype = _guess_mimetype(entry.path) if include_mimetype else None
+                stream = self._file_stream(entry.file)
+                parts.append(MultipartFile(filename, stream, entry.size, mimetype))
+            elif directories:
+                stream = self._empty_stream()
+                parts.append(MultipartFile(filename, stream, 0, DIRECTORY_MIMETYPE))
+
+        body = self._multipart_stream(parts, data)
+
+        return dict(content=body, headers=body.headers)
+
+
+class DirectoryContent(BaseDirectoryContent):
+    """Directory Object with IPFS object properties."""
+
+    def open(self):
+        if self.opened:
+            raise UnsupportedOperation("Content is already opened")
+
+        self._walk()
+        return self
+
+    def close(self):
+        if not self.opened:
+            raise UnsupportedOperation("Content is not yet opened")
+
+        self._clear()
+
+    def _file_stream(self, path: PathType) -> Iterable[Chunk]:
+        return PathStream(path, self.chunk_size)
+
+    def _empty_stream(self) -> Iterable[Chunk]:
+        return MemoryStream(memoryview(b""))
+
+    def compute_cids(
+        self,
+        *,
+        cid_version: int = 1,
+        chunker: str = DEFAULT_CHUNKER,
+        raw_leaves: bool | None = None,
+    ) -> tuple[str, dict[str, str]]:
+        """Compute the directory's root CID and the CID of every file locally"""
+        tree = walk_tree(self.path) if self._tree is None else self._tree
+        return compute_tree_cids(tree, cid_version, chunker, raw_leaves)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_instance, traceback):
+        self.close()
+        return exc_instance is None
+
+
+class AsyncDirectoryContent(BaseDirectoryContent):
+    """Directory Object with IPFS object properties."""
+
+    _multipart_stream = AsyncMultipartStream
+
+    async def open(self):
+        if self.opened:
+            raise UnsupportedOperation("Content is already opened")
+
+        await anyio.to_thread.run_sync(self._walk)
+        return self
+
+    async def close(self):
+        if not self.opened:
+            raise UnsupportedOperation("Content is not yet opened")
+
+        self._clear()
+
+    def _file_stream(self, path: PathType) -> AsyncIterable[Chunk]:
+        return AsyncPathStream(path, self.chunk_size)
+
+    def _empty_stream(self) -> AsyncIterable[Chunk]:
+        return AsyncMemoryStream(memoryview(b""))
+
+    async def compute_cids(
+        self,
+        *,
+        cid_version: int = 1,
+        chunker: str = DEFAULT_CHUNKER,
+        raw_leaves: bool | None = None,
+    ) -> tuple[str, dict[str, str]]:
+        """Compute the directory's root CID and the CID of every file in a thread"""
+        tree = self._tree
+        if tree is None:
+            tree = await anyio.to_thread.run_sync(walk_tree, self.path)
+        return await anyio.to_thread.run_sync(
+            compute_tree_cids, tree, cid_version, chunker, raw_leaves
+        )
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_instance, traceback):
+        await self.close()
+        return exc_instance is None
@@ -0,0 +1,92 @@
+import mmap
+from typing import cast
+from typing import IO
+
+from anyio import AsyncFile
+
+from .content import AsyncContent
+from .content import BaseContent
+from .content import Content
+from .stream import AsyncMemoryStream
+from .stream import DEFAULT_CHUNK_SIZE
+from .stream import MemoryStream
+from pinnacle.type_aliases import PathType
+
+
+class MappedContentMixin(BaseContent):
+    """
+    A mixin to back a content with a read-only memory map of its file.
+
+    Request bodies are memoryview slices of the map, so no private copy of the
+    data is made: the page cache is the only copy, shared by every upload,
+    thread and content instance mapping the same file.
+    """
+
+    def __init__(self, path: PathType, *, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(path, streaming=True, chunk_size=chunk_size)
+        self._mmap: mmap.mmap | None = None
+        self._view: memoryview | None = None
+
+    @property
+    def view(self) -> memoryview:
+        if self._view is None:
+            raise ValueError("Content's file has not been mapped")
+        return self._view
+
+    @property
+    def size(self) -> int:
+        return len(self._view) if self._view is not None else super().size
+
+    def _map(self, fileno: int):
+        try:
+            self._mmap = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            self._view = memoryview(b"")
+        else:
+            self._view = memoryview(self._mmap)
+
+    def _unmap(self):
+        if self._view is not None:
+            self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # slices are still referenced by an in-flight body,
+                # the map is released when the last of them is collected
+                pass
+
+        self._mmap, self._view = None, None
+
+
+class MappedContent(MappedContentMixin, Content):
+    """Content Object backed by a memory map."""
+
+    def open(self):
+        super().open()
+        self._map(cast(IO[bytes], self._file).fileno())
+        return self
+
+    def close(self):
+        self._unmap()
+        super().close()
+
+    def _stream(self) -> MemoryStream:
+        return MemoryStream(self.view, self.chunk_size)
+
+
+class AsyncMappedContent(MappedContentMixin, AsyncContent):
+    """Async Content Object backed by a memory map."""
+
+    async def open(self):
+        await super().open()
+        self._map(cast(AsyncFile[bytes], self._file).wrapped.fileno())
+        return self
+
+    async def close(self):
+        self._unmap()
+        await super().close()
+
+    def _stream(self) -> AsyncMemoryStream:
+        return AsyncMemoryStream(self.view, self.chunk_size)
@@ -0,0 +1,131 @@
+"""
+Bulk CID computation over a process pool.
+
+Small files are hashed whole by a worker. Large files are split in ranges of
+whole chunks, each worker returning the links to the leaves of its range; the
+inner nodes (one per 174 leaves) are then built from those links, which takes
+no file I/O. Hence a single huge file is spread over the whole pool.
+"""
+import os
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from itertools import chain
+from typing import TypeAlias
+
+from .unixfs import compute_cid
+from .unixfs import DEFAULT_CHUNKER
+from .unixfs import iter_file_chunks
+from .unixfs import Link
+from .unixfs import parse_chunker
+from .unixfs import UnixFSBuilder
+from pinnacle.type_aliases import PathType
+
+DEFAULT_SPLIT_SIZE = 64 * 1024 * 1024
+
+
+def _leaf_links(
+    path: PathType,
+    start: int,
+    stop: int,
+    chunk_size: int,
+    cid_version: int,
+    raw_leaves: bool | None,
+) -> list[Link]:
+    """Links to the leaves of the chunks in [start, stop) of a file"""
+    builder = UnixFSBuilder(cid_version, raw_leaves)
+    chunks = iter_file_chunks(path, chunk_size, start, stop)
+    return list(builder.leaf_links(chunks, first=start == 0))
+
+
+class _SplitFile:
+    """A file hashed in several ranges, complete once every range is done"""
+
+    def __init__(self, path: PathType, ranges: int) -> None:
+        self.path = path
+        self.parts: list[list[Link] | None] = [None] * ranges
+        self.pending = ranges
+
+    def done(self, index: int, links: list[Link]) -> bool:
+        self.parts[index] = links
+        self.pending -= 1
+        return self.pending == 0
+
+    def root(self, builder: UnixFSBuilder) -> str:
+        leaves = chain.from_iterable(self.parts)  # type: ignore[arg-type]
+        root = None
+        for root in builder.build_links(leaves):
+            pass
+        return str(root.cid)  # type: ignore[union-attr]
+
+
+# a whole file is keyed by its path, a range by its file and index
+_Key: TypeAlias = PathType | tuple[_SplitFile, int]
+
+
+def compute_cids(
+    paths: Iterable[PathType],
+    workers: int | None = None,
+    *,
+    cid_version: int = 1,
+    chunker: str = DEFAULT_CHUNKER,
+    raw_leaves: bool | None = None,
+    split_size: int = DEFAULT_SPLIT_SIZE,
+) -> Iterator[tuple[PathType, str]]:
+    """
+    Compute the CID of many files over `workers` processes (default: CPU count).
+
+    Yield (path, CID) pairs as soon as each file is done, hence not in the
+    order of `paths`. `paths` is consumed lazily, only a few tasks per worker
+    are in flight at a time. Files larger than `split_size` are split by range.
+    """
+    chunk_size = parse_chunker(chunker)
+    # ranges are made of whole chunks, for leaves to match a sequential read
+    split_size = max(split_size // chunk_size, 1) * chunk_size
+    builder = UnixFSBuilder(cid_version, raw_leaves)
+
+    def tasks() -> Iterator[tuple[tuple, _Key]]:
+        for path in paths:
+            size = os.path.getsize(path)
+            if size <= split_size:
+                yield (compute_cid, path, cid_version, chunker, raw_leaves), path
+                continue
+
+            starts = range(0, size, split_size)
+            split = _SplitFile(path, len(starts))
+            for index, start in enumerate(starts):
+                args = (path, start, start + split_size, chunk_size)
+                task = (_leaf_links, *args, cid_version, raw_leaves)
+                yield task, (split, index)
+
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(workers)
+    limit = workers * 4
+    pending: dict[Future, _Key] = {}
+    queue = tasks()
+
+    try:
+        while True:
+            for (fn, *args), key in queue:
+                pending[executor.submit(fn, *args)] = key
+                if len(pending) >= limit:
+                    break
+
+            if not pending:
+                return
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = pending.pop(future)
+                if not isinstance(key, tuple):
+                    yield key, future.result()
+                    continue
+
+                split, index = key
+                if split.done(index, future.result()):
+                    yield split.path, split.root(builder)
+    finally:
+        executor.shutdown(cancel_futures=True)
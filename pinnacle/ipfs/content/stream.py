@@ -0,0 +1,210 @@
+import os
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import Any
+from typing import IO
+from typing import TypeAlias
+
+import anyio
+from anyio import AsyncFile
+
+from pinnacle.type_aliases import PathType
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+Chunk: TypeAlias = bytes | memoryview
+
+
+class FileStream:
+    """Re-iterable byte stream over a binary file.
+
+    Every iteration rewinds the file, so the same stream can be replayed
+    (e.g. when a request is retried) without reading the file into memory.
+    """
+
+    def __init__(self, file: IO[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.file.seek(0)
+        while chunk := self.file.read(self.chunk_size):
+            yield chunk
+
+
+class AsyncFileStream:
+    """Async counterpart of FileStream"""
+
+    def __init__(self, file: AsyncFile[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        await self.file.seek(0)
+        while chunk := await self.file.read(self.chunk_size):
+            yield chunk
+
+
+class PathStream:
+    """Re-iterable byte stream over a file path, opened only while iterated.
+
+    Unlike FileStream, no file descriptor is held until the stream is consumed,
+    so a body can carry thousands of files without exhausting descriptors.
+    """
+
+    def __init__(self, path: PathType, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        with open(self.path, "rb") as file:
+            while chunk := file.read(self.chunk_size):
+                yield chunk
+
+
+class AsyncPathStream:
+    """Async counterpart of PathStream"""
+
+    def __init__(self, path: PathType, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async with await anyio.open_file(self.path, "rb") as file:
+            while chunk := await file.read(self.chunk_size):
+                yield chunk
+
+
+def _slices(buffer: memoryview, chunk_size: int) -> Iterator[memoryview]:
+    for offset in range(0, len(buffer), chunk_size):
+        yield buffer[offset : offset + chunk_size]
+
+
+class MemoryStream:
+    """Re-iterable stream of memoryview slices over a buffer, without copying.
+
+    The stream holds no position, so it can be iterated by several requests
+    (or threads) at the same time.
+    """
+
+    def __init__(self, buffer: memoryview, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.buffer = buffer
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[memoryview]:
+        return _slices(self.buffer, self.chunk_size)
+
+
+class AsyncMemoryStream:
+    """Async counterpart of MemoryStream"""
+
+    def __init__(self, buffer: memoryview, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.buffer = buffer
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self) -> AsyncIterator[memoryview]:
+        for chunk in _slices(self.buffer, self.chunk_size):
+            yield chunk
+
+
+def _quote(value: str) -> str:
+    # same escaping as httpx's multipart encoder
+    return value.replace("\\", "\\\\").replace('"', "%22")
+
+
+class MultipartFile:
+    """A file part of a multipart body, whose data is a (async) byte stream"""
+
+    def __init__(
+        self,
+        filename: str,
+        stream: Iterable[Chunk] | AsyncIterable[Chunk],
+        size: int,
+        mimetype: str | None = None,
+        name: str = "file",
+    ) -> None:
+        self.filename = filename
+        self.stream = stream
+        self.size = size
+        self.mimetype = mimetype
+        self.name = name
+
+    def render_headers(self) -> bytes:
+        disposition = (
+            f'Content-Disposition: form-data; name="{_quote(self.name)}"; '
+            f'filename="{_quote(self.filename)}"'
+        )
+        lines = [disposition]
+        if self.mimetype is not None:
+            lines.append(f"Content-Type: {self.mimetype}")
+
+        return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+
+class BaseMultipartStream:
+    """
+    A multipart/form-data body streamed part by part.
+
+    Only the part headers are held in memory, file data is pulled from each
+    part's stream, so memory stays at the chunk size of the underlying streams.
+    The total length is known upfront and exposed as a Content-Length header.
+    """
+
+    def __init__(
+        self,
+        files: list[MultipartFile],
+        data: dict[str, Any] | None = None,
+        boundary: str | None = None,
+    ) -> None:
+        self.boundary = boundary or os.urandom(16).hex()
+        self.files = files
+
+        # segments are either raw bytes or a MultipartFile to be streamed
+        self._segments: list[bytes | MultipartFile] = []
+        delimiter = f"--{self.boundary}\r\n".encode()
+
+        for key, value in (data or {}).items():
+            field = f'Content-Disposition: form-data; name="{_quote(key)}"\r\n\r\n'
+            self._segments.append(delimiter + field.encode() + f"{value}".encode())
+            self._segments.append(b"\r\n")
+
+        for file in files:
+            self._segments.append(delimiter + file.render_headers())
+            self._segments.append(file)
+            self._segments.append(b"\r\n")
+
+        self._segments.append(f"--{self.boundary}--\r\n".encode())
+
+    @property
+    def content_length(self) -> int:
+        return sum(
+            s.size if isinstance(s, MultipartFile) else len(s) for s in self._segments
+        )
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(self.content_length),
+        }
+
+
+class MultipartStream(BaseMultipartStream):
+    def __iter__(self) -> Iterator[Chunk]:
+        for segment in self._segments:
+            if isinstance(segment, MultipartFile):
+                yield from segment.stream  # type: ignore[misc]
+            else:
+                yield segment
+
+
+class AsyncMultipartStream(BaseMultipartStream):
+    async def __aiter__(self) -> AsyncIterator[Chunk]:
+        for segment in self._segments:
+            if isinstance(segment, MultipartFile):
+                async for chunk in segment.stream:  # type: ignore[union-attr]
+                    yield chunk
+            else:
+                yield segment
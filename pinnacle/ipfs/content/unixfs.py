@@ -0,0 +1,462 @@
+"""
+Local UnixFS DAG builder, computing the CID of a file without uploading it.
+
+The DAG follows kubo's ``ipfs add`` defaults byte-for-byte: fixed-size chunks,
+balanced layout with at most 174 links per node, sha2-256 and dag-pb nodes.
+Blocks are produced while the file is read, so only the links of the nodes
+currently being filled are held in memory.
+"""
+import base64
+import hashlib
+import os
+import re
+from collections.abc import Callable
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from typing import Any
+from typing import Generic
+from typing import NamedTuple
+from typing import TypeAlias
+from typing import TypeVar
+
+from pinnacle.type_aliases import PathType
+
+DAG_PB = 0x70
+RAW = 0x55
+SHA2_256 = 0x12
+
+DEFAULT_CHUNKER = "size-262144"
+DEFAULT_MAX_LINKS = 174
+BLOCK_SIZE_LIMIT = 1024 * 1024
+
+# UnixFS Data.DataType
+UNIXFS_RAW = 0
+UNIXFS_DIRECTORY = 1
+UNIXFS_FILE = 2
+
+T = TypeVar("T")
+
+_B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+class UnsupportedChunkerError(ValueError):
+    def __init__(self, chunker: str) -> None:
+        super().__init__(f"Unsupported chunker {chunker!r}. Expected 'size-<bytes>'")
+
+
+def varint(n: int) -> bytes:
+    """Encode an unsigned integer as protobuf/multiformats varint"""
+    buffer = bytearray()
+    while n > 0x7F:
+        buffer.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buffer.append(n)
+    return bytes(buffer)
+
+
+def _field(number: int, value: bytes | int) -> bytes:
+    """Encode a protobuf field, either length-delimited or varint"""
+    if isinstance(value, int):
+        return varint(number << 3) + varint(value)
+    return varint(number << 3 | 2) + varint(len(value)) + value
+
+
+def b58encode(data: bytes) -> str:
+    n = int.from_bytes(data, "big")
+    encoded = ""
+    while n > 0:
+        n, rem = divmod(n, 58)
+        encoded = _B58_ALPHABET[rem] + encoded
+
+    leading = len(data) - len(data.lstrip(b"\0"))
+    return _B58_ALPHABET[0] * leading + encoded
+
+
+def b58decode(data: str) -> bytes:
+    n = 0
+    for char in data:
+        n = n * 58 + _B58_ALPHABET.index(char)
+
+    leading = len(data) - len(data.lstrip(_B58_ALPHABET[0]))
+    return b"\0" * leading + n.to_bytes((n.bit_length() + 7) // 8, "big")
+
+
+def _read_varint(data: bytes, offset: int = 0) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = data[offset]
+        n |= (byte & 0x7F) << shift
+        offset += 1
+        if byte < 0x80:
+            return n, offset
+        shift += 7
+
+
+class CID:
+    """Content Identifier of a sha2-256 hashed block"""
+
+    def __init__(self, version: int, codec: int, digest: bytes) -> None:
+        if version == 0 and codec != DAG_PB:
+            raise ValueError("CIDv0 only supports the dag-pb codec")
+
+        self.version = version
+        self.codec = codec
+        self.digest = digest
+
+    @classmethod
+    def hash(cls, data: bytes, codec: int = RAW, version: int = 1):
+        return cls(version, codec, hashlib.sha256(data).digest())
+
+    @classmethod
+    def decode(cls, cid: str):
+        """Parse a base58btc CIDv0 or a base32 CIDv1 string"""
+        if len(cid) == 46 and cid.startswith("Qm"):
+            multihash = b58decode(cid)
+            return cls(0, DAG_PB, multihash[2:])
+
+        if not cid.startswith("b"):
+            raise ValueError(f"Unsupported CID encoding: {cid}")
+
+        body = cid[1:].upper()
+        buffer = base64.b32decode(body + "=" * (-len(body) % 8))
+        version, offset = _read_varint(buffer)
+        codec, offset = _read_varint(buffer, offset)
+        _, offset = _read_varint(buffer, offset)  # hash function
+        length, offset = _read_varint(buffer, offset)
+
+        return cls(version, codec, buffer[offset : offset + length])
+
+    @property
+    def multihash(self) -> bytes:
+        return varint(SHA2_256) + varint(len(self.digest)) + self.digest
+
+    @property
+    def buffer(self) -> bytes:
+        """Binary form of the CID"""
+        if self.version == 0:
+            return self.multihash
+        return varint(self.version) + varint(self.codec) + self.multihash
+
+    def __str__(self) -> str:
+        if self.version == 0:
+            return b58encode(self.multihash)
+
+        encoded = base64.b32encode(self.buffer).decode().rstrip("=")
+        return "b" + encoded.lower()
+
+    def __repr__(self) -> str:
+        return f"CID({self})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CID) and self.buffer == other.buffer
+
+    def __hash__(self) -> int:
+        return hash(self.buffer)
+
+
+class Block(NamedTuple):
+    cid: CID
+    data: bytes
+
+
+class Link(NamedTuple):
+    cid: CID
+    tsize: int  # cumulative size of the linked DAG, as recorded in dag-pb
+    filesize: int  # size of the file data under the link
+
+    def encode(self, name: str = "") -> bytes:
+        return (
+            _field(1, self.cid.buffer)
+            + _field(2, name.encode())
+            + _field(3, self.tsize)
+        )
+
+
+def encode_unixfs_file(
+    data: bytes | None = None,
+    filesize: int = 0,
+    blocksizes: Iterable[int] = (),
+    data_type: int = UNIXFS_FILE,
+) -> bytes:
+    """Encode a UnixFS Data protobuf message of type File (or Raw)"""
+    message = _field(1, data_type)
+    if data is not None:
+        message += _field(2, data)
+    message += _field(3, filesize)
+    for size in blocksizes:
+        message += _field(4, size)
+    return message
+
+
+def encode_unixfs_directory() -> bytes:
+    """Encode a UnixFS Data protobuf message of type Directory"""
+    return _field(1, UNIXFS_DIRECTORY)
+
+
+def encode_dag_pb(data: bytes, links: Iterable[bytes] = ()) -> bytes:
+    """Encode a dag-pb PBNode, links are written before data (canonical form)"""
+    return b"".join(_field(2, link) for link in links) + _field(1, data)
+
+
+def parse_chunker(chunker: str) -> int:
+    """Chunk size of a kubo chunker string, only fixed-size chunkers are supported"""
+    if chunker == "default":
+        chunker = DEFAULT_CHUNKER
+
+    if (match := re.fullmatch(r"size-(\d+)", chunker)) is None or not int(
+        match.group(1)
+    ):
+        raise UnsupportedChunkerError(chunker)
+
+    return int(match.group(1))
+
+
+# a directory tree, mapping entry names to file paths or sub-trees
+Tree: TypeAlias = Mapping[str, "PathType | Tree"]
+
+
+class _Lookahead(Generic[T]):
+    """Iterator with one item of lookahead, to know when input is done"""
+
+    def __init__(self, items: Iterable[T], default: T) -> None:
+        self._iter = iter(items)
+        self._default = default
+        self._next = next(self._iter, None)
+
+    @property
+    def done(self) -> bool:
+        return self._next is None
+
+    def pop(self) -> T:
+        item, self._next = self._next, next(self._iter, None)
+        return self._default if item is None else item
+
+
+class UnixFSBuilder:
+    """Balanced UnixFS DAG builder for files and basic (unsharded) directories"""
+
+    def __init__(
+        self,
+        cid_version: int = 1,
+        raw_leaves: bool | None = None,
+        max_links: int = DEFAULT_MAX_LINKS,
+    ) -> None:
+        if cid_version not in (0, 1):
+            raise ValueError(f"Invalid CID version: {cid_version}")
+
+        self.cid_version = cid_version
+        # like kubo, raw leaves are implied by CIDv1
+        self.raw_leaves = cid_version == 1 if raw_leaves is None else raw_leaves
+        self.max_links = max_links
+
+    def _leaf(self, chunk: bytes, first: bool = True) -> Block:
+        if self.raw_leaves:
+            # raw blocks require CIDv1, even when the root is CIDv0
+            return Block(CID.hash(chunk, RAW, 1), chunk)
+
+        # like kubo's balanced layout, only the first leaf of a file is typed
+        # File, the leaves filling the nodes above it are typed Raw
+        data_type = UNIXFS_FILE if first else UNIXFS_RAW
+        unixfs = encode_unixfs_file(chunk or None, len(chunk), data_type=data_type)
+        data = encode_dag_pb(unixfs)
+        return Block(CID.hash(data, DAG_PB, self.cid_version), data)
+
+    def _node(self, links: list[Link]) -> Block:
+        unixfs = encode_unixfs_file(
+            filesize=sum(link.filesize for link in links),
+            blocksizes=(link.filesize for link in links),
+        )
+        data = encode_dag_pb(unixfs, (link.encode() for link in links))
+        return Block(CID.hash(data, DAG_PB, self.cid_version), data)
+
+    @staticmethod
+    def _link(block: Block, filesize: int, links: Iterable[Link] = ()) -> Link:
+        return Link(
+            block.cid, len(block.data) + sum(ln.tsize for ln in links), filesize
+        )
+
+    def _emit_leaf(
+        self, chunks: _Lookahead[bytes], first: bool
+    ) -> Generator[Block, None, Link]:
+        chunk = chunks.pop()
+        block = self._leaf(chunk, first)
+        yield block
+        return self._link(block, len(chunk))
+
+    @staticmethod
+    def _emit_link(
+        leaves: _Lookahead[Link], first: bool
+    ) -> Generator[Block, None, Link]:
+        # leaves built beforehand, there is no block left to yield
+        yield from ()
+        return leaves.pop()
+
+    def _fill(
+        self,
+        leaves: _Lookahead[T],
+        links: list[Link],
+        depth: int,
+        emit: Callable[[_Lookahead[T], bool], Generator[Block, None, Link]],
+    ) -> Generator[Block, None, Link]:
+        """Fill a node at `depth` with children until full or input is done"""
+        while len(links) < self.max_links and not leaves.done:
+            if depth == 1:
+                child = yield from emit(leaves, False)
+            else:
+                child = yield from self._fill(leaves, [], depth - 1, emit)
+            links.append(child)
+
+        block = self._node(links)
+        yield block
+        return self._link(block, sum(ln.filesize for ln in links), links)
+
+    def _build(
+        self,
+        leaves: _Lookahead[T],
+        emit: Callable[[_Lookahead[T], bool], Generator[Block, None, Link]],
+    ) -> Generator[Block, None, Link]:
+        root = yield from emit(leaves, True)
+
+        depth = 1
+        while not leaves.done:
+            root = yield from self._fill(leaves, [root], depth, emit)
+            depth += 1
+
+        return root
+
+    def build(self, chunks: Iterable[bytes]) -> Generator[Block, None, Link]:
+        """
+        Yield every block of a file DAG in post-order, the root block is last.
+        The generator returns the link to the root.
+        """
+        return self._build(_Lookahead(chunks, b""), self._emit_leaf)
+
+    def leaves(self, chunks: Iterable[bytes], first: bool = True) -> Iterator[Block]:
+        """
+        Leaf blocks of a file, without building the rest of its DAG. `first`
+        tells whether the chunks start at the beginning of the file.
+        """
+        for index, chunk in enumerate(chunks):
+            yield self._leaf(chunk, first and index == 0)
+
+    def leaf_links(self, chunks: Iterable[bytes], first: bool = True) -> Iterator[Link]:
+        """
+        Links to the leaves of a file, without building the rest of its DAG.
+        `first` tells whether the chunks start at the beginning of the file.
+        """
+        for index, chunk in enumerate(chunks):
+            yield self._link(self._leaf(chunk, first and index == 0), len(chunk))
+
+    def build_links(self, leaves: Iterable[Link]) -> Generator[Block, None, Link]:
+        """
+        Yield the inner blocks of a file DAG whose leaves were built separately
+        (see `leaf_links`), in post-order. The generator returns the link to the root.
+        """
+        empty = self._link(self._leaf(b""), 0)
+        return self._build(_Lookahead(leaves, empty), self._emit_link)
+
+    def _directory(self, entries: list[tuple[str, Link]]) -> Block:
+        # dag-pb links are sorted by the bytes of their name
+        entries = sorted(entries, key=lambda entry: entry[0].encode())
+        links = (link.encode(name) for name, link in entries)
+        data = encode_dag_pb(encode_unixfs_directory(), links)
+
+        if len(data) > BLOCK_SIZE_LIMIT:
+            raise ValueError(
+                f"Directory of {len(entries)} entries exceeds the block size limit"
+            )
+        return Block(CID.hash(data, DAG_PB, self.cid_version), data)
+
+    def build_tree(
+        self,
+        tree: Tree,
+        chunk_size: int,
+        files: dict[str, CID] | None = None,
+        prefix: str = "",
+    ) -> Generator[Block, None, Link]:
+        """
+        Yield every block of a directory DAG in post-order, the root block is last.
+        The CID of every file is added to `files`, keyed by its path in the tree.
+        """
+        entries = []
+        for name, entry in tree.items():
+            path = f"{prefix}{name}"
+            if isinstance(entry, Mapping):
+                link = yield from self.build_tree(entry, chunk_size, files, f"{path}/")
+            else:
+                link = yield from self.build(iter_file_chunks(entry, chunk_size))
+                if files is not None:
+                    files[path] = link.cid
+            entries.append((name, link))
+
+        block = self._directory(entries)
+        yield block
+        return self._link(block, 0, (link for _, link in entries))
+
+
+def walk_tree(path: PathType) -> Tree:
+    """Directory tree of the regular files under `path`, symlinked dirs are skipped"""
+    tree: dict[str, Any] = {}
+    with os.scandir(os.fsdecode(path)) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                tree[entry.name] = walk_tree(entry.path)
+            elif entry.is_file():
+                tree[entry.name] = entry.path
+    return tree
+
+
+def iter_file_chunks(
+    path: PathType, chunk_size: int, start: int = 0, stop: int | None = None
+) -> Iterator[bytes]:
+    """Read a file chunk by chunk, from `start` up to `stop` (or the end)"""
+    with open(path, "rb") as file:
+        file.seek(start)
+        while (stop is None or start < stop) and (chunk := file.read(chunk_size)):
+            start += len(chunk)
+            yield chunk
+
+
+def build_file_dag(
+    path: PathType,
+    cid_version: int = 1,
+    chunker: str = DEFAULT_CHUNKER,
+    raw_leaves: bool | None = None,
+) -> Iterator[Block]:
+    """Yield the blocks of a file's UnixFS DAG, the root block is last"""
+    builder = UnixFSBuilder(cid_version, raw_leaves)
+    return builder.build(iter_file_chunks(path, parse_chunker(chunker)))
+
+
+def compute_cid(
+    path: PathType,
+    cid_version: int = 1,
+    chunker: str = DEFAULT_CHUNKER,
+    raw_leaves: bool | None = None,
+) -> str:
+    """Compute the CID kubo would assign to a file, reading it chunk by chunk"""
+    root = None
+    for root in build_file_dag(path, cid_version, chunker, raw_leaves):
+        pass
+
+    return str(root.cid)  # type: ignore[union-attr]
+
+
+def compute_tree_cids(
+    tree: Tree,
+    cid_version: int = 1,
+    chunker: str = DEFAULT_CHUNKER,
+    raw_leaves: bool | None = None,
+) -> tuple[str, dict[str, str]]:
+    """Compute the root CID of a directory tree and the CID of every file in it"""
+    builder = UnixFSBuilder(cid_version, raw_leaves)
+    files: dict[str, CID] = {}
+    root = None
+    for root in builder.build_tree(tree, parse_chunker(chunker), files):
+        pass
+
+    return str(root.cid), {  # type: ignore[union-attr]
+        path: str(cid) for path, cid in files.items()
+    }
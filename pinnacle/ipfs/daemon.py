@@ -0,0 +1,128 @@
+"""
+Discovery of the local IPFS daemon.
+
+A running daemon writes the multiaddr of its RPC API to `$IPFS_PATH/api`
+(`~/.ipfs/api` by default), which is read to find it wherever it listens, a
+unix socket included. It is then known to be alive by answering `/api/v0/id`,
+an answer cached for a while, so that pinning does not wait on a probe before
+every upload.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+from pinnacle.constants.pin_services import LOCAL_SERVICE
+
+DEFAULT_IPFS_PATH = Path.home() / ".ipfs"
+DAEMON_TTL = 30.0  # seconds
+
+# requests sent over a unix socket still need a URL, its host is not resolved
+UNIX_SOCKET_URL = "http://localhost/api/v0"
+
+
+class UnsupportedMultiaddrError(ValueError):
+    def __init__(self, multiaddr: str) -> None:
+        super().__init__(f"Cannot reach an IPFS API listening on {multiaddr}")
+
+
+def ipfs_path() -> Path:
+    return Path(os.environ.get("IPFS_PATH") or DEFAULT_IPFS_PATH)
+
+
+def multiaddr_to_url(multiaddr: str) -> str:
+    """URL of the RPC API listening on a multiaddr, e.g. /ip4/127.0.0.1/tcp/5001"""
+    if multiaddr.startswith(("http://", "https://")):
+        return multiaddr.rstrip("/") + "/api/v0"
+
+    parts = multiaddr.strip().strip("/").split("/")
+    if len(parts) < 4 or parts[2] != "tcp":
+        raise UnsupportedMultiaddrError(multiaddr)
+
+    protocol, host, _, port, *rest = parts
+    if protocol == "ip6":
+        host = f"[{host}]"
+    elif protocol not in ("ip4", "dns", "dns4", "dns6"):
+        raise UnsupportedMultiaddrError(multiaddr)
+
+    scheme = "https" if rest[:1] in (["https"], ["tls"]) else "http"
+    return f"{scheme}://{host}:{port}/api/v0"
+
+
+def parse_multiaddr(multiaddr: str) -> tuple[str, str | None]:
+    """
+    URL of the RPC API listening on a multiaddr, and the path of its unix
+    socket if it listens on one, e.g. /unix/run/ipfs/api.sock
+    """
+    multiaddr = multiaddr.strip()
+    if multiaddr.startswith("/unix/"):
+        return UNIX_SOCKET_URL, multiaddr.removeprefix("/unix")
+    return multiaddr_to_url(multiaddr), None
+
+
+def api_address(repo: Path | None = None) -> tuple[str, str | None]:
+    """URL and unix socket of the daemon's RPC API, as announced in its repository"""
+    try:
+        multiaddr = ((repo or ipfs_path()) / "api").read_text()
+        return parse_multiaddr(multiaddr)
+    except (OSError, UnsupportedMultiaddrError):
+        return LOCAL_SERVICE, None
+
+
+class DaemonProbe:
+    """
+    Liveness of the daemon behind an RPC API, probed on `/id` and cached for
+    `ttl` seconds. A connection error met by a request invalidates it.
+    """
+
+    def __init__(self, url: str, ttl: float = DAEMON_TTL) -> None:
+        self.url = url.rstrip("/")
+        self.ttl = ttl
+        self._active = False
+        self._checked: float | None = None
+
+    @property
+    def expired(self) -> bool:
+        return self._checked is None or time.monotonic() - self._checked >= self.ttl
+
+    def invalidate(self) -> None:
+        self._checked = None
+
+    def _update(self, active: bool) -> bool:
+        self._active = active
+        self._checked = time.monotonic()
+        return active
+
+    def active(self, client: httpx.Client) -> bool:
+        if not self.expired:
+            return self._active
+
+        try:
+            response = client.post(f"{self.url}/id")
+        except httpx.TransportError:
+            return self._update(False)
+        return self._update(response.is_success)
+
+    async def aactive(self, client: httpx.AsyncClient) -> bool:
+        if not self.expired:
+            return self._active
+
+        try:
+            response = await client.post(f"{self.url}/id")
+        except httpx.TransportError:
+            return self._update(False)
+        return self._update(response.is_success)
+
+
+_lock = threading.Lock()
+_probes: dict[tuple[str, str | None], DaemonProbe] = {}
+
+
+def probe(url: str, uds: str | None = None) -> DaemonProbe:
+    """Probe of the daemon behind an RPC API, shared by all its clients"""
+    with _lock:
+        if (daemon := _probes.get((url, uds))) is None:
+            daemon = _probes[url, uds] = DaemonProbe(url)
+        return daemon
@@ -0,0 +1,156 @@
+import time
+from collections.abc import Iterator
+from collections.abc import Sequence
+from contextlib import AsyncExitStack
+from contextlib import ExitStack
+from typing import Generic
+from typing import TypeVar
+
+import anyio
+
+from pinnacle.ipfs.api import AsyncPinAPI
+from pinnacle.ipfs.api import PinAPI
+from pinnacle.ipfs.api.pin_api import BasePinAPI
+from pinnacle.ipfs.breaker import CircuitBreaker
+from pinnacle.ipfs.breaker import is_outage
+from pinnacle.ipfs.content import AsyncContent
+from pinnacle.ipfs.content import Content
+from pinnacle.ipfs.models import Pin
+
+PinAPIT = TypeVar("PinAPIT", bound=BasePinAPI)
+
+
+class ProvidersUnavailableError(Exception):
+    def __init__(self, errors: dict[str, Exception]) -> None:
+        super().__init__("No pinning service could pin the content", errors)
+        self.errors = errors
+
+
+class BaseFailoverPinAPI(Generic[PinAPIT]):
+    """
+    Pin to the first healthy of an ordered list of pinning services.
+
+    Every service has its own circuit breaker, every account of a service in
+    fact: breakers and errors are keyed by `PinAPI.account`. Outages (network
+    errors, timeouts, 429 and 5xx answers) count against it, and a service
+    whose breaker is open is skipped without waiting on it. Other errors only
+    move the content on to the next service.
+    """
+
+    def __init__(
+        self,
+        pin_apis: Sequence[PinAPIT],
+        *,
+        failures: int = 5,
+        max_latency: float | None = None,
+        reset_timeout: float = 30.0,
+        probes: int = 1,
+    ) -> None:
+        if not pin_apis:
+            raise ValueError("Failover needs at least one pinning service")
+        if len({pin_api.account for pin_api in pin_apis}) < len(pin_apis):
+            raise ValueError("Failover cannot try the same account twice")
+
+        self.pin_apis = pin_apis
+        self.breakers = {
+            pin_api.account: CircuitBreaker(
+                failures,
+                max_latency=max_latency,
+                reset_timeout=reset_timeout,
+                probes=probes,
+            )
+            for pin_api in pin_apis
+        }
+
+    def _healthy(self) -> Iterator[tuple[PinAPIT, CircuitBreaker]]:
+        """Services in order, those whose breaker lets a request through"""
+        for pin_api in self.pin_apis:
+            breaker = self.breakers[pin_api.account]
+            if breaker.allow():
+                yield pin_api, breaker
+
+    @staticmethod
+    def _record(breaker: CircuitBreaker, error: Exception, elapsed: float) -> None:
+        if is_outage(error):
+            breaker.record_failure()
+        else:
+            # the service answered, it is healthy whatever it answered
+            breaker.record_success(elapsed)
+
+
+class FailoverPinAPI(BaseFailoverPinAPI[PinAPI]):
+    def __init__(self, pin_apis: Sequence[PinAPI], **kwds) -> None:
+        super().__init__(pin_apis, **kwds)
+        self._stack = ExitStack()
+
+    def __enter__(self):
+        for pin_api in self.pin_apis:
+            self._stack.enter_context(pin_api)
+        return self
+
+    def __exit__(self, exc_type, exc_instance, traceback):
+        return self._stack.__exit__(exc_type, exc_instance, traceback)
+
+    def add(self, content: Content, *, cid_version: int = 1) -> Pin:
+        """Pin a content to the first healthy service accepting it"""
+        errors: dict[str, Exception] = {}
+        for pin_api, breaker in self._healthy():
+            start = time.monotonic()
+            try:
+                pin = pin_api.add(content, cid_version=cid_version)
+            except Exception as error:
+                self._record(breaker, error, time.monotonic() - start)
+                errors[pin_api.account] = error
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+
+            breaker.record_success(time.monotonic() - start)
+            return pin
+
+        raise ProvidersUnavailableError(errors)
+
+
+class AsyncFailoverPinAPI(BaseFailoverPinAPI[AsyncPinAPI]):
+    def __init__(self, pin_apis: Sequence[AsyncPinAPI], **kwds) -> None:
+        super().__init__(pin_apis, **kwds)
+        self._stack = AsyncExitStack()
+
+    async def __aenter__(self):
+        for pin_api in self.pin_apis:
+            await self._stack.enter_async_context(pin_api)
+        return self
+
+    async def __aexit__(self, exc_type, exc_instance, traceback):
+        return await self._stack.__aexit__(exc_type, exc_instance, traceback)
+
+    async def add(
+        self,
+        content: AsyncContent,
+        *,
+        cid_version: int = 1,
+        timeout: float | None = None,
+    ) -> Pin:
+        """
+        Pin a content to the first healthy service accepting it. A service
+        taking longer than `timeout` seconds is given up, as an outage.
+        """
+        errors: dict[str, Exception] = {}
+        for pin_api, breaker in self._healthy():
+            start = time.monotonic()
+            try:
+                with anyio.fail_after(timeout):
+                    pin = await pin_api.add(content, cid_version=cid_version)
+            except Exception as error:
+                self._record(breaker, error, time.monotonic() - start)
+                errors[pin_api.account] = error
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+
+            breaker.record_success(time.monotonic() - start)
+            return pin
+
+        raise ProvidersUnavailableError(errors)
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+
+from pinnacle.ipfs.models import Pin
+from pinnacle.type_aliases import PathType
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT,
+    cid TEXT
+);
+CREATE TABLE IF NOT EXISTS pins (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    provider TEXT NOT NULL,
+    cid_version INTEGER NOT NULL,
+    cid TEXT NOT NULL,
+    pin TEXT NOT NULL,
+    pinned_at REAL NOT NULL,
+    PRIMARY KEY (path, provider, cid_version)
+);
+CREATE INDEX IF NOT EXISTS pins_cid ON pins(cid);
+"""
+
+# CIDs read at a time when walking every pin of the ledger
+CID_BATCH = 10_000
+
+
+def _digest(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+class PinLedger:
+    """
+    A persistent record of pinned files, backed by SQLite.
+
+    Files are identified by (path, size, mtime), which only costs a stat call.
+    When the size matches but the mtime doesn't (e.g. a file was touched or
+    copied), the sha256 digest of the file decides if its content changed.
+    Each file keeps the Pin returned by every provider it was pinned to, per
+    CID version asked. Providers are keyed by account (`PinAPI.account`), two
+    accounts of the same service don't share their pins.
+    """
+
+    def __init__(self, database: PathType = ":memory:", *, hash_content: bool = True):
+        self.hash_content = hash_content
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(database, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_instance, traceback):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    @staticmethod
+    def _key(path: PathType) -> str:
+        return os.path.abspath(os.fspath(path))
+
+    def _is_unchanged(self, path: str, row: tuple, stat: os.stat_result) -> bool:
+        size, mtime_ns, digest = row
+        if (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            return True
+
+        if not self.hash_content or digest is None or size != stat.st_size:
+            return False
+
+        if _digest(path) != digest:
+            return False
+
+        # same content, only refresh the mtime to skip hashing next time
+        self._conn.execute(
+            "UPDATE files SET mtime_ns = ? WHERE path = ?", (stat.st_mtime_ns, path)
+        )
+        self._conn.commit()
+        return True
+
+    def lookup(self, path: PathType, provider: str, cid_version: int = 1) -> Pin | None:
+        """Return the Pin of an unchanged file on a provider, if any"""
+        key = self._key(path)
+        try:
+            stat = os.stat(key)
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest FROM files WHERE path = ?", (key,)
+            ).fetchone()
+
+            if row is None or not self._is_unchanged(key, row, stat):
+                return None
+
+            pin = self._conn.execute(
+                "SELECT pin FROM pins"
+                " WHERE path = ? AND provider = ? AND cid_version = ?",
+                (key, provider, cid_version),
+            ).fetchone()
+
+        return None if pin is None else Pin.parse_raw(pin[0])
+
+    def record(
+        self, path: PathType, provider: str, pin: Pin, cid_version: int = 1
+    ) -> None:
+        """Record a file as pinned on a provider"""
+        key = self._key(path)
+        stat = os.stat(key)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest FROM files WHERE path = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self._is_unchanged(key, row, stat):
+                digest = row[2]
+            else:
+                # new or modified file, pins of a previous version are stale
+                self._conn.execute("DELETE FROM pins WHERE path = ?", (key,))
+                digest = _digest(key) if self.hash_content else None
+
+            self._conn.execute(
+                "INSERT INTO files VALUES (?, ?, ?, ?, ?) ON CONFLICT(path) DO UPDATE"
+                " SET size = excluded.size, mtime_ns = excluded.mtime_ns,"
+                " digest = excluded.digest, cid = excluded.cid",
+                (key, stat.st_size, stat.st_mtime_ns, digest, pin.cid),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pins VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, cid_version, pin.cid, pin.json(), time.time()),
+            )
+            self._conn.commit()
+
+    def forget(self, path: PathType, provider: str | None = None) -> None:
+        """Drop the record of a file, for a single provider or all of them"""
+        key = self._key(path)
+
+        with self._lock:
+            if provider is None:
+                self._conn.execute("DELETE FROM files WHERE path = ?", (key,))
+            else:
+                self._conn.execute(
+                    "DELETE FROM pins WHERE path = ? AND provider = ?", (key, provider)
+                )
+            self._conn.commit()
+
+    def providers(self, path: PathType) -> dict[str, str]:
+        """Map of provider to CID for every recorded pin of a file"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT provider, cid FROM pins WHERE path = ?", (self._key(path),)
+            ).fetchall()
+
+        return dict(rows)
+
+    def cids(self, provider: str | None = None) -> Iterator[str]:
+        """
+        Every CID pinned, on a single provider or any of them, in CID order.
+        The index on CIDs is walked a batch at a time, the lock is only held
+        while a batch is read.
+        """
+        query = "SELECT DISTINCT cid FROM pins WHERE cid > ?"
+        args: tuple = ()
+        if provider is not None:
+            query += " AND provider = ?"
+            args = (provider,)
+        query += " ORDER BY cid LIMIT ?"
+
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(query, (last, *args, CID_BATCH)).fetchall()
+            for (cid,) in rows:
+                yield cid
+            if len(rows) < CID_BATCH:
+                return
+            last = rows[-1][0]
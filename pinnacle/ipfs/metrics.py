@@ -0,0 +1,232 @@
+"""
+Metrics of the requests sent to pinning services.
+
+Every request is recorded per provider, method and endpoint: its latency in a
+histogram, its status or error, the bytes it sent and received, and the
+retries it took. Recording is a few additions under a lock, cheap enough to
+be left on. A registry is read as a dict snapshot, or exported in the
+Prometheus text exposition format.
+"""
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from typing import Any
+
+import httpx
+
+# seconds, from a local daemon answering to a large upload over a slow link
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# path segments naming a resource (CIDs, request ids) are merged in one label
+_IDENTIFIER = re.compile(r"[0-9A-Za-z_-]{32,}")
+
+Labels = tuple[str, str, str]
+
+
+def endpoint_label(endpoint: str) -> str:
+    """Endpoint without its query, resource identifiers replaced by {id}"""
+    path = endpoint.split("?", 1)[0].strip("/")
+    return "/".join(
+        "{id}" if _IDENTIFIER.fullmatch(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+class Histogram:
+    """Observations counted in buckets of upper bounds `buckets`"""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Observations lower or equal to each bound, the last one being +Inf"""
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        total, cumulative = 0, []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+
+class RequestMetrics:
+    """Metrics of the requests sharing a provider, method and endpoint"""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.latency = Histogram(buckets)
+        self.statuses: Counter[int] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "requests": self.latency.count,
+            "latency": {
+                "sum": self.latency.sum,
+                "buckets": dict(self.latency.cumulative()),
+            },
+            "statuses": dict(self.statuses),
+            "errors": dict(self.errors),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "retries": self.retries,
+        }
+
+
+class Metrics:
+    """Registry of the request metrics of every provider"""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._requests: dict[Labels, RequestMetrics] = {}
+
+    def _metrics(self, provider: str, method: str, endpoint: str) -> RequestMetrics:
+        # called under the lock
+        labels = (provider, method, endpoint_label(endpoint))
+        if (metrics := self._requests.get(labels)) is None:
+            metrics = self._requests[labels] = RequestMetrics(self.buckets)
+        return metrics
+
+    def observe(
+        self, provider: str, endpoint: str, response: httpx.Response, elapsed: float
+    ) -> None:
+        """Record a response, once its body was read or closed"""
+        request = response.request
+        sent = _body_size(request)
+        with self._lock:
+            metrics = self._metrics(provider, request.method, endpoint)
+            metrics.latency.observe(elapsed)
+            metrics.statuses[response.status_code] += 1
+            metrics.bytes_sent += sent
+            metrics.bytes_received += response.num_bytes_downloaded
+
+    def observe_error(
+        self,
+        provider: str,
+        method: str,
+        endpoint: str,
+        error: BaseException,
+        elapsed: float,
+    ) -> None:
+        """Record a request that failed before its response"""
+        with self._lock:
+            metrics = self._metrics(provider, method, endpoint)
+            metrics.latency.observe(elapsed)
+            metrics.errors[type(error).__name__] += 1
+
+    def observe_retry(self, provider: str, method: str, endpoint: str) -> None:
+        with self._lock:
+            self._metrics(provider, method, endpoint).retries += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Metrics of every provider, method and endpoint requested"""
+        with self._lock:
+            return [
+                {"provider": provider, "method": method, "endpoint": endpoint}
+                | metrics.snapshot()
+                for (provider, method, endpoint), metrics in self._requests.items()
+            ]
+
+    def prometheus(self, namespace: str = "pinnacle") -> str:
+        """Metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help: str) -> str:
+            name = f"{namespace}_{name}"
+            lines.extend((f"# HELP {name} {help}", f"# TYPE {name} {kind}"))
+            return name
+
+        name = family(
+            "request_duration_seconds", "histogram", "Latency of the requests."
+        )
+        for series in snapshot:
+            labels = _labels(series)
+            for bound, count in series["latency"]["buckets"].items():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {_number(series['latency']['sum'])}")
+            lines.append(f"{name}_count{{{labels}}} {series['requests']}")
+
+        name = family("responses_total", "counter", "Responses by status code.")
+        for series in snapshot:
+            labels = _labels(series)
+            for status, count in sorted(series["statuses"].items()):
+                lines.append(f'{name}{{{labels},status="{status}"}} {count}')
+
+        name = family("request_errors_total", "counter", "Requests failed unanswered.")
+        for series in snapshot:
+            labels = _labels(series)
+            for error, count in sorted(series["errors"].items()):
+                lines.append(f'{name}{{{labels},error="{error}"}} {count}')
+
+        for key, help in (
+            ("bytes_sent", "Bytes of the request bodies."),
+            ("bytes_received", "Bytes of the response bodies."),
+            ("retries", "Requests retried."),
+        ):
+            name = family(f"request_{key}_total", "counter", help)
+            for series in snapshot:
+                lines.append(f"{name}{{{_labels(series)}}} {series[key]}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(series: dict[str, Any]) -> str:
+    return ",".join(
+        f'{key}="{_escape(series[key])}"' for key in ("provider", "method", "endpoint")
+    )
+
+
+def _body_size(request: httpx.Request) -> int:
+    if isinstance(request.stream, CountedStream):
+        return request.stream.size
+    return int(request.headers.get("Content-Length", 0))
+
+
+class CountedStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """A request body of unknown length, counting its bytes as they are sent"""
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.size = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self.stream:
+            self.size += len(chunk)
+            yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            self.size += len(chunk)
+            yield chunk
+
+
+# registry of the configurations not given their own
+METRICS = Metrics()
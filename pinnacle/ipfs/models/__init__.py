@@ -1,3 +1,4 @@
+from .collection import CollectionPin
 from .error import Error
 from .error import Failure
 from .models import Pin
@@ -16,4 +17,5 @@ __all__ = (
     "TextMatchingStrategy",
     "Status",
     "PinMeta",
+    "CollectionPin",
 )
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from pydantic import Field
+
+from .models import Pin
+
+
+class CollectionPin(BaseModel):
+    """A collection pinned under a single root"""
+
+    pin: Pin
+    files: dict[str, str] = Field(
+        default_factory=dict,
+        description="CID of every file, keyed by its path in the collection",
+    )
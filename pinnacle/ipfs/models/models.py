@@ -11,16 +11,19 @@ from typing import Self
 from pydantic import BaseModel
 from pydantic import Field
 
+from pinnacle.ipfs.profiling import phase
+
 
 class PinMeta(BaseModel):
     __root__: dict[str, str] | None = None
 
     @classmethod
     def from_model(cls, model: BaseModel, exclude: set[str]):
-        _dict = model.dict(exclude=exclude, exclude_none=True)
-        _data = {k: str(v) for k, v in _dict.items()}
+        with phase("validate"):
+            _dict = model.dict(exclude=exclude, exclude_none=True)
+            _data = {k: str(v) for k, v in _dict.items()}
 
-        return cls(__root__=_data)
+            return cls(__root__=_data)
 
 
 class Delegates(BaseModel):
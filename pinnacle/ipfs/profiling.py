@@ -0,0 +1,128 @@
+"""
+Profiling of the phases of content uploads.
+
+A profiler attached to a PinAPI times every upload it makes, phase by phase:
+
+- open: reading the file of a content opened for its upload
+- encode: preparing the request body and building the request
+- network: sending the request until its response is read
+- decode: decoding the JSON of the response
+- validate: parsing it into the pydantic models of the pin
+
+Streamed bodies are read and encoded as they are sent, that time is counted
+in the network phase. Phases are timed only while an upload is profiled,
+costing a context variable lookup otherwise.
+"""
+import json
+import math
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any
+from typing import cast
+from typing import ContextManager
+
+PERCENTILES = (50, 95, 99)
+
+
+class Call:
+    """Time spent in each phase by an upload, in seconds"""
+
+    def __init__(self, content: object, name: str) -> None:
+        self.content = content
+        self.name = name
+        self.phases: dict[str, float] = {}
+        self.started = time.perf_counter()
+        self.total: float | None = None
+
+    def add(self, phase: str, elapsed: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+
+    def dict(self) -> dict[str, Any]:
+        return {"name": self.name, "total": self.total, "phases": dict(self.phases)}
+
+
+_call: ContextVar[Call | None] = ContextVar("call", default=None)
+
+
+class _Phase:
+    def __init__(self, call: Call, name: str) -> None:
+        self.call = call
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.call.add(self.name, time.perf_counter() - self.started)
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Time a phase of the upload being profiled, if any"""
+    if (call := _call.get()) is None:
+        return nullcontext()
+    return _Phase(call, name)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Percentile of sorted values, interpolated between the closest ranks"""
+    rank = (len(values) - 1) * percent / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+class Profiler:
+    """Phase timings of the uploads of a batch"""
+
+    def __init__(self) -> None:
+        self.calls: list[Call] = []
+        self._lock = threading.Lock()
+
+    def begin(self, content: object, name: str) -> None:
+        """Profile the upload of a content, unless it is already profiled"""
+        call = _call.get()
+        if call is None or call.content is not content or call.total is not None:
+            _call.set(Call(content, name))
+
+    def end(self, content: object) -> None:
+        """Record the upload of a content, once it is pinned"""
+        call = _call.get()
+        if call is None or call.content is not content or call.total is not None:
+            return
+
+        call.total = time.perf_counter() - call.started
+        _call.set(None)
+        with self._lock:
+            self.calls.append(call)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Count, mean and percentiles of every phase across the batch"""
+        with self._lock:
+            calls = list(self.calls)
+
+        samples: dict[str, list[float]] = {"total": []}
+        for call in calls:
+            samples["total"].append(cast(float, call.total))
+            for name, elapsed in call.phases.items():
+                samples.setdefault(name, []).append(elapsed)
+
+        summary = {}
+        for name, values in samples.items():
+            if not values:
+                continue
+            values.sort()
+            summary[name] = {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                **{f"p{p}": percentile(values, p) for p in PERCENTILES},
+            }
+        return summary
+
+    def dict(self) -> dict[str, Any]:
+        with self._lock:
+            calls = [call.dict() for call in self.calls]
+        return {"summary": self.summary(), "calls": calls}
+
+    def json(self, **kwds) -> str:
+        return json.dumps(self.dict(), **kwds)
@@ -0,0 +1,147 @@
+"""
+Progress of the uploads to pinning services.
+
+Request bodies are counted as they are handed to the connection, whatever
+they are made of (bytes, multipart forms, file streams), so a tracker sees
+every upload of the PinAPI instances it is attached to, in any thread.
+"""
+import threading
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterator
+
+import httpx
+
+# in-memory bodies are sent as a single chunk, reported in slices of this size
+SLICE_SIZE = 256 * 1024
+
+
+class Upload:
+    """Bytes sent of a request body named after the content it uploads"""
+
+    def __init__(
+        self, tracker: "ProgressTracker", name: str, total: int | None
+    ) -> None:
+        self.tracker = tracker
+        self.name = name
+        self.total = total
+        self.sent = 0
+        self.started = self.updated = time.monotonic()
+        self.done = False
+
+    @property
+    def elapsed(self) -> float:
+        return self.updated - self.started
+
+    @property
+    def rate(self) -> float:
+        """Bytes per second"""
+        return self.sent / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """Seconds left at the current rate, None if unknown"""
+        if self.total is None or self.rate == 0:
+            return None
+        return (self.total - self.sent) / self.rate
+
+    def stalled(self, after: float) -> bool:
+        """Whether nothing was sent for `after` seconds"""
+        return not self.done and time.monotonic() - self.updated >= after
+
+    def advance(self, size: int) -> None:
+        self.sent += size
+        self.updated = time.monotonic()
+        self.tracker._advance(self, size)
+
+    def finish(self) -> None:
+        if not self.done:
+            self.done = True
+            self.tracker._finish(self)
+
+
+class ProgressTracker:
+    """
+    Progress of every upload of a batch, reported to `callback` whenever a
+    chunk of a body is sent. It is called from the thread (or event loop)
+    uploading, so it should return quickly.
+    """
+
+    def __init__(self, callback: Callable[[Upload], None] | None = None) -> None:
+        self.callback = callback
+        self.sent = 0
+        self.started: float | None = None
+        self.uploads: list[Upload] = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> list[Upload]:
+        with self._lock:
+            return list(self.uploads)
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second sent by the whole batch since its first upload"""
+        if self.started is None:
+            return 0.0
+        elapsed = time.monotonic() - self.started
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def stalled(self, after: float) -> list[Upload]:
+        """Uploads that sent nothing for `after` seconds"""
+        return [upload for upload in self.active if upload.stalled(after)]
+
+    def start(self, name: str, total: int | None = None) -> Upload:
+        upload = Upload(self, name, total)
+        with self._lock:
+            if self.started is None:
+                self.started = upload.started
+            self.uploads.append(upload)
+        return upload
+
+    def _advance(self, upload: Upload, size: int) -> None:
+        with self._lock:
+            self.sent += size
+        if self.callback is not None:
+            self.callback(upload)
+
+    def _finish(self, upload: Upload) -> None:
+        with self._lock:
+            self.uploads.remove(upload)
+
+    def track(self, request: httpx.Request, name: str) -> Upload:
+        """Count the body of a request as it is sent"""
+        length = request.headers.get("Content-Length")
+        upload = self.start(name, None if length is None else int(length))
+        request.stream = ProgressStream(request.stream, upload)
+        return upload
+
+
+class ProgressStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """A request body reporting its chunks to an upload as they are sent"""
+
+    def __init__(self, stream, upload: Upload) -> None:
+        self.stream = stream
+        self.upload = upload
+
+    def _slices(self, chunk: bytes) -> Iterator[bytes]:
+        for offset in range(0, len(chunk), SLICE_SIZE):
+            piece = chunk[offset : offset + SLICE_SIZE]
+            self.upload.advance(len(piece))
+            yield piece
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            for chunk in self.stream:
+                yield from self._slices(chunk)
+        finally:
+            self.upload.finish()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self.stream:
+                for piece in self._slices(chunk):
+                    yield piece
+        finally:
+            self.upload.finish()
@@ -0,0 +1,103 @@
+"""
+Client-side rate limiting of the requests to pinning services.
+
+Each budget is a token bucket, shared by every client of a service using the
+same credentials, in any thread or event loop. A request reserves a token
+and waits until it is due, so waiting requests are served in order.
+"""
+import threading
+import time
+from collections.abc import Hashable
+from typing import TYPE_CHECKING
+
+import anyio
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .config import Config
+
+UPLOAD_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+
+class TokenBucket:
+    """`rate` tokens per second, up to `capacity` saved for bursts"""
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, returning the seconds to wait until it is available"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+            # tokens go negative while reserved by waiting requests
+            self._tokens -= 1
+            return max(-self._tokens / self.rate, 0.0)
+
+    def acquire(self) -> None:
+        if (delay := self._reserve()) > 0:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        if (delay := self._reserve()) > 0:
+            await anyio.sleep(delay)
+
+
+class RateLimit:
+    """
+    `requests` requests per `period` seconds, of which up to `burst` may be
+    sent at once after an idle spell. The bucket holds `burst` tokens and
+    refills at `requests / period` tokens per second.
+    """
+
+    def __init__(self, requests: int, period: float = 1.0, burst: int = 1) -> None:
+        if not 1 <= burst <= requests:
+            raise ValueError("burst must be between 1 and requests")
+
+        self.requests = requests
+        self.period = period
+        self.burst = burst
+
+    def bucket(self) -> TokenBucket:
+        return TokenBucket(self.requests / self.period, self.burst)
+
+
+_lock = threading.Lock()
+_buckets: dict[tuple[Hashable, ...], TokenBucket] = {}
+
+
+def _credentials(config: "Config") -> Hashable:
+    # BearerAuth credentials are their token, other auths their instance
+    return getattr(config.auth, "token", config.auth)
+
+
+class RateLimiter:
+    """
+    Upload and read budgets of a service. Uploads are POST, PUT and PATCH
+    requests, reads every other one. Either can be left unlimited, and giving
+    the same RateLimit to both spends a single budget.
+    """
+
+    def __init__(
+        self, upload: RateLimit | None = None, read: RateLimit | None = None
+    ) -> None:
+        self.upload = upload
+        self.read = read
+
+    def bucket(self, config: "Config", method: str) -> TokenBucket | None:
+        """Bucket of a request, shared by the clients of the same credentials"""
+        limit = self.upload if method in UPLOAD_METHODS else self.read
+        if limit is None:
+            return None
+
+        key = (config.url, _credentials(config), limit)
+        with _lock:
+            if (bucket := _buckets.get(key)) is None:
+                bucket = _buckets[key] = limit.bucket()
+            return bucket
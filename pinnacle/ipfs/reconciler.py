@@ -0,0 +1,471 @@
+"""
+Reconciliation of the pins of several providers with a manifest.
+
+A manifest is the set of CIDs every provider should hold: a PinLedger, or
+any iterable of CIDs. The pins of every provider are listed, then diffed
+with the manifest to find the CIDs missing from the provider, and the pins
+it holds beyond the manifest. CIDs are compared in their version 1 form, so
+a CIDv0 matches the CIDv1 of the same block.
+
+Sets of millions of CIDs are spilled to temporary SQLite databases on disk
+as they are listed, and diffed by merging them in CID order. Memory is
+bounded by the page cache of SQLite and the pages of a listing in flight,
+time is a B-tree insert per pin and a linear merge.
+
+Missing CIDs are pinned by CID, the provider fetching their contents from
+the IPFS network, where they must be provided. Extra pins are only unpinned
+when asked to.
+"""
+import sqlite3
+from collections.abc import AsyncIterator
+from collections.abc import Generator
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractAsyncContextManager
+from contextlib import aclosing
+from contextlib import closing
+from typing import cast
+from typing import Generic
+from typing import Literal
+from typing import TypeVar
+
+import anyio
+from anyio.streams.memory import MemoryObjectSendStream
+
+from pinnacle.ipfs.api import AsyncLocalPin
+from pinnacle.ipfs.api import AsyncPinAPI
+from pinnacle.ipfs.api import AsyncPinata
+from pinnacle.ipfs.api import AsyncPinningServiceAPI
+from pinnacle.ipfs.api import LocalPin
+from pinnacle.ipfs.api import PinAPI
+from pinnacle.ipfs.api import Pinata
+from pinnacle.ipfs.api import PinningServiceAPI
+from pinnacle.ipfs.api.local_pin import LocalPinLs
+from pinnacle.ipfs.api.pin_api import AsyncResults
+from pinnacle.ipfs.api.pin_api import DEFAULT_CONCURRENCY
+from pinnacle.ipfs.api.pinata import PinataPin
+from pinnacle.ipfs.content import CID
+from pinnacle.ipfs.ledger import PinLedger
+from pinnacle.ipfs.models import Pin
+from pinnacle.ipfs.models import PinStatus
+from pinnacle.ipfs.models import Status
+
+# rows inserted in a pin set per transaction
+INSERT_BATCH = 10_000
+
+# pins of a Pinning Services API that hold, or will hold, their CID
+HELD_STATUSES = (Status.queued, Status.pinning, Status.pinned)
+
+LISTABLE = (
+    PinningServiceAPI,
+    Pinata,
+    LocalPin,
+    AsyncPinningServiceAPI,
+    AsyncPinata,
+    AsyncLocalPin,
+)
+
+Diff = Literal["missing", "extra"]
+# (account, "missing" or "extra", cid, None or the exception raised)
+Repair = tuple[str, Diff, str, None | Exception]
+# (cid, None or the exception raised)
+Unpin = tuple[str, None | Exception]
+PinAPIT = TypeVar("PinAPIT", bound=PinAPI | AsyncPinAPI)
+
+
+class PinSet:
+    """
+    A set of pins spilled to a temporary SQLite database, iterated in CID
+    order. Each pin is a (cid, key) row, the key removing it from its
+    provider: the request id on a Pinning Services API, the CID elsewhere.
+    """
+
+    def __init__(self, pins: Iterable[tuple[str, str]] = ()) -> None:
+        # an empty name opens a database on disk, deleted once closed
+        self._conn = sqlite3.connect("", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = OFF")
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.execute(
+            "CREATE TABLE pins (cid TEXT NOT NULL, key TEXT NOT NULL,"
+            " PRIMARY KEY (cid, key)) WITHOUT ROWID"
+        )
+        self.update(pins)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_instance, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM pins").fetchone()
+        return int(count)
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        return iter(self._conn.execute("SELECT cid, key FROM pins ORDER BY cid, key"))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def add_batch(self, pins: list[tuple[str, str]]) -> None:
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO pins VALUES (?, ?)", pins)
+
+    def update(self, pins: Iterable[tuple[str, str]]) -> None:
+        batch: list[tuple[str, str]] = []
+        for pin in pins:
+            batch.append(pin)
+            if len(batch) >= INSERT_BATCH:
+                self.add_batch(batch)
+                batch = []
+        if batch:
+            self.add_batch(batch)
+
+    async def aupdate(self, pins: AsyncIterator[tuple[str, str]]) -> None:
+        batch: list[tuple[str, str]] = []
+        async for pin in pins:
+            batch.append(pin)
+            if len(batch) >= INSERT_BATCH:
+                await anyio.to_thread.run_sync(self.add_batch, batch)
+                batch = []
+        if batch:
+            await anyio.to_thread.run_sync(self.add_batch, batch)
+
+    def cids(self) -> Iterator[str]:
+        """Every CID of the set once, in order"""
+        rows = self._conn.execute("SELECT DISTINCT cid FROM pins ORDER BY cid")
+        return (cid for (cid,) in rows)
+
+
+def diff(
+    expected: Iterable[str], pins: Iterable[tuple[str, str]]
+) -> Iterator[tuple[Diff, str, str]]:
+    """
+    Merge the CIDs expected, sorted and unique, with the (cid, key) pins of a
+    provider, sorted by CID. Yield ("missing", cid, cid) for every CID not
+    pinned, and ("extra", cid, key) for every pin not expected.
+    """
+    expected, pins = iter(expected), iter(pins)
+    cid, pin = next(expected, None), next(pins, None)
+    while cid is not None or pin is not None:
+        if cid is not None and (pin is None or cid < pin[0]):
+            yield "missing", cid, cid
+            cid = next(expected, None)
+        elif pin is not None and (cid is None or pin[0] < cid):
+            yield "extra", *pin
+            pin = next(pins, None)
+        else:
+            # pinned, maybe more than once
+            while pin is not None and pin[0] == cid:
+                pin = next(pins, None)
+            cid = next(expected, None)
+
+
+def _cid_v1(cid: str) -> str:
+    """CIDv1 form of a CID, or the string itself if it is not one"""
+    try:
+        parsed = CID.decode(cid)
+    except (ValueError, IndexError):
+        return cid
+    if str(parsed) != cid:
+        return cid
+    return str(CID(1, parsed.codec, parsed.digest))
+
+
+def _pin_row(pin: PinStatus | PinataPin | LocalPinLs) -> tuple[str, str]:
+    if isinstance(pin, PinStatus):
+        return _cid_v1(pin.pin.cid), pin.requestid
+    return _cid_v1(pin.cid), pin.cid
+
+
+class ProviderDiff:
+    """CIDs of the manifest missing from an account, and its pins beyond it"""
+
+    def __init__(self, account: str) -> None:
+        self.account = account
+        self.missing = PinSet()
+        self.extra = PinSet()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_instance, traceback):
+        self.close()
+
+    def close(self) -> None:
+        self.missing.close()
+        self.extra.close()
+
+
+class BaseReconciler(Generic[PinAPIT]):
+    def __init__(
+        self, pin_apis: Sequence[PinAPIT], *, concurrency: int = DEFAULT_CONCURRENCY
+    ) -> None:
+        if not pin_apis:
+            raise ValueError("Reconciler needs at least one pinning service")
+        for pin_api in pin_apis:
+            if not isinstance(pin_api, LISTABLE):
+                raise ValueError(f"The pins of {pin_api.provider} cannot be listed")
+        if len({pin_api.account for pin_api in pin_apis}) < len(pin_apis):
+            raise ValueError("Reconciler cannot list the same account twice")
+
+        self.pin_apis: Sequence[PinAPIT] = pin_apis
+        self.concurrency = concurrency
+
+    @staticmethod
+    def _manifest(manifest: Iterable[str] | PinLedger) -> PinSet:
+        cids = manifest.cids() if isinstance(manifest, PinLedger) else manifest
+        return PinSet((cid_v1, cid_v1) for cid_v1 in map(_cid_v1, cids))
+
+    @staticmethod
+    def _diff(account: str, expected: PinSet, pins: PinSet) -> ProviderDiff:
+        provider_diff = ProviderDiff(account)
+        missing: list[tuple[str, str]] = []
+        extra: list[tuple[str, str]] = []
+        for kind, cid, key in diff(expected.cids(), pins):
+            if kind == "missing":
+                missing.append((cid, key))
+            else:
+                extra.append((cid, key))
+
+            if len(missing) >= INSERT_BATCH:
+                provider_diff.missing.add_batch(missing)
+                missing = []
+            if len(extra) >= INSERT_BATCH:
+                provider_diff.extra.add_batch(extra)
+                extra = []
+
+        provider_diff.missing.update(missing)
+        provider_diff.extra.update(extra)
+        return provider_diff
+
+
+class Reconciler(BaseReconciler[PinAPI]):
+    """
+    Diff the pins of providers with a manifest, then repair them over pools
+    of `concurrency` threads. Providers are listed at once, each in its own
+    thread; a failed listing raises rather than passing for an empty one.
+    Diffs and repairs are keyed by account, as two accounts may share a
+    pinning service.
+    """
+
+    def _list(self, pin_api: PinAPI) -> PinSet:
+        pins = PinSet()
+        listing: Generator[PinStatus | PinataPin | LocalPinLs, None, None]
+        if isinstance(pin_api, PinningServiceAPI):
+            listing = pin_api.iter_pins(status=HELD_STATUSES)
+        else:
+            listing = cast(Pinata | LocalPin, pin_api).iter_pins()
+        with closing(listing):
+            pins.update(map(_pin_row, listing))
+        return pins
+
+    def diff(self, manifest: Iterable[str] | PinLedger) -> dict[str, ProviderDiff]:
+        """Diff of every provider with the manifest, to be closed once used"""
+        with self._manifest(manifest) as expected:
+            with ThreadPoolExecutor(len(self.pin_apis)) as executor:
+                listings = list(executor.map(self._list, self.pin_apis))
+
+            diffs = {}
+            for pin_api, pins in zip(self.pin_apis, listings):
+                with pins:
+                    diffs[pin_api.account] = self._diff(pin_api.account, expected, pins)
+        return diffs
+
+    def _pin(self, pin_api: PinAPI, cid: str) -> None:
+        if isinstance(pin_api, PinningServiceAPI):
+            pin_api.add_pin(Pin(cid=cid))
+        elif isinstance(pin_api, Pinata):
+            pin_api.pin_by_hash(cid)
+        else:
+            cast(LocalPin, pin_api).pin([cid])
+
+    def _unpin(
+        self, pin_api: PinAPI, pins: PinSet
+    ) -> Iterator[tuple[str, None | Exception]]:
+        if isinstance(pin_api, LocalPin):
+            return pin_api.unpin_many(key for _, key in pins)
+        if isinstance(pin_api, Pinata):
+            keys = (key for _, key in pins)
+            return pin_api.unpin_many(keys, concurrency=self.concurrency)
+
+        # pins of a Pinning Services API are removed by request id
+        api = cast(PinningServiceAPI, pin_api)
+        results = api._map_concurrently(
+            lambda pin: api.remove(pin[1]), pins, self.concurrency
+        )
+        return ((cid, error) for (cid, _), error in results)
+
+    def repair(
+        self, diffs: dict[str, ProviderDiff], *, unpin_extra: bool = False
+    ) -> Iterator[Repair]:
+        """
+        Pin the missing CIDs of every provider, and unpin its extra pins if
+        `unpin_extra`, yielding (account, "missing" or "extra", cid, None or
+        the exception raised). Providers are repaired one after the other.
+        """
+        for pin_api in self.pin_apis:
+            provider_diff = diffs[pin_api.account]
+
+            def pin(cid: str, pin_api: PinAPI = pin_api) -> None:
+                self._pin(pin_api, cid)
+
+            results = pin_api._map_concurrently(
+                pin, provider_diff.missing.cids(), self.concurrency
+            )
+            for cid, error in results:
+                yield pin_api.account, "missing", cid, error
+
+            if unpin_extra:
+                for cid, error in self._unpin(pin_api, provider_diff.extra):
+                    yield pin_api.account, "extra", cid, error
+
+    def reconcile(
+        self, manifest: Iterable[str] | PinLedger, *, unpin_extra: bool = False
+    ) -> Iterator[Repair]:
+        """Diff the providers with the manifest, then repair them"""
+        diffs = self.diff(manifest)
+        try:
+            yield from self.repair(diffs, unpin_extra=unpin_extra)
+        finally:
+            for provider_diff in diffs.values():
+                provider_diff.close()
+
+
+class AsyncReconciler(BaseReconciler[AsyncPinAPI]):
+    """
+    Diff the pins of providers with a manifest, then repair them
+    `concurrency` requests at a time. Providers are listed concurrently; a
+    failed listing raises rather than passing for an empty one. Diffs and
+    repairs are keyed by account, and the SQLite work runs in worker threads.
+    """
+
+    async def _list(self, pin_api: AsyncPinAPI) -> PinSet:
+        pins = PinSet()
+        listing: AbstractAsyncContextManager[
+            AsyncIterator[PinStatus | PinataPin | LocalPinLs]
+        ]
+        if isinstance(pin_api, AsyncPinningServiceAPI):
+            listing = pin_api.iter_pins(status=HELD_STATUSES)
+        elif isinstance(pin_api, AsyncPinata):
+            listing = pin_api.iter_pins()
+        else:
+            listing = aclosing(cast(AsyncLocalPin, pin_api).iter_pins())
+        async with listing as listed:
+            await pins.aupdate(_pin_row(pin) async for pin in listed)
+        return pins
+
+    async def diff(
+        self, manifest: Iterable[str] | PinLedger
+    ) -> dict[str, ProviderDiff]:
+        """Diff of every provider with the manifest, to be closed once used"""
+        listings: dict[str, PinSet] = {}
+
+        async def list_pins(pin_api: AsyncPinAPI) -> None:
+            listings[pin_api.account] = await self._list(pin_api)
+
+        expected = await anyio.to_thread.run_sync(self._manifest, manifest)
+        with expected:
+            try:
+                async with anyio.create_task_group() as tg:
+                    for pin_api in self.pin_apis:
+                        tg.start_soon(list_pins, pin_api)
+
+                diffs = {}
+                for account, pins in listings.items():
+                    diffs[account] = await anyio.to_thread.run_sync(
+                        self._diff, account, expected, pins
+                    )
+                return diffs
+            finally:
+                for pins in listings.values():
+                    pins.close()
+
+    async def _pin(self, pin_api: AsyncPinAPI, cid: str) -> None:
+        if isinstance(pin_api, AsyncPinningServiceAPI):
+            await pin_api.add_pin(Pin(cid=cid))
+        elif isinstance(pin_api, AsyncPinata):
+            await pin_api.pin_by_hash(cid)
+        else:
+            await cast(AsyncLocalPin, pin_api).pin([cid])
+
+    def _unpin(
+        self, pin_api: AsyncPinAPI, pins: PinSet
+    ) -> AsyncResults[tuple[str, None | Exception]]:
+        if isinstance(pin_api, AsyncPinata):
+            keys = (key for _, key in pins)
+            return pin_api.unpin_many(keys, concurrency=self.concurrency)
+
+        if isinstance(pin_api, AsyncLocalPin):
+            local_pin = pin_api
+
+            async def unpin(send: MemoryObjectSendStream[Iterable[Unpin]]) -> None:
+                unpinned = local_pin.unpin_many(key for _, key in pins)
+                async with aclosing(unpinned):
+                    async for result in unpinned:
+                        await send.send([result])
+
+            return AsyncResults(unpin)
+
+        # pins of a Pinning Services API are removed by request id
+        api = cast(AsyncPinningServiceAPI, pin_api)
+
+        async def remove(pin: tuple[str, str]) -> None:
+            await api.remove(pin[1])
+
+        async def removed(send: MemoryObjectSendStream[Iterable[Unpin]]) -> None:
+            async with api._map_concurrently(remove, pins, self.concurrency) as results:
+                async for (cid, _), error in results:
+                    await send.send([(cid, error)])
+
+        return AsyncResults(removed)
+
+    def repair(
+        self, diffs: dict[str, ProviderDiff], *, unpin_extra: bool = False
+    ) -> AsyncResults[Repair]:
+        """
+        Pin the missing CIDs of every provider, and unpin its extra pins if
+        `unpin_extra`, yielding (account, "missing" or "extra", cid, None or
+        the exception raised) inside `async with`. Providers are repaired one
+        after the other.
+        """
+
+        async def produce(send: MemoryObjectSendStream[Iterable[Repair]]) -> None:
+            for pin_api in self.pin_apis:
+                provider_diff = diffs[pin_api.account]
+
+                async def pin(cid: str, pin_api: AsyncPinAPI = pin_api) -> None:
+                    await self._pin(pin_api, cid)
+
+                async with pin_api._map_concurrently(
+                    pin, provider_diff.missing.cids(), self.concurrency
+                ) as pinned:
+                    async for cid, error in pinned:
+                        await send.send([(pin_api.account, "missing", cid, error)])
+
+                if not unpin_extra:
+                    continue
+                async with self._unpin(pin_api, provider_diff.extra) as unpinned:
+                    async for cid, error in unpinned:
+                        await send.send([(pin_api.account, "extra", cid, error)])
+
+        return AsyncResults(produce)
+
+    def reconcile(
+        self, manifest: Iterable[str] | PinLedger, *, unpin_extra: bool = False
+    ) -> AsyncResults[Repair]:
+        """Diff the providers with the manifest, then repair them"""
+
+        async def produce(send: MemoryObjectSendStream[Iterable[Repair]]) -> None:
+            diffs = await self.diff(manifest)
+            try:
+                async with self.repair(diffs, unpin_extra=unpin_extra) as repairs:
+                    async for repair in repairs:
+                        await send.send([repair])
+            finally:
+                for provider_diff in diffs.values():
+                    provider_diff.close()
+
+        return AsyncResults(produce)
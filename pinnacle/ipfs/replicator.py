@@ -0,0 +1,88 @@
+from collections.abc import Sequence
+from contextlib import AsyncExitStack
+
+import anyio
+
+from pinnacle.ipfs.api import AsyncPinAPI
+from pinnacle.ipfs.content import AsyncContent
+from pinnacle.ipfs.content.mapped import MappedContentMixin
+from pinnacle.ipfs.models import Pin
+
+
+class UnsharedContentError(ValueError):
+    def __init__(self) -> None:
+        super().__init__(
+            "A streamed file cannot be read by several providers at once, "
+            "use AsyncMappedContent or a non-streaming AsyncContent"
+        )
+
+
+class Replicator:
+    """
+    Pin a content to several providers at once, reading its file a single time.
+
+    Every provider uploads the same body: the bytes of a content read in
+    memory, or the slices of a memory mapped content. None of them holds a
+    position in the file, so a slow provider never holds back the others.
+    """
+
+    def __init__(self, pin_apis: Sequence[AsyncPinAPI]) -> None:
+        if not pin_apis:
+            raise ValueError("Replicator needs at least one pinning service")
+        if len({pin_api.account for pin_api in pin_apis}) < len(pin_apis):
+            raise ValueError("Replicator cannot pin twice to the same account")
+
+        self.pin_apis = pin_apis
+        self._stack = AsyncExitStack()
+
+    async def __aenter__(self):
+        for pin_api in self.pin_apis:
+            await self._stack.enter_async_context(pin_api)
+        return self
+
+    async def __aexit__(self, exc_type, exc_instance, traceback):
+        return await self._stack.__aexit__(exc_type, exc_instance, traceback)
+
+    async def _replicate(
+        self, content: AsyncContent, cid_version: int, timeout: float | None
+    ) -> dict[str, Pin | Exception]:
+        results: dict[str, Pin | Exception] = {}
+
+        async def add(pin_api: AsyncPinAPI):
+            try:
+                with anyio.fail_after(timeout):
+                    results[pin_api.account] = await pin_api.add(
+                        content, cid_version=cid_version
+                    )
+            except Exception as error:
+                results[pin_api.account] = error
+
+        async with anyio.create_task_group() as tg:
+            for pin_api in self.pin_apis:
+                tg.start_soon(add, pin_api)
+
+        return results
+
+    async def replicate(
+        self,
+        content: AsyncContent,
+        *,
+        cid_version: int = 1,
+        timeout: float | None = None,
+    ) -> dict[str, Pin | Exception]:
+        """
+        Pin a content to every provider concurrently.
+
+        Return the Pin, or the exception raised, of every provider keyed by its
+        account, as two accounts may share a pinning service. A provider
+        taking longer than `timeout` seconds is given up with a TimeoutError.
+        A content not yet opened is opened for the replication only.
+        """
+        if content.streaming and not isinstance(content, MappedContentMixin):
+            raise UnsharedContentError
+
+        if content.opened:
+            return await self._replicate(content, cid_version, timeout)
+
+        async with content:
+            return await self._replicate(content, cid_version, timeout)
@@ -0,0 +1,163 @@
+"""
+Retry policy of the requests to pinning services.
+
+A failed request is only sent again when doing so cannot pin a content twice:
+idempotent methods are retried on any transient failure, other requests only
+when the service certainly did not process them (the connection was never
+made, or a 429/503 answer), unless they are marked idempotent or carry an
+idempotency key.
+"""
+import random
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from collections.abc import Mapping
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+from typing import Self
+
+import httpx
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+# answers telling the request was rejected before being processed
+UNPROCESSED_STATUSES = frozenset({429, 503})
+
+# errors raised before any byte reached the service
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# status code: number of retries it is allowed
+DEFAULT_STATUSES: Mapping[int, int] = {429: 5, 500: 2, 502: 3, 503: 3, 504: 3}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header, in seconds or as an HTTP date"""
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def replayable(content: Any) -> bool:
+    """
+    Whether a request body can be sent again. Bodies built by contents (bytes,
+    rewinding file streams, multipart streams) are; one-shot iterators are not.
+    """
+    return not isinstance(content, Iterator | AsyncIterator)
+
+
+class RetryPolicy:
+    """
+    How many times, and after how long, a failed request is sent again.
+
+    `statuses` maps the retried status codes to their own number of retries,
+    `retries` caps them all, as well as transport errors. Waits follow an
+    exponential backoff with full jitter, unless the service sets Retry-After.
+    No attempt is made past `total` seconds after the first one.
+    """
+
+    def __init__(
+        self,
+        retries: int = 3,
+        *,
+        statuses: Mapping[int, int] = DEFAULT_STATUSES,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        total: float | None = 120.0,
+        respect_retry_after: bool = True,
+        idempotency_header: str | None = None,
+    ) -> None:
+        self.retries = retries
+        self.statuses = statuses
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.total = total
+        self.respect_retry_after = respect_retry_after
+        self.idempotency_header = idempotency_header
+
+    def replace(self, **changes: Any) -> Self:
+        """Copy of the policy with some options changed"""
+        policy = object.__new__(type(self))
+        policy.__dict__ = self.__dict__ | changes
+        return policy
+
+    def retryable(
+        self,
+        attempt: int,
+        idempotent: bool,
+        response: httpx.Response | None = None,
+        error: Exception | None = None,
+    ) -> bool:
+        """Whether a request failing for the `attempt`-th time can be retried"""
+        if attempt >= self.retries:
+            return False
+
+        if error is not None:
+            if isinstance(error, UNSENT_ERRORS):
+                return True
+            return idempotent and isinstance(error, httpx.TransportError)
+
+        if response is None or attempt >= self.statuses.get(response.status_code, 0):
+            return False
+        return idempotent or response.status_code in UNPROCESSED_STATUSES
+
+    def delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """Seconds to wait before the next attempt"""
+        if response is not None and self.respect_retry_after:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def start(self, idempotent: bool) -> "Retrying":
+        return Retrying(self, idempotent)
+
+
+class Retrying:
+    """Attempts of a single request under a retry policy"""
+
+    def __init__(self, policy: RetryPolicy, idempotent: bool) -> None:
+        self.policy = policy
+        self.idempotent = idempotent
+        self.attempt = 0
+        self.deadline = None
+        if policy.total is not None:
+            self.deadline = time.monotonic() + policy.total
+
+    def next_delay(
+        self,
+        response: httpx.Response | None = None,
+        error: Exception | None = None,
+    ) -> float | None:
+        """Seconds to wait before retrying a failed attempt, None to give up"""
+        if response is not None and response.is_success:
+            return None
+
+        policy = self.policy
+        if not policy.retryable(self.attempt, self.idempotent, response, error):
+            return None
+
+        delay = policy.delay(self.attempt, response)
+        if self.deadline is not None and time.monotonic() + delay > self.deadline:
+            return None
+
+        self.attempt += 1
+        return delay
+
+
+DEFAULT_RETRY = RetryPolicy()
@@ -0,0 +1,390 @@
+"""
+Tracking of remote pins until they are pinned or failed.
+
+Pins requested from a service go through queued, pinning and pinned (or
+failed). A tracker polls all the pins it is given in as few requests as the
+service allows, in the background:
+
+- a Pinning Services API is listed by the CIDs of the due pins, ten per
+  query, so a poll costs a request per ten pins still pending whatever the
+  number of pins already done
+- NFT.Storage has no listing by CIDs, each one is checked on its own,
+  `concurrency` at a time
+
+A pin is polled every `interval` seconds, an interval multiplied by
+`backoff` (up to `max_interval`) each time it is found unchanged, and reset
+when its status moves on. HTTP errors are retried at the next poll, any
+other error fails every pending pin.
+"""
+import threading
+import time
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Any
+from typing import cast
+from typing import ClassVar
+from typing import Generic
+from typing import TypeVar
+
+import anyio
+import httpx
+
+from pinnacle.ipfs.api import AsyncNFTStorage
+from pinnacle.ipfs.api import AsyncPinningServiceAPI
+from pinnacle.ipfs.api import NFTStorage
+from pinnacle.ipfs.api import PinningServiceAPI
+from pinnacle.ipfs.api.nft_storage import NFTCheck
+from pinnacle.ipfs.models import PinStatus
+from pinnacle.ipfs.models import Status
+
+# most CIDs a Pinning Services API accepts in a single listing
+CID_FILTER_LIMIT = 10
+FINAL_STATUSES = (Status.pinned, Status.failed)
+
+Result = PinStatus | NFTCheck
+PinAPIT = TypeVar("PinAPIT")
+
+
+class TrackedPin:
+    """A pin polled until the service reports it pinned or failed"""
+
+    def __init__(self, key: str, cid: str, interval: float) -> None:
+        # request id on a Pinning Services API, CID on NFT.Storage
+        self.key = key
+        self.cid = cid
+        self.status = Status.queued
+        self.result: Result | None = None
+        self.interval = interval
+        self.due = time.monotonic() + interval
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+
+class BaseStatusTracker(Generic[PinAPIT]):
+    _tracked_pin: ClassVar[type[TrackedPin]] = TrackedPin
+
+    def __init__(
+        self,
+        pin_api: PinAPIT,
+        *,
+        interval: float = 1.0,
+        max_interval: float = 60.0,
+        backoff: float = 2.0,
+        concurrency: int = 8,
+    ) -> None:
+        self.pin_api = pin_api
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.concurrency = concurrency
+
+        self._lock = threading.Lock()
+        self._pending: dict[str, TrackedPin] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _new(self, pin: PinStatus | str) -> TrackedPin:
+        if isinstance(pin, str) and isinstance(
+            self.pin_api, PinningServiceAPI | AsyncPinningServiceAPI
+        ):
+            # statuses are listed by CID, but only matched by request id
+            raise ValueError("A Pinning Services API tracks a pin by its status")
+
+        if isinstance(pin, PinStatus):
+            tracked = self._tracked_pin(pin.requestid, pin.pin.cid, self.interval)
+            tracked.status = pin.status
+        else:
+            tracked = self._tracked_pin(pin, pin, self.interval)
+        return tracked
+
+    def _add(self, tracked: TrackedPin) -> None:
+        with self._lock:
+            self._pending[tracked.key] = tracked
+
+    def _delay(self) -> float | None:
+        """Seconds until the next pin is due, None if none is pending"""
+        with self._lock:
+            if not self._pending:
+                return None
+            due = min(tracked.due for tracked in self._pending.values())
+        return max(due - time.monotonic(), 0.0)
+
+    def _due(self) -> list[TrackedPin]:
+        now = time.monotonic()
+        with self._lock:
+            return [tracked for tracked in self._pending.values() if tracked.due <= now]
+
+    def _list_params(self, due: Iterable[TrackedPin]) -> Iterator[dict[str, Any]]:
+        """Listings of the due pins on a Pinning Services API, ten CIDs each"""
+        cids = sorted({tracked.cid for tracked in due})
+        for start in range(0, len(cids), CID_FILTER_LIMIT):
+            cid = set(cids[start : start + CID_FILTER_LIMIT])
+            yield {"status": FINAL_STATUSES, "cid": cid}
+
+    def _update(self, key: str, status: Status, result: Result) -> None:
+        with self._lock:
+            if (tracked := self._pending.get(key)) is None:
+                return
+
+            changed = status != tracked.status
+            tracked.status, tracked.result = status, result
+            if tracked.done:
+                del self._pending[key]
+            else:
+                self._reschedule(tracked, changed)
+
+        if tracked.done:
+            self._complete(tracked)
+
+    def _reschedule(self, tracked: TrackedPin, changed: bool) -> None:
+        if changed:
+            tracked.interval = self.interval
+        else:
+            tracked.interval = min(tracked.interval * self.backoff, self.max_interval)
+        tracked.due = time.monotonic() + tracked.interval
+
+    def _back_off(self, due: Iterable[TrackedPin]) -> None:
+        """Reschedule the due pins left unchanged by a poll"""
+        now = time.monotonic()
+        with self._lock:
+            for tracked in due:
+                if not tracked.done and tracked.due <= now:
+                    self._reschedule(tracked, changed=False)
+
+    def _fail(self, error: Exception) -> None:
+        """Fail every pending pin, on an error a later poll wouldn't fix"""
+        with self._lock:
+            failed = list(self._pending.values())
+            self._pending.clear()
+
+        for tracked in failed:
+            self._abort(tracked, error)
+
+    def _complete(self, tracked: TrackedPin) -> None:
+        ...  # pragma: no cover
+
+    def _abort(self, tracked: TrackedPin, error: Exception) -> None:
+        ...  # pragma: no cover
+
+    def _checked(self, tracked: TrackedPin, check: NFTCheck) -> None:
+        if check.pin is not None:
+            self._update(tracked.key, check.pin.status, check)
+
+
+class StatusTracker(BaseStatusTracker[PinningServiceAPI | NFTStorage]):
+    """
+    Track pins in a background thread, completing the future of each one
+    with its last status once it is pinned or failed.
+    """
+
+    def __init__(self, pin_api: PinningServiceAPI | NFTStorage, **kwds) -> None:
+        super().__init__(pin_api, **kwds)
+        self._futures: dict[str, Future[Result]] = {}
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_instance, traceback):
+        self.stop()
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling, cancelling the futures of the pins still pending"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        with self._lock:
+            futures, self._futures = self._futures, {}
+            self._pending.clear()
+        for future in futures.values():
+            future.cancel()
+
+    def track(self, pin: PinStatus | str) -> Future[Result]:
+        """
+        Track a pin by its status on a Pinning Services API, or its CID on
+        NFT.Storage. The future fails with the error that stopped its tracking.
+        """
+        tracked = self._new(pin)
+        future: Future[Result] = Future()
+        if tracked.done:
+            future.set_result(pin)  # type: ignore
+            return future
+
+        with self._lock:
+            self._futures[tracked.key] = future
+        self._add(tracked)
+        self._wakeup.set()
+        return future
+
+    def _complete(self, tracked: TrackedPin) -> None:
+        with self._lock:
+            future = self._futures.pop(tracked.key, None)
+        if future is not None:
+            future.set_result(tracked.result)  # type: ignore
+
+    def _abort(self, tracked: TrackedPin, error: Exception) -> None:
+        with self._lock:
+            future = self._futures.pop(tracked.key, None)
+        if future is not None:
+            future.set_exception(error)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self._delay())
+            self._wakeup.clear()
+            if not self._stopping.is_set():
+                self._poll()
+
+    def _poll(self) -> None:
+        if not (due := self._due()):
+            return
+
+        try:
+            if isinstance(self.pin_api, NFTStorage):
+                self._check(self.pin_api, due)
+            else:
+                self._list(self.pin_api, due)
+        except httpx.HTTPError:
+            pass  # the service is polled again later
+        except Exception as error:
+            self._fail(error)
+            return
+        self._back_off(due)
+
+    def _list(self, api: PinningServiceAPI, due: list[TrackedPin]) -> None:
+        for params in self._list_params(due):
+            with closing(api.iter_pins(**params)) as statuses:
+                for status in statuses:
+                    self._update(status.requestid, status.status, status)
+
+    def _check(self, api: NFTStorage, due: list[TrackedPin]) -> None:
+        def check(tracked: TrackedPin) -> None:
+            try:
+                self._checked(tracked, api.check(tracked.cid))
+            except httpx.HTTPError:
+                pass
+
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            list(executor.map(check, due))
+
+
+class AsyncTrackedPin(TrackedPin):
+    def __init__(self, *args, **kwds) -> None:
+        super().__init__(*args, **kwds)
+        self.event = anyio.Event()
+        self.error: Exception | None = None
+
+    async def wait(self) -> Result:
+        """
+        Last status of the pin, once it is pinned or failed. Raise the error
+        that stopped its tracking, if any.
+        """
+        await self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result  # type: ignore
+
+
+class AsyncStatusTracker(BaseStatusTracker[AsyncPinningServiceAPI | AsyncNFTStorage]):
+    """
+    Track pins in a background task while the tracker is entered, setting
+    the event of each one once it is pinned or failed.
+    """
+
+    _tracked_pin = AsyncTrackedPin
+
+    async def __aenter__(self):
+        self._wakeup = anyio.Event()
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+        self._task_group.start_soon(self._run)
+        return self
+
+    async def __aexit__(self, exc_type, exc_instance, traceback):
+        self._task_group.cancel_scope.cancel()
+        return await self._task_group.__aexit__(exc_type, exc_instance, traceback)
+
+    def track(self, pin: PinStatus | str) -> AsyncTrackedPin:
+        """
+        Track a pin by its status on a Pinning Services API, or its CID on
+        NFT.Storage. Waiting on it raises the error that stopped its tracking.
+        """
+        tracked = cast(AsyncTrackedPin, self._new(pin))
+        if tracked.done:
+            tracked.result = pin  # type: ignore
+            tracked.event.set()
+            return tracked
+
+        self._add(tracked)
+        self._wakeup.set()
+        return tracked
+
+    def _complete(self, tracked: TrackedPin) -> None:
+        if isinstance(tracked, AsyncTrackedPin):
+            tracked.event.set()
+
+    def _abort(self, tracked: TrackedPin, error: Exception) -> None:
+        if isinstance(tracked, AsyncTrackedPin):
+            tracked.error = error
+            tracked.event.set()
+
+    async def _run(self) -> None:
+        while True:
+            with anyio.move_on_after(self._delay()):
+                await self._wakeup.wait()
+            self._wakeup = anyio.Event()
+            await self._poll()
+
+    async def _poll(self) -> None:
+        if not (due := self._due()):
+            return
+
+        try:
+            if isinstance(self.pin_api, AsyncNFTStorage):
+                await self._check(self.pin_api, due)
+            else:
+                await self._list(self.pin_api, due)
+        except httpx.HTTPError:
+            pass  # the service is polled again later
+        except Exception as error:
+            self._fail(error)
+            return
+        self._back_off(due)
+
+    async def _list(self, api: AsyncPinningServiceAPI, due: list[TrackedPin]) -> None:
+        for params in self._list_params(due):
+            async with api.iter_pins(**params) as statuses:
+                async for status in statuses:
+                    self._update(status.requestid, status.status, status)
+
+    async def _check(self, api: AsyncNFTStorage, due: list[TrackedPin]) -> None:
+        limiter = anyio.CapacityLimiter(self.concurrency)
+
+        async def check(tracked: TrackedPin) -> None:
+            async with limiter:
+                try:
+                    self._checked(tracked, await api.check(tracked.cid))
+                except httpx.HTTPError:
+                    pass
+
+        async with anyio.create_task_group() as tg:
+            for tracked in due:
+                tg.start_soon(check, tracked)
@@ -1,6 +1,8 @@
 import pytest
 
 from pinnacle.constants.dirs import IMG_DIR
+from pinnacle.ipfs.ratelimit import RateLimiter
+from pinnacle.ipfs.retry import DEFAULT_RETRY
 
 
 @pytest.fixture
@@ -8,6 +10,18 @@ def anyio_backend():
     return "asyncio"
 
 
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Retry failed requests right away"""
+    monkeypatch.setattr(DEFAULT_RETRY, "backoff", 0)
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    """Send requests right away, limiters are tested on their own"""
+    monkeypatch.setattr(RateLimiter, "bucket", lambda *args: None)
+
+
 @pytest.fixture
 def filename():
     return "han.png"
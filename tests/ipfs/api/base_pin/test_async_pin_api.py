@@ -1,12 +1,19 @@
 from itertools import product
+from unittest import mock
 
+import anyio
 import httpx
 import pytest
 import respx
 
+from pinnacle.constants.dirs import IMG_DIR
 from pinnacle.ipfs import Config
 from pinnacle.ipfs import Content
+from pinnacle.ipfs import PinLedger
 from pinnacle.ipfs.api import AsyncPinAPI
+from pinnacle.ipfs.content import AsyncContent
+from pinnacle.ipfs.models import Pin
+from tests.ipfs.api.conftest import CID
 from tests.ipfs.api.conftest import ENDPOINT
 from tests.ipfs.api.conftest import make_url
 from tests.ipfs.api.conftest import TEST_URL
@@ -111,3 +118,112 @@ async def test__get(headers, params):
 
     assert response.status_code == 200
     assert response.json() == mocked_response.json()
+
+
+class BatchAsyncPinAPI(TestAsyncPinAPI):
+    """Records how many uploads run at once, fails on kai.png"""
+
+    def __init__(self):
+        super().__init__()
+        self.running = self.peak = 0
+
+    async def add(self, content: AsyncContent, *, cid_version: int = 1):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await anyio.sleep(0.01)
+        self.running -= 1
+
+        if content.basename == "kai.png":
+            raise ValueError("kai.png")
+        return Pin(cid=CID, name=content.basename)
+
+
+@pytest.mark.anyio
+async def test_AsyncPinAPI_add_many():
+    contents = [AsyncContent(path) for path in sorted(IMG_DIR.iterdir()) * 4]
+    pin = BatchAsyncPinAPI()
+
+    async with pin.add_many(contents, concurrency=2) as added:
+        results = [item async for item in added]
+
+    assert len(results) == len(contents)
+    assert {id(content) for content, _ in results} == set(map(id, contents))
+    assert pin.peak == 2
+    assert all(content.closed for content in contents)
+
+    for content, res in results:
+        if content.basename == "kai.png":
+            assert isinstance(res, ValueError)
+        else:
+            assert isinstance(res, Pin)
+
+
+@pytest.mark.anyio
+async def test_AsyncPinAPI_add_many_with_ledger():
+    contents = [AsyncContent(path) for path in sorted(IMG_DIR.iterdir())]
+    pin = BatchAsyncPinAPI()
+
+    with PinLedger() as ledger, mock.patch.object(AsyncContent, "open") as opened:
+        pin.ledger = ledger
+        for content in contents:
+            ledger.record(content.path, pin.account, Pin(cid=CID))
+
+        async with pin.add_many(contents, concurrency=2) as added:
+            results = [item async for item in added]
+
+    # pins held by the ledger are returned without reading the files
+    opened.assert_not_called()
+    assert pin.peak == 0
+    assert all(res == Pin(cid=CID) for _, res in results)
+
+
+@pytest.mark.anyio
+async def test_AsyncPinAPI_add_many_async_iterable():
+    consumed = []
+
+    async def contents():
+        for path in sorted(IMG_DIR.iterdir()) * 10:
+            consumed.append(path)
+            yield AsyncContent(path)
+
+    async with BatchAsyncPinAPI().add_many(contents(), concurrency=3) as results:
+        async for _ in results:
+            break
+
+    assert len(consumed) < 10
+
+
+@pytest.mark.anyio
+async def test_AsyncPinAPI_add_many_outside_context():
+    results = BatchAsyncPinAPI().add_many([AsyncContent(IMG_DIR / "han.png")])
+
+    with pytest.raises(RuntimeError):
+        async for _ in results:
+            pass
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_async__request_retry(content):
+    async with TestAsyncPinAPI() as pin:
+        route = respx.post(make_url(pin, ENDPOINT))
+        ok = httpx.Response(204)
+        route.side_effect = [httpx.Response(503, headers={"Retry-After": "0"}), ok]
+
+        response = await pin._post(ENDPOINT, content=content)
+
+    assert response.status_code == 204
+    assert route.call_count == 2
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_async__request_retry_exhausted():
+    async with TestAsyncPinAPI() as pin:
+        route = respx.get(make_url(pin, ENDPOINT))
+        route.side_effect = httpx.ReadTimeout("timeout")
+
+        with pytest.raises(httpx.ReadTimeout):
+            await pin._get(ENDPOINT)
+
+    assert route.call_count == 4
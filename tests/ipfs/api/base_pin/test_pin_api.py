@@ -1,12 +1,20 @@
+import threading
+import time
 from itertools import product
+from unittest import mock
 
 import httpx
 import pytest
 import respx
 
+from pinnacle.constants.dirs import IMG_DIR
 from pinnacle.ipfs import Config
 from pinnacle.ipfs import Content
+from pinnacle.ipfs import PinLedger
 from pinnacle.ipfs.api import PinAPI
+from pinnacle.ipfs.models import Pin
+from pinnacle.ipfs.retry import RetryPolicy
+from tests.ipfs.api.conftest import CID
 from tests.ipfs.api.conftest import ENDPOINT
 from tests.ipfs.api.conftest import make_url
 from tests.ipfs.api.conftest import TEST_URL
@@ -105,3 +113,135 @@ def test__get(headers, params):
 
     assert response.status_code == 200
     assert response.json() == mocked_response.json()
+
+
+class BatchPinAPI(TestPinAPI):
+    """Records how many uploads run at once, fails on kai.png"""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.running = self.peak = 0
+
+    def add(self, content: Content, *, cid_version: int = 1):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+
+        if content.basename == "kai.png":
+            raise ValueError("kai.png")
+        return Pin(cid=CID, name=content.basename)
+
+
+def test_PinAPI_add_many():
+    contents = [Content(path) for path in sorted(IMG_DIR.iterdir()) * 4]
+    pin = BatchPinAPI()
+
+    results = list(pin.add_many(contents, concurrency=2))
+
+    assert len(results) == len(contents)
+    assert {id(content) for content, _ in results} == set(map(id, contents))
+    assert pin.peak == 2
+    assert all(content.closed for content in contents)
+
+    errors = [res for content, res in results if content.basename == "kai.png"]
+    assert len(errors) == 4
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert all(isinstance(res, Pin) for content, res in results if res not in errors)
+
+
+def test_PinAPI_add_many_with_ledger():
+    contents = [Content(path) for path in sorted(IMG_DIR.iterdir())]
+    pin = BatchPinAPI()
+
+    with PinLedger() as ledger, mock.patch.object(Content, "open") as opened:
+        pin.ledger = ledger
+        for content in contents:
+            ledger.record(content.path, pin.account, Pin(cid=CID))
+
+        results = list(pin.add_many(contents, concurrency=2))
+
+    # pins held by the ledger are returned without reading the files
+    opened.assert_not_called()
+    assert pin.peak == 0
+    assert all(res == Pin(cid=CID) for _, res in results)
+
+
+def test_PinAPI_add_many_lazy():
+    consumed = []
+
+    def contents():
+        for path in sorted(IMG_DIR.iterdir()) * 10:
+            consumed.append(path)
+            yield Content(path)
+
+    results = BatchPinAPI().add_many(contents(), concurrency=3)
+    next(results)
+    results.close()
+
+    assert len(consumed) <= 4
+
+
+@respx.mock
+def test__request_retry():
+    with TestPinAPI() as pin:
+        route = respx.get(make_url(pin, ENDPOINT))
+        route.side_effect = [httpx.Response(502), httpx.Response(200)]
+
+        response = pin._get(ENDPOINT)
+
+    assert response.status_code == 200
+    assert route.call_count == 2
+
+
+@respx.mock
+def test__request_no_retry_unprocessed_post(content):
+    with TestPinAPI() as pin:
+        route = respx.post(make_url(pin, ENDPOINT)) % 500
+
+        response = pin._post(ENDPOINT, content=content)
+
+    assert response.status_code == 500
+    assert route.call_count == 1
+
+
+@respx.mock
+def test__request_retry_post_rejected(content):
+    with TestPinAPI() as pin:
+        route = respx.post(make_url(pin, ENDPOINT))
+        refused = httpx.ConnectError("refused")
+        route.side_effect = [refused, httpx.Response(429), httpx.Response(204)]
+
+        response = pin._post(ENDPOINT, content=content)
+
+    assert response.status_code == 204
+    assert [call.request.read() for call in route.calls] == [content] * 3
+
+
+@respx.mock
+def test__request_idempotency_key(content):
+    config = Config(TEST_URL, retry=RetryPolicy(backoff=0, idempotency_header="Key"))
+    with TestPinAPI(config) as pin:
+        route = respx.post(make_url(pin, ENDPOINT))
+        route.side_effect = [httpx.Response(500), httpx.Response(204)]
+
+        pin._post(ENDPOINT, content=content)
+
+    keys = {call.request.headers["Key"] for call in route.calls}
+    assert route.call_count == 2
+    assert len(keys) == 1
+
+
+@respx.mock
+def test__request_one_shot_body():
+    with TestPinAPI() as pin:
+        route = respx.post(make_url(pin, ENDPOINT)) % 503
+
+        response = pin._post(ENDPOINT, content=iter([b"once"]))
+
+    assert response.status_code == 503
+    assert route.call_count == 1
@@ -1,4 +1,6 @@
 import json
+import os
+from pathlib import Path
 
 import pytest
 
@@ -26,6 +28,16 @@ def data():
     return {"option": json.dumps({"cidVersion": 1})}
 
 
+@pytest.fixture
+def video(tmp_path: Path):
+    """A file of 3 chunks, each larger than the shard size used in tests"""
+    path = tmp_path / "video.mp4"
+    path.write_bytes(os.urandom(600_000))
+    return path
+
+
+SHARD_SIZE = 300_000
+
 TEST_URL = "http://localhost"
 ENDPOINT = "add"
 CID = "bafkreifjjcie6lypi6ny7amxnfftagclbuxndqonfipmb64f2km2devei4"
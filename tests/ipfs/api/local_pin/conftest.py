@@ -1,11 +1,118 @@
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
 import httpx
 import pytest
 
+from pinnacle.ipfs import daemon
 from pinnacle.ipfs.api.local_pin import LocalPinAdd
+from pinnacle.ipfs.api.local_pin import LocalPinProgress
 from tests.ipfs.api.conftest import CID
 
 
+@pytest.fixture(autouse=True)
+def no_daemon_cache(monkeypatch):
+    """Probe the daemon afresh in every test"""
+    monkeypatch.setattr(daemon, "_probes", {})
+
+
 @pytest.fixture
 def mocked_local_pin_add(filename):
     json = LocalPinAdd(Hash=CID, Name=filename, Size=311).json()
     return httpx.Response(200, content=json)
+
+
+ROOT = "bafybeiczsscdsbs7ffqz55asqdf3smv6klcw3gofszvwlyarci47bgf354"
+
+
+@pytest.fixture
+def mocked_local_pin_add_directory():
+    lines = [
+        LocalPinAdd(Hash=CID, Name=name, Size=311).json()
+        for name in ("han.png", "kai.png", "rin.png")
+    ]
+    lines.append(LocalPinAdd(Hash=ROOT, Name="", Size=1000).json())
+    return httpx.Response(200, content="\n".join(lines))
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """Answers the RPC calls of LocalPin, as kubo would"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path.startswith("/api/v0/add"):
+            body = LocalPinAdd(Hash=CID, Name="han.png", Size=311).json().encode()
+        else:
+            body = b'{"ID": "12D3KooW"}'
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        return "unix"
+
+    def log_message(self, *args):
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def unix_daemon(tmp_path: Path):
+    """Path of the unix socket of a daemon answering in a thread"""
+    socket = str(tmp_path / "api.sock")
+    with UnixHTTPServer(socket, DaemonHandler) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield socket
+        server.shutdown()
+
+
+@pytest.fixture
+def mocked_local_pin_add_files():
+    lines = []
+    for name in ("han.png", "kai.png"):
+        lines.append(LocalPinProgress(Name=name, Bytes=100).json())
+        lines.append(LocalPinAdd(Hash=CID, Name=name, Size=311).json())
+    return httpx.Response(200, content="\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def mocked_local_pin_ls():
+    lines = [
+        json.dumps({"Cid": cid, "Type": "recursive", "Name": ""}) for cid in (CID, ROOT)
+    ]
+    return httpx.Response(200, content="\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def mocked_local_pin_rm():
+    """
+    Unpin in order like kubo, stopping at the first CID not pinned, as ROOT,
+    with an error that does not name it
+    """
+    unpinned = {ROOT}
+
+    def unpin(request: httpx.Request):
+        cids = request.url.params.get_list("arg")
+        for cid in cids:
+            if cid in unpinned:
+                message = "not pinned or pinned indirectly"
+                return httpx.Response(500, json={"Message": message, "Type": "error"})
+            unpinned.add(cid)
+        return httpx.Response(200, json={"Pins": cids})
+
+    return unpin
+
+
+@pytest.fixture
+def mocked_local_repo_gc():
+    lines = [json.dumps({"Key": {"/": cid}}) for cid in (CID, ROOT)]
+    return httpx.Response(200, content="\n".join(lines) + "\n")
@@ -1,20 +1,25 @@
 from pathlib import Path
 from unittest import mock
 
+import httpx
 import pytest
 import respx
 
+from pinnacle.constants.dirs import IMG_DIR
 from pinnacle.ipfs.api.local_pin import AsyncLocalPin
 from pinnacle.ipfs.api.local_pin import NoIPFSDaemonError
+from pinnacle.ipfs.config import Config
 from pinnacle.ipfs.content import AsyncContent
+from pinnacle.ipfs.content import AsyncDirectoryContent
 from pinnacle.ipfs.models.models import Pin
 from tests.ipfs.api.conftest import CID
 from tests.ipfs.api.conftest import make_url
+from tests.ipfs.api.local_pin.conftest import ROOT
 
 
 @pytest.mark.anyio
 @respx.mock
-@mock.patch("pinnacle.ipfs.api.local_pin.LocalPinMixin.ipfs_daemon_active")
+@mock.patch("pinnacle.ipfs.api.local_pin.AsyncLocalPin.ipfs_daemon_active")
 async def test_LocalPin_add(
     patched,
     mocked_local_pin_add,
@@ -37,7 +42,119 @@ async def test_LocalPin_add(
 
 
 @pytest.mark.anyio
+@respx.mock
 async def test_LocalPin_add_fail(path: Path):
     async with AsyncLocalPin() as pin, AsyncContent(path) as content:
+        respx.post(make_url(pin, "id")) % 503
+
         with pytest.raises(NoIPFSDaemonError):
             await pin.add(content)
+
+
+@pytest.mark.anyio
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.AsyncLocalPin.ipfs_daemon_active")
+async def test_LocalPin_add_directory(patched, mocked_local_pin_add_directory):
+    patched.return_value = True
+
+    async with AsyncLocalPin() as pin, AsyncDirectoryContent(IMG_DIR) as directory:
+        params = {"wrap-with-directory": True, "recursive": True}
+        route = respx.post(make_url(pin, "add"), params__contains=params)
+        route.mock(return_value=mocked_local_pin_add_directory)
+
+        res = await pin.add_directory(directory)
+
+    assert res.pin.cid == ROOT
+    assert set(res.files) == {"han.png", "kai.png", "rin.png"}
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_ipfs_daemon_active():
+    pin = AsyncLocalPin()
+    route = respx.post(make_url(pin, "id"))
+    route.side_effect = [httpx.Response(200, json={"ID": "12D3KooW"})]
+
+    assert await pin.ipfs_daemon_active()
+    assert await pin.ipfs_daemon_active()  # cached
+    assert route.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_LocalPin_unix_socket(unix_daemon: str, path: Path):
+    config = Config.from_multiaddr(f"/unix{unix_daemon}", authless=True)
+
+    async with AsyncLocalPin(config) as pin, AsyncContent(path) as content:
+        res = await pin.add(content)
+
+    assert res.cid == CID
+
+
+@pytest.mark.anyio
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.AsyncLocalPin.ipfs_daemon_active")
+async def test_LocalPin_add_files(patched, mocked_local_pin_add_files):
+    patched.return_value = True
+    contents = [
+        AsyncContent(IMG_DIR / name, streaming=True) for name in ("han.png", "kai.png")
+    ]
+    for content in contents:
+        await content.open()
+
+    async with AsyncLocalPin() as pin:
+        route = respx.post(make_url(pin, "add"), params={"progress": "false"})
+        route.mock(return_value=mocked_local_pin_add_files)
+
+        pins = [pin async for pin in pin.add_files(contents)]
+
+    body = route.calls.last.request.read()
+
+    assert [pin.cid for pin in pins if isinstance(pin, Pin)] == [CID, CID]
+    assert all(content.is_pinned for content in contents)
+    assert (IMG_DIR / "kai.png").read_bytes() in body
+
+
+@pytest.mark.anyio
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.AsyncLocalPin.ipfs_daemon_active")
+async def test_LocalPin_iter_pins(patched, mocked_local_pin_ls):
+    patched.return_value = True
+
+    async with AsyncLocalPin() as pin:
+        params = {"stream": "true", "type": "all", "names": "true"}
+        route = respx.post(make_url(pin, "pin/ls"), params=params)
+        route.mock(return_value=mocked_local_pin_ls)
+
+        pins = [listed async for listed in pin.iter_pins(type="all", names=True)]
+
+    assert [listed.cid for listed in pins] == [CID, ROOT]
+
+
+@pytest.mark.anyio
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.AsyncLocalPin.ipfs_daemon_active")
+async def test_LocalPin_unpin_many(patched, mocked_local_pin_rm):
+    patched.return_value = True
+    cids = [f"{CID}0", ROOT, f"{CID}1", f"{CID}2"]
+
+    async with AsyncLocalPin() as pin:
+        route = respx.post(make_url(pin, "pin/rm"), params={"recursive": "true"})
+        route.mock(side_effect=mocked_local_pin_rm)
+
+        results = [result async for result in pin.unpin_many(cids, batch_size=3)]
+
+    # the first batch unpinned the first CID before failing on ROOT
+    assert route.call_count == 5
+    assert results == [(cid, None) for cid in cids]
+
+
+@pytest.mark.anyio
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.AsyncLocalPin.ipfs_daemon_active")
+async def test_LocalPin_repo_gc(patched, mocked_local_repo_gc):
+    patched.return_value = True
+
+    async with AsyncLocalPin() as pin:
+        respx.post(make_url(pin, "repo/gc")) % mocked_local_repo_gc
+
+        assert [cid async for cid in pin.repo_gc()] == [CID, ROOT]
@@ -1,39 +1,72 @@
 from pathlib import Path
 from unittest import mock
 
-import psutil
+import httpx
 import pytest
 import respx
 
+from pinnacle.constants.dirs import IMG_DIR
+from pinnacle.ipfs import PinLedger
+from pinnacle.ipfs.api.local_pin import _RepoConfig
+from pinnacle.ipfs.api.local_pin import IPFSStreamError
 from pinnacle.ipfs.api.local_pin import LocalPin
-from pinnacle.ipfs.api.local_pin import LocalPinMixin
+from pinnacle.ipfs.api.local_pin import LocalPinProgress
 from pinnacle.ipfs.api.local_pin import NoIPFSDaemonError
+from pinnacle.ipfs.config import Config
 from pinnacle.ipfs.content import Content
+from pinnacle.ipfs.content import DirectoryContent
 from pinnacle.ipfs.models.models import Pin
 from tests.ipfs.api.conftest import CID
 from tests.ipfs.api.conftest import make_url
+from tests.ipfs.api.local_pin.conftest import ROOT
 
 
-mock_ipfs = mock.MagicMock(spec=psutil.Process)
-mock_ipfs.name.return_value = "ipfs"
+@mock.patch("pinnacle.ipfs.config.api_address")
+def test_repo_config_read_on_first_use(patched):
+    patched.return_value = ("http://127.0.0.1:5002/api/v0", None)
+    repo_config = _RepoConfig()
+
+    class RepoPin(LocalPin):
+        global_config = repo_config
+
+    patched.assert_not_called()
+    assert RepoPin().config.url == "http://127.0.0.1:5002/api/v0"
+    assert RepoPin().config is RepoPin.global_config
+    patched.assert_called_once()
 
 
 @pytest.mark.parametrize(
-    ("process", "expected"),
+    ("response", "expected"),
     (
-        ([], False),
-        ([mock_ipfs], True),
+        (httpx.Response(200, json={"ID": "12D3KooW"}), True),
+        (httpx.ConnectError("refused"), False),
     ),
 )
-@mock.patch("pinnacle.ipfs.api.local_pin.psutil.process_iter")
-def test_ipfs_daemon_active_true(patched, process, expected):
-    patched.return_value = process
+@respx.mock
+def test_ipfs_daemon_active(response, expected):
+    pin = LocalPin()
+    route = respx.post(make_url(pin, "id"))
+    route.side_effect = [response]
+
+    assert pin.ipfs_daemon_active() is expected
+    assert pin.ipfs_daemon_active() is expected  # cached
+    assert route.call_count == 1
+
+
+@respx.mock
+def test_connection_error_invalidates_daemon(path: Path):
+    with LocalPin() as pin, Content(path) as content:
+        respx.post(make_url(pin, "id")) % 200
+        respx.post(make_url(pin, "add")).mock(side_effect=httpx.ConnectError("down"))
+
+        with pytest.raises(httpx.ConnectError):
+            pin.add(content)
 
-    assert LocalPinMixin.ipfs_daemon_active() is expected
+    assert pin.daemon.expired
 
 
 @respx.mock
-@mock.patch("pinnacle.ipfs.api.local_pin.LocalPinMixin.ipfs_daemon_active")
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
 def test_LocalPin_add(
     patched,
     mocked_local_pin_add,
@@ -55,7 +88,209 @@ def test_LocalPin_add(
     assert res.name == filename
 
 
+@respx.mock
 def test_LocalPin_add_fail(path: Path):
     with LocalPin() as pin, Content(path) as content:
+        respx.post(make_url(pin, "id")).mock(side_effect=httpx.ConnectError("down"))
+
         with pytest.raises(NoIPFSDaemonError):
             pin.add(content)
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_LocalPin_add_directory(patched, mocked_local_pin_add_directory):
+    patched.return_value = True
+
+    with LocalPin() as pin, DirectoryContent(IMG_DIR) as directory:
+        params = {"cid-version": 1, "wrap-with-directory": True, "recursive": True}
+        route = respx.post(make_url(pin, "add"), params=params)
+        route.mock(return_value=mocked_local_pin_add_directory)
+
+        res = pin.add_directory(directory)
+
+    body = route.calls.last.request.read()
+
+    assert res.pin.cid == ROOT
+    assert res.pin.name == "img"
+    assert res.files == {"han.png": CID, "kai.png": CID, "rin.png": CID}
+    assert directory.cid == ROOT
+    assert body.count(b'name="file"') == 3
+
+
+def test_LocalPin_unix_socket(unix_daemon: str, path: Path):
+    config = Config.from_multiaddr(f"/unix{unix_daemon}", authless=True)
+
+    with LocalPin(config) as pin, Content(path) as content:
+        res = pin.add(content)
+
+    assert pin.config.uds == unix_daemon
+    assert res.cid == CID
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_LocalPin_add_files(patched, mocked_local_pin_add_files):
+    patched.return_value = True
+    contents = [Content(IMG_DIR / name).open() for name in ("han.png", "kai.png")]
+
+    with LocalPin() as pin:
+        params = {"cid-version": 1, "progress": "true"}
+        route = respx.post(make_url(pin, "add"), params=params)
+        route.mock(return_value=mocked_local_pin_add_files)
+
+        events = list(pin.add_files(contents, progress=True))
+
+    body = route.calls.last.request.read()
+
+    assert [type(event) for event in events] == [LocalPinProgress, Pin] * 2
+    assert [event.name for event in events if isinstance(event, Pin)] == [
+        "han.png",
+        "kai.png",
+    ]
+    assert all(content.cid == CID for content in contents)
+    assert body.count(b'name="file"') == 2
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_LocalPin_add_files_with_ledger(patched, mocked_local_pin_add_files):
+    patched.return_value = True
+    paths = [IMG_DIR / name for name in ("han.png", "kai.png")]
+
+    with PinLedger() as ledger, LocalPin(ledger=ledger) as pin:
+        route = respx.post(make_url(pin, "add"))
+        route.mock(return_value=mocked_local_pin_add_files)
+
+        first = list(pin.add_files(Content(path).open() for path in paths))
+        second = list(pin.add_files(Content(path).open() for path in paths))
+
+    # every file is recorded by the first request, the second one is skipped
+    assert route.call_count == 1
+    assert [event for event in first if isinstance(event, Pin)] == second
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_LocalPin_iter_pins(patched, mocked_local_pin_ls):
+    patched.return_value = True
+
+    with LocalPin() as pin:
+        params = {"stream": "true", "type": "recursive", "names": "false"}
+        route = respx.post(make_url(pin, "pin/ls"), params=params)
+        route.mock(return_value=mocked_local_pin_ls)
+
+        pins = list(pin.iter_pins())
+
+    assert [listed.cid for listed in pins] == [CID, ROOT]
+    assert all(listed.Type == "recursive" for listed in pins)
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_LocalPin_iter_pins_stream_error(patched):
+    patched.return_value = True
+    lines = [
+        '{"Cid": "%s", "Type": "recursive"}' % CID,
+        '{"Message": "context canceled", "Code": 0, "Type": "error"}',
+    ]
+
+    with LocalPin() as pin:
+        respx.post(make_url(pin, "pin/ls")) % httpx.Response(
+            200, content="\n".join(lines)
+        )
+
+        pins = pin.iter_pins()
+        assert next(pins).cid == CID
+        with pytest.raises(IPFSStreamError, match="context canceled"):
+            next(pins)
+
+
+@respx.mock
+def test_LocalPin_pin():
+    with LocalPin() as pin:
+        route = respx.post(make_url(pin, "pin/add"), params={"recursive": "true"})
+        route.respond(200, json={"Pins": [CID, ROOT]})
+
+        assert pin.pin([CID, ROOT]) == [CID, ROOT]
+
+    assert route.calls.last.request.url.params.get_list("arg") == [CID, ROOT]
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_LocalPin_unpin_many(patched, mocked_local_pin_rm):
+    patched.return_value = True
+    cids = [f"{CID}{index}" for index in range(3)] + [ROOT]
+
+    with LocalPin() as pin:
+        route = respx.post(make_url(pin, "pin/rm"), params={"recursive": "true"})
+        route.mock(side_effect=mocked_local_pin_rm)
+
+        results = list(pin.unpin_many(cids, batch_size=2))
+
+    # two batches, the second failed then retried one CID at a time
+    assert route.call_count == 4
+    assert route.calls[0].request.url.params.get_list("arg") == cids[:2]
+    assert results == [(cid, None) for cid in cids]
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_LocalPin_unpin_many_partial_batch(patched, mocked_local_pin_rm):
+    patched.return_value = True
+    cids = [f"{CID}0", ROOT, f"{CID}1"]
+
+    with LocalPin() as pin:
+        route = respx.post(make_url(pin, "pin/rm")).mock(
+            side_effect=mocked_local_pin_rm
+        )
+
+        results = list(pin.unpin_many(cids))
+
+    # the batch unpinned the first CID before failing on ROOT, so its retry
+    # finds it not pinned
+    assert route.call_count == 4
+    assert route.calls[1].response.status_code == 500
+    assert results == [(cid, None) for cid in cids]
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_LocalPin_unpin_many_error(patched):
+    patched.return_value = True
+    cids = [f"{CID}{index}" for index in range(3)]
+
+    def unpin(request: httpx.Request):
+        if request.url.params.get_list("arg") != [cids[2]]:
+            return httpx.Response(500, json={"Message": "context canceled"})
+        return httpx.Response(200, json={"Pins": cids[2:]})
+
+    with LocalPin() as pin:
+        route = respx.post(make_url(pin, "pin/rm")).mock(side_effect=unpin)
+
+        results = list(pin.unpin_many(cids))
+
+    assert route.call_count == 4
+    assert [cid for cid, _ in results] == cids
+    assert all(isinstance(error, httpx.HTTPStatusError) for _, error in results[:2])
+    assert results[2][1] is None
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_LocalPin_repo_gc(patched, mocked_local_repo_gc):
+    patched.return_value = True
+
+    with LocalPin() as pin:
+        respx.post(make_url(pin, "repo/gc")) % mocked_local_repo_gc
+
+        assert list(pin.repo_gc()) == [CID, ROOT]
+
+
+@respx.mock
+def test_LocalPin_repo_gc_fail():
+    with LocalPin() as pin:
+        respx.post(make_url(pin, "id")).mock(side_effect=httpx.ConnectError("down"))
+        with pytest.raises(NoIPFSDaemonError):
+            next(pin.repo_gc())
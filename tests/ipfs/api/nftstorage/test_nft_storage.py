@@ -1,12 +1,18 @@
 from pathlib import Path
 
+import httpx
+import pytest
 import respx
 
+from pinnacle.constants.dirs import IMG_DIR
 from pinnacle.ipfs.api.nft_storage import NFTStorage
+from pinnacle.ipfs.content import Car
+from pinnacle.ipfs.content import DirectoryContent
 from pinnacle.ipfs.content.content import Content
 from pinnacle.ipfs.models.models import Pin
 from tests.ipfs.api.conftest import CID
 from tests.ipfs.api.conftest import make_url
+from tests.ipfs.api.conftest import SHARD_SIZE
 
 
 @respx.mock
@@ -20,3 +26,82 @@ def test_NFTStorage_add(mocked_nftstorage_add, filename: str, path: Path):
     assert isinstance(res, Pin)
     assert res.cid == CID
     assert res.name == filename
+
+
+@respx.mock
+def test_NFTStorage_add_streaming(mocked_nftstorage_add, path: Path):
+    with NFTStorage() as pin, Content(path, streaming=True) as content:
+        url = make_url(pin, "upload")
+        route = respx.post(url).mock(return_value=mocked_nftstorage_add)
+
+        res = pin.add(content, cid_version=1)
+
+    request = route.calls.last.request
+
+    assert res.cid == CID
+    assert request.read() == path.read_bytes()
+    assert request.headers["Content-Length"] == str(path.stat().st_size)
+
+
+@respx.mock
+def test_NFTStorage_add_car(mocked_nftstorage_add):
+    with NFTStorage() as pin:
+        route = respx.post(make_url(pin, "upload")).mock(
+            return_value=mocked_nftstorage_add
+        )
+
+        res = pin.add_car(Car.from_directory(IMG_DIR))
+
+    assert res.pin.cid == CID
+    assert route.calls.last.request.headers["Content-Type"] == "application/car"
+    assert set(res.files) == {"han.png", "kai.png", "rin.png"}
+
+
+@respx.mock
+def test_NFTStorage_add_directory(mocked_nftstorage_add):
+    with NFTStorage() as pin, DirectoryContent(IMG_DIR) as directory:
+        route = respx.post(make_url(pin, "upload"))
+        route.mock(return_value=mocked_nftstorage_add)
+
+        res = pin.add_directory(directory)
+
+    body = route.calls.last.request.read()
+
+    assert res.pin.cid == CID
+    assert directory.cid == CID
+    assert body.count(b'name="file"') == 3
+    assert b'filename="han.png"' in body
+
+
+@respx.mock
+def test_NFTStorage_add_sharded(mocked_nftstorage_add, no_backoff, video: Path):
+    with NFTStorage() as pin, Content(video, streaming=True) as content:
+        pin.max_request_size = SHARD_SIZE
+        route = respx.post(make_url(pin, "upload"))
+        # the second shard fails once and is retried alone
+        route.side_effect = [
+            mocked_nftstorage_add,
+            httpx.Response(503),
+            mocked_nftstorage_add,
+            mocked_nftstorage_add,
+        ]
+
+        res = pin.add(content)
+
+    bodies = [call.request.read() for call in route.calls]
+
+    assert res.cid == CID
+    assert route.call_count == 4
+    assert bodies[1] == bodies[2]
+    assert all(len(body) <= SHARD_SIZE for body in bodies)
+    assert route.calls.last.request.headers["Content-Type"] == "application/car"
+
+
+@respx.mock
+def test_NFTStorage_add_sharded_fail(mocked_nftstorage_add, no_backoff, video: Path):
+    with NFTStorage() as pin, Content(video, streaming=True) as content:
+        route = respx.post(make_url(pin, "upload"))
+        route.side_effect = [mocked_nftstorage_add, httpx.Response(400)]
+
+        with pytest.raises(httpx.HTTPStatusError):
+            pin.add_sharded(content, shard_size=SHARD_SIZE)
@@ -1,18 +1,45 @@
+import json
 from datetime import datetime
 
 import httpx
 import pytest
 
 from pinnacle.ipfs.api.pinata import PinataAdd
+from pinnacle.ipfs.api.pinata import PinataPin
 from tests.ipfs.api.conftest import CID
 
 
 @pytest.fixture
 def mocked_pinata_add():
-    json = PinataAdd(
+    body = PinataAdd(
         IpfsHash=CID,
         PinSize=311,
         Timestamp=datetime.now(),
         isDuplicate=False,
     ).json()
-    return httpx.Response(200, content=json)
+    return httpx.Response(200, content=body)
+
+
+def pinata_pins(count: int) -> list[dict]:
+    return [
+        PinataPin(
+            id=str(index),
+            ipfs_pin_hash=f"{CID}{index}",
+            size=index + 1,
+            date_pinned=datetime(2023, 1, 1),
+        ).dict()
+        for index in range(count)
+    ]
+
+
+def list_pins(pins: list[dict]):
+    """Side effect paging pins by `pageOffset` and `pageLimit`"""
+
+    def side_effect(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        offset = int(params.get("pageOffset", 0))
+        rows = pins[offset : offset + int(params["pageLimit"])]
+        page = json.dumps({"count": len(pins), "rows": rows}, default=str)
+        return httpx.Response(200, content=page)
+
+    return side_effect
@@ -1,13 +1,20 @@
 from pathlib import Path
 
+import httpx
 import pytest
 import respx
 
+from pinnacle.constants.dirs import IMG_DIR
+from pinnacle.ipfs import PinLedger
 from pinnacle.ipfs.api.pinata import AsyncPinata
+from pinnacle.ipfs.api.pinata import PinataMetadata
+from pinnacle.ipfs.content import AsyncDirectoryContent
 from pinnacle.ipfs.content.content import AsyncContent
 from pinnacle.ipfs.models.models import Pin
 from tests.ipfs.api.conftest import CID
 from tests.ipfs.api.conftest import make_url
+from tests.ipfs.api.pinata.conftest import list_pins
+from tests.ipfs.api.pinata.conftest import pinata_pins
 
 
 @pytest.mark.anyio
@@ -22,3 +29,96 @@ async def test_AsyncPinata_add(mocked_pinata_add, filename: str, path: Path):
     assert isinstance(res, Pin)
     assert res.cid == CID
     assert res.name == filename
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_AsyncPinata_add_streaming(mocked_pinata_add, path: Path):
+    async with AsyncPinata() as pin, AsyncContent(path, streaming=True) as content:
+        url = make_url(pin, "pinning/pinFileToIPFS")
+        route = respx.post(url).mock(return_value=mocked_pinata_add)
+
+        res = await pin.add(content, cid_version=1)
+
+    request = route.calls.last.request
+    body = await request.aread()
+
+    assert res.cid == CID
+    assert request.headers["Content-Length"] == str(len(body))
+    assert path.read_bytes() in body
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_AsyncPinata_add_with_ledger(mocked_pinata_add, path: Path):
+    with PinLedger() as ledger:
+        async with AsyncPinata(ledger=ledger) as pin:
+            route = respx.post(make_url(pin, "pinning/pinFileToIPFS"))
+            route.mock(return_value=mocked_pinata_add)
+
+            for _ in range(2):
+                async with AsyncContent(path) as content:
+                    res = await pin.add(content)
+
+    assert route.call_count == 1
+    assert res.cid == CID
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_AsyncPinata_add_directory(mocked_pinata_add):
+    async with AsyncPinata() as pin, AsyncDirectoryContent(IMG_DIR) as directory:
+        root, files = await directory.compute_cids(cid_version=0)
+        response = mocked_pinata_add.json() | {"IpfsHash": root}
+
+        route = respx.post(make_url(pin, "pinning/pinFileToIPFS"))
+        route.mock(return_value=httpx.Response(200, json=response))
+
+        res = await pin.add_directory(directory, cid_version=0, file_cids=True)
+
+    body = await route.calls.last.request.aread()
+
+    assert res.pin.cid == root
+    assert res.files == files
+    assert b'filename="img/rin.png"' in body
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_AsyncPinata_iter_pins():
+    pins = pinata_pins(25)
+    async with AsyncPinata() as pinata:
+        route = respx.get(make_url(pinata, "data/pinList"))
+        route.side_effect = list_pins(pins)
+        async with pinata.iter_pins(limit=10) as listing:
+            listed = [pin async for pin in listing]
+
+    assert [pin.cid for pin in listed] == [pin["ipfs_pin_hash"] for pin in pins]
+    assert route.call_count == 3
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_AsyncPinata_unpin_many():
+    cids = [f"cid{index}" for index in range(10)]
+    async with AsyncPinata() as pinata:
+        for cid in cids:
+            respx.delete(make_url(pinata, f"pinning/unpin/{cid}")).respond(200)
+
+        async with pinata.unpin_many(cids, concurrency=4) as unpinned:
+            results = [result async for result in unpinned]
+
+    assert sorted(results) == [(cid, None) for cid in sorted(cids)]
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_AsyncPinata_update_metadata_many():
+    update = PinataMetadata(name="renamed")
+    async with AsyncPinata() as pinata:
+        route = respx.put(make_url(pinata, "pinning/hashMetadata")).respond(200)
+        async with pinata.update_metadata_many([(CID, update)]) as updated:
+            results = [result async for result in updated]
+
+    assert results == [((CID, update), None)]
+    assert route.called
@@ -1,12 +1,23 @@
+import json
 from pathlib import Path
+from unittest import mock
 
+import httpx
 import respx
 
+from pinnacle.constants.dirs import IMG_DIR
+from pinnacle.ipfs import PinLedger
 from pinnacle.ipfs.api.pinata import Pinata
+from pinnacle.ipfs.api.pinata import PinataMetadata
+from pinnacle.ipfs.config import BearerAuth
+from pinnacle.ipfs.config import Config
+from pinnacle.ipfs.content import DirectoryContent
 from pinnacle.ipfs.content.content import Content
 from pinnacle.ipfs.models.models import Pin
 from tests.ipfs.api.conftest import CID
 from tests.ipfs.api.conftest import make_url
+from tests.ipfs.api.pinata.conftest import list_pins
+from tests.ipfs.api.pinata.conftest import pinata_pins
 
 
 @respx.mock
@@ -20,3 +31,161 @@ def test_Pinata_add(mocked_pinata_add, filename: str, path: Path):
     assert isinstance(res, Pin)
     assert res.cid == CID
     assert res.name == filename
+
+
+@respx.mock
+def test_Pinata_add_streaming(mocked_pinata_add, path: Path):
+    with Pinata() as pin, Content(path, streaming=True) as content:
+        url = make_url(pin, "pinning/pinFileToIPFS")
+        route = respx.post(url).mock(return_value=mocked_pinata_add)
+
+        res = pin.add(content, cid_version=1)
+
+    request = route.calls.last.request
+    body = request.read()
+
+    assert res.cid == CID
+    assert request.headers["Content-Length"] == str(len(body))
+    assert b'name="pinataOptions"' in body
+    assert path.read_bytes() in body
+
+
+@respx.mock
+def test_Pinata_add_with_ledger(mocked_pinata_add, path: Path):
+    with PinLedger() as ledger, Pinata(ledger=ledger) as pin:
+        route = respx.post(make_url(pin, "pinning/pinFileToIPFS"))
+        route.mock(return_value=mocked_pinata_add)
+
+        with Content(path) as content:
+            first = pin.add(content)
+
+        with Content(path) as content:
+            second = pin.add(content)
+
+    assert route.call_count == 1
+    assert first == second
+    assert content.cid == CID
+
+
+@respx.mock
+def test_Pinata_add_with_ledger_per_cid_version(mocked_pinata_add, path: Path):
+    with PinLedger() as ledger, Pinata(ledger=ledger) as pin:
+        route = respx.post(make_url(pin, "pinning/pinFileToIPFS"))
+        route.mock(return_value=mocked_pinata_add)
+
+        with Content(path) as content:
+            pin.add(content, cid_version=1)
+
+        with Content(path) as content:
+            pin.add(content, cid_version=0)
+
+        config = Config(pin.provider, BearerAuth("other"))
+        with Pinata(config, ledger=ledger) as other, Content(path) as content:
+            other.add(content, cid_version=1)
+
+    assert route.call_count == 3
+
+
+@respx.mock
+def test_Pinata_add_directory(mocked_pinata_add):
+    with Pinata() as pin, DirectoryContent(IMG_DIR) as directory:
+        root, files = directory.compute_cids()
+        response = mocked_pinata_add.json() | {"IpfsHash": root}
+
+        route = respx.post(make_url(pin, "pinning/pinFileToIPFS"))
+        route.mock(return_value=httpx.Response(200, json=response))
+
+        res = pin.add_directory(directory, file_cids=True)
+
+    body = route.calls.last.request.read()
+
+    assert res.pin.cid == root
+    assert res.pin.name == "img"
+    assert res.files == files
+    assert b'filename="img/han.png"' in body
+    assert b'name="pinataOptions"' in body
+
+
+@respx.mock
+def test_Pinata_add_directory_root_mismatch(mocked_pinata_add):
+    with Pinata() as pin, DirectoryContent(IMG_DIR) as directory:
+        route = respx.post(make_url(pin, "pinning/pinFileToIPFS"))
+        route.mock(return_value=mocked_pinata_add)
+
+        res = pin.add_directory(directory, cid_version=0, file_cids=True)
+
+    assert res.pin.cid == CID
+    assert res.files == {}
+
+
+@respx.mock
+@mock.patch.object(DirectoryContent, "compute_cids")
+def test_Pinata_add_directory_without_file_cids(compute_cids, mocked_pinata_add):
+    with Pinata() as pin, DirectoryContent(IMG_DIR) as directory:
+        route = respx.post(make_url(pin, "pinning/pinFileToIPFS"))
+        route.mock(return_value=mocked_pinata_add)
+
+        res = pin.add_directory(directory)
+
+    assert res.pin.cid == CID
+    assert res.files == {}
+    compute_cids.assert_not_called()
+
+
+@respx.mock
+def test_Pinata_iter_pins():
+    pins = pinata_pins(25)
+    with Pinata() as pinata:
+        route = respx.get(make_url(pinata, "data/pinList"))
+        route.side_effect = list_pins(pins)
+        listed = list(pinata.iter_pins(name="drop", keyvalues={"a": 1}, limit=10))
+
+    assert [pin.id for pin in listed] == [pin["id"] for pin in pins]
+    assert route.call_count == 3
+    params = route.calls.last.request.url.params
+    assert params["status"] == "pinned"
+    assert params["metadata[name]"] == "drop"
+    assert json.loads(params["metadata[keyvalues]"]) == {"a": 1}
+    assert params["pageOffset"] == "20"
+
+
+@respx.mock
+def test_Pinata_pin_by_hash():
+    with Pinata() as pinata:
+        route = respx.post(make_url(pinata, "pinning/pinByHash")).respond(200)
+
+        pinata.pin_by_hash(CID, PinataMetadata(name="han.png"))
+
+    assert json.loads(route.calls.last.request.read()) == {
+        "hashToPin": CID,
+        "pinataMetadata": {"name": "han.png"},
+    }
+
+
+@respx.mock
+def test_Pinata_unpin_many():
+    cids = [f"cid{index}" for index in range(10)]
+    with Pinata() as pinata:
+        for cid in cids:
+            respx.delete(make_url(pinata, f"pinning/unpin/{cid}")).respond(200)
+        respx.delete(make_url(pinata, "pinning/unpin/missing")).respond(400)
+
+        results = dict(pinata.unpin_many([*cids, "missing"], concurrency=4))
+
+    assert all(results[cid] is None for cid in cids)
+    assert isinstance(results["missing"], httpx.HTTPStatusError)
+
+
+@respx.mock
+def test_Pinata_update_metadata_many():
+    update = PinataMetadata(name="renamed", keyvalues={"stale": None})
+    with Pinata() as pinata:
+        route = respx.put(make_url(pinata, "pinning/hashMetadata")).respond(200)
+        results = list(pinata.update_metadata_many([(CID, update)]))
+
+    assert results == [((CID, update), None)]
+    assert json.loads(route.calls.last.request.content) == {
+        "ipfsPinHash": CID,
+        "name": "renamed",
+        "keyvalues": {"stale": None},
+    }
@@ -0,0 +1,55 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import httpx
+import pytest
+
+from pinnacle.ipfs.config import BearerAuth
+from pinnacle.ipfs.config import Config
+from pinnacle.ipfs.models import Pin
+from pinnacle.ipfs.models import PinResults
+from pinnacle.ipfs.models import PinStatus
+from pinnacle.ipfs.models import Status
+from tests.ipfs.api.conftest import CID
+
+PINNING_SERVICE = "https://pinning.example.com"
+DELEGATES = ["/ip4/203.0.113.1/tcp/4001/p2p/QmServicePeerId"]
+EPOCH = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+def pin_status(index: int, status: Status = Status.pinned) -> PinStatus:
+    return PinStatus(
+        requestid=f"request-{index}",
+        status=status,
+        created=EPOCH + timedelta(seconds=index),
+        pin=Pin(cid=CID, name=f"file-{index}"),
+        delegates=DELEGATES,
+    )
+
+
+def status_response(status: PinStatus, code: int = 202) -> httpx.Response:
+    return httpx.Response(code, content=status.json())
+
+
+def list_pins(statuses: list[PinStatus]):
+    """Side effect listing pins newest first, paged by `before` and `limit`"""
+    pins = sorted(statuses, key=lambda status: status.created, reverse=True)
+
+    def side_effect(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        matching = pins
+        if "before" in params:
+            before = datetime.fromisoformat(params["before"])
+            matching = [status for status in pins if status.created < before]
+
+        page = matching[: int(params["limit"])]
+        results = PinResults(count=len(matching), results=page)
+        return httpx.Response(200, content=results.json())
+
+    return side_effect
+
+
+@pytest.fixture
+def config() -> Config:
+    return Config(PINNING_SERVICE, BearerAuth("token"))
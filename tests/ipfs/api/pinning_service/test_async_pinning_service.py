@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import httpx
+import pytest
+import respx
+
+from pinnacle.ipfs.api import AsyncPinningServiceAPI
+from pinnacle.ipfs.config import Config
+from pinnacle.ipfs.content import AsyncContent
+from pinnacle.ipfs.models import Status
+from tests.ipfs.api.conftest import make_url
+from tests.ipfs.api.pinning_service.conftest import list_pins
+from tests.ipfs.api.pinning_service.conftest import pin_status
+from tests.ipfs.api.pinning_service.conftest import status_response
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_add(config: Config, path: Path):
+    status = pin_status(0, Status.queued)
+    async with AsyncPinningServiceAPI(config) as service:
+        respx.post(make_url(service, "pins")).mock(return_value=status_response(status))
+        async with AsyncContent(path) as content:
+            pin = await service.add(content)
+
+    assert pin.cid == status.pin.cid
+    assert pin.meta.__root__["requestid"] == status.requestid
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_get_remove(config: Config):
+    status = pin_status(1)
+    async with AsyncPinningServiceAPI(config) as service:
+        url = make_url(service, f"pins/{status.requestid}")
+        respx.get(url).mock(return_value=status_response(status, 200))
+        remove = respx.delete(url).mock(return_value=httpx.Response(202))
+
+        assert await service.get(status.requestid) == status
+        await service.remove(status.requestid)
+
+    assert remove.called
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_iter_pins(config: Config):
+    statuses = [pin_status(index) for index in range(25)]
+    async with AsyncPinningServiceAPI(config) as service:
+        route = respx.get(make_url(service, "pins"))
+        route.side_effect = list_pins(statuses)
+        async with service.iter_pins(limit=10) as pins:
+            listed = [status async for status in pins]
+
+    assert listed == statuses[::-1]
+    assert route.call_count == 3
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_iter_pins_stop_early(config: Config):
+    statuses = [pin_status(index) for index in range(25)]
+    async with AsyncPinningServiceAPI(config) as service:
+        route = respx.get(make_url(service, "pins"))
+        route.side_effect = list_pins(statuses)
+        async with service.iter_pins(limit=10) as pins:
+            async for status in pins:
+                break
+
+    assert status == statuses[-1]
+    assert route.call_count <= 2
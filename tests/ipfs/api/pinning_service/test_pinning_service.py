@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+import respx
+
+from pinnacle.ipfs.api import PinningServiceAPI
+from pinnacle.ipfs.config import Config
+from pinnacle.ipfs.content import Content
+from pinnacle.ipfs.models import Pin
+from pinnacle.ipfs.models import Status
+from tests.ipfs.api.conftest import make_url
+from tests.ipfs.api.pinning_service.conftest import list_pins
+from tests.ipfs.api.pinning_service.conftest import pin_status
+from tests.ipfs.api.pinning_service.conftest import status_response
+
+
+@respx.mock
+def test_add(config: Config, path: Path):
+    status = pin_status(0, Status.queued)
+    with PinningServiceAPI(config) as service, Content(path) as content:
+        route = respx.post(make_url(service, "pins"))
+        route.mock(return_value=status_response(status))
+        pin = service.add(content)
+
+    body = json.loads(route.calls.last.request.content)
+    assert body == {"cid": content.compute_cid(), "name": path.name}
+    assert pin.meta.__root__["requestid"] == status.requestid
+    assert pin.meta.__root__["status"] == "queued"
+    assert content.cid == pin.cid
+
+
+@respx.mock
+def test_get_replace_remove(config: Config):
+    status = pin_status(1)
+    with PinningServiceAPI(config) as service:
+        url = make_url(service, f"pins/{status.requestid}")
+        respx.get(url).mock(return_value=status_response(status, 200))
+        replace = respx.post(url).mock(return_value=status_response(status))
+        remove = respx.delete(url).mock(return_value=httpx.Response(202))
+
+        assert service.get(status.requestid) == status
+        assert service.replace(status.requestid, Pin(cid="cid")) == status
+        service.remove(status.requestid)
+
+    assert json.loads(replace.calls.last.request.content) == {"cid": "cid"}
+    assert remove.called
+
+
+@respx.mock
+def test_remove_missing(config: Config):
+    with PinningServiceAPI(config) as service:
+        respx.delete(make_url(service, "pins/missing")).respond(404)
+        with pytest.raises(httpx.HTTPStatusError):
+            service.remove("missing")
+
+
+@respx.mock
+def test_iter_pins(config: Config):
+    statuses = [pin_status(index) for index in range(25)]
+    with PinningServiceAPI(config) as service:
+        route = respx.get(make_url(service, "pins"))
+        route.side_effect = list_pins(statuses)
+        listed = list(service.iter_pins(status=[Status.pinned], limit=10))
+
+    assert listed == statuses[::-1]
+    assert route.call_count == 3
+    assert route.calls[0].request.url.params["status"] == "pinned"
+    assert "before" not in route.calls[0].request.url.params
+
+
+@respx.mock
+def test_iter_pins_filters(config: Config):
+    with PinningServiceAPI(config) as service:
+        route = respx.get(make_url(service, "pins"))
+        route.side_effect = list_pins([])
+        assert list(service.iter_pins(cid=["a", "b"], meta={"app": "x"})) == []
+
+    params = route.calls.last.request.url.params
+    assert params["cid"] == "a,b"
+    assert json.loads(params["meta"]) == {"app": "x"}
+    assert params["limit"] == "1000"
+
+
+@respx.mock
+def test_iter_pins_stop_early(config: Config):
+    statuses = [pin_status(index) for index in range(25)]
+    with PinningServiceAPI(config) as service:
+        route = respx.get(make_url(service, "pins"))
+        route.side_effect = list_pins(statuses)
+        pins = service.iter_pins(limit=10)
+        first = next(pins)
+        pins.close()
+
+    assert first == statuses[-1]
+    # the second page was fetched ahead, not the third
+    assert route.call_count == 2
@@ -1,13 +1,19 @@
 from pathlib import Path
 
+import httpx
 import pytest
 import respx
 
+from pinnacle.constants.dirs import IMG_DIR
 from pinnacle.ipfs.api.web3_storage import AsyncWeb3Storage
+from pinnacle.ipfs.content import AsyncCar
+from pinnacle.ipfs.content import AsyncDirectoryContent
+from pinnacle.ipfs.content import AsyncMappedContent
 from pinnacle.ipfs.content.content import AsyncContent
 from pinnacle.ipfs.models.models import Pin
 from tests.ipfs.api.conftest import CID
 from tests.ipfs.api.conftest import make_url
+from tests.ipfs.api.conftest import SHARD_SIZE
 
 
 @pytest.mark.anyio
@@ -22,3 +28,72 @@ async def test_AsyncWeb3Storage_add(mocked_web3storage_add, filename: str, path:
     assert isinstance(res, Pin)
     assert res.cid == CID
     assert res.name == filename
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_AsyncWeb3Storage_add_mapped(mocked_web3storage_add, path: Path):
+    async with AsyncWeb3Storage() as pin, AsyncMappedContent(path) as content:
+        url = make_url(pin, "upload")
+        route = respx.post(url).mock(return_value=mocked_web3storage_add)
+
+        res = await pin.add(content, cid_version=1)
+
+    body = await route.calls.last.request.aread()
+
+    assert res.cid == CID
+    assert path.read_bytes() in body
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_AsyncWeb3Storage_add_car():
+    car = AsyncCar.from_directory(IMG_DIR)
+
+    async with AsyncWeb3Storage() as pin:
+        url = make_url(pin, "car")
+        route = respx.post(url).mock(
+            return_value=httpx.Response(200, json={"cid": CID})
+        )
+
+        res = await pin.add_car(car)
+
+    assert res.pin.cid == CID
+    assert len(await route.calls.last.request.aread()) == car.size
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_AsyncWeb3Storage_add_directory():
+    async with AsyncWeb3Storage() as pin, AsyncDirectoryContent(IMG_DIR) as directory:
+        root, files = await directory.compute_cids()
+
+        route = respx.post(make_url(pin, "upload"))
+        route.mock(return_value=httpx.Response(200, json={"cid": root}))
+
+        res = await pin.add_directory(directory, file_cids=True)
+
+    body = await route.calls.last.request.aread()
+
+    assert res.pin.cid == root
+    assert res.pin.name == "img"
+    assert res.files == files
+    assert (IMG_DIR / "kai.png").read_bytes() in body
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_AsyncWeb3Storage_add_sharded(no_backoff, video: Path):
+    async with AsyncWeb3Storage() as pin, AsyncContent(
+        video, streaming=True
+    ) as content:
+        route = respx.post(make_url(pin, "car"))
+        ok = httpx.Response(200, json={"cid": CID})
+        route.side_effect = [ok, httpx.ConnectError("reset"), ok, ok]
+
+        res = await pin.add_sharded(content, shard_size=SHARD_SIZE, concurrency=1)
+
+    assert res.cid == CID
+    assert res.name == "video.mp4"
+    assert content.cid == CID
+    assert route.call_count == 4
@@ -1,8 +1,12 @@
 from pathlib import Path
 
+import httpx
 import respx
 
+from pinnacle.constants.dirs import IMG_DIR
 from pinnacle.ipfs.api.web3_storage import Web3Storage
+from pinnacle.ipfs.content import Car
+from pinnacle.ipfs.content import MappedContent
 from pinnacle.ipfs.content.content import Content
 from pinnacle.ipfs.models.models import Pin
 from tests.ipfs.api.conftest import CID
@@ -20,3 +24,37 @@ def test_Web3Storage_add(mocked_web3storage_add, filename: str, path: Path):
     assert isinstance(res, Pin)
     assert res.cid == CID
     assert res.name == filename
+
+
+@respx.mock
+def test_Web3Storage_add_mapped(mocked_web3storage_add, path: Path):
+    with Web3Storage() as pin, MappedContent(path) as content:
+        url = make_url(pin, "upload")
+        route = respx.post(url).mock(return_value=mocked_web3storage_add)
+
+        res = pin.add(content, cid_version=1)
+
+    body = route.calls.last.request.read()
+
+    assert res.cid == CID
+    assert path.read_bytes() in body
+
+
+@respx.mock
+def test_Web3Storage_add_car():
+    car = Car.from_directory(IMG_DIR)
+
+    with Web3Storage() as pin:
+        url = make_url(pin, "car")
+        route = respx.post(url).mock(
+            return_value=httpx.Response(200, json={"cid": CID})
+        )
+
+        res = pin.add_car(car)
+
+    request = route.calls.last.request
+
+    assert res.pin.cid == CID
+    assert set(res.files) == {"han.png", "kai.png", "rin.png"}
+    assert request.headers["Content-Type"] == "application/vnd.ipld.car"
+    assert len(request.read()) == car.size
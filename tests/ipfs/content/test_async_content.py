@@ -4,6 +4,7 @@ from pathlib import Path
 import pytest
 
 from pinnacle.ipfs.content.content import AsyncContent
+from pinnacle.ipfs.content.unixfs import compute_cid
 
 
 @pytest.fixture
@@ -44,3 +45,21 @@ async def test_async_reopen_fail(path: Path):
 async def test_close_before_open(async_content: AsyncContent):
     with pytest.raises(UnsupportedOperation):
         await async_content.close()
+
+
+@pytest.mark.anyio
+async def test_async_streaming_content(path: Path):
+    async with AsyncContent(path, streaming=True, chunk_size=64) as content:
+        assert content._bytes is None
+
+        prepared = content._prepare_multipart()
+        body = b"".join([chunk async for chunk in prepared["content"]])
+
+    assert prepared["headers"]["Content-Length"] == str(len(body))
+    assert path.read_bytes() in body
+    assert content._bytes is None
+
+
+@pytest.mark.anyio
+async def test_async_compute_cid(async_content: AsyncContent, path: Path):
+    assert await async_content.compute_cid() == compute_cid(path)
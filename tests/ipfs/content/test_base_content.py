@@ -53,6 +53,18 @@ def test_pinned(base_content: BaseContent):
 
     assert base_content.is_pinned is True
     assert base_content.cid == CID
+    assert base_content.cids == {}
+
+
+def test_pinned_per_provider(base_content: BaseContent):
+    base_content.set_pinned_status("QmOther", "https://api.pinata.cloud")
+    base_content.set_pinned_status(CID, "http://localhost:5001/api/v0")
+
+    assert base_content.cid == CID
+    assert base_content.cids == {
+        "https://api.pinata.cloud": "QmOther",
+        "http://localhost:5001/api/v0": CID,
+    }
 
 
 def test_uri(base_content: BaseContent):
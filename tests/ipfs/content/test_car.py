@@ -0,0 +1,188 @@
+import hashlib
+import io
+import os
+from pathlib import Path
+
+import pytest
+
+from pinnacle.constants.dirs import IMG_DIR
+from pinnacle.ipfs.content import AsyncCar
+from pinnacle.ipfs.content import AsyncShardedCar
+from pinnacle.ipfs.content import Car
+from pinnacle.ipfs.content import Content
+from pinnacle.ipfs.content import ShardedCar
+from pinnacle.ipfs.content.car import encode_car_header
+from pinnacle.ipfs.content.unixfs import _read_varint
+from pinnacle.ipfs.content.unixfs import build_file_dag
+from pinnacle.ipfs.content.unixfs import CID
+from pinnacle.ipfs.content.unixfs import compute_cid
+
+
+def read_car(data: bytes):
+    """Parse a CARv1 into its header and (cid bytes, block data) pairs"""
+    length, offset = _read_varint(data)
+    header = data[offset : offset + length]
+    offset += length
+
+    blocks = []
+    while offset < len(data):
+        length, offset = _read_varint(data, offset)
+        frame = data[offset : offset + length]
+        offset += length
+
+        # CIDv1 with sha2-256: version, codec, hash code and length are 1 byte each
+        blocks.append((frame[:36], frame[36:]))
+
+    return header, blocks
+
+
+@pytest.fixture
+def collection(tmp_path: Path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.json").write_text('{"name": "a"}')
+    (tmp_path / "sub" / "b.json").write_text('{"name": "b"}')
+    (tmp_path / "sub" / "c.json").write_text('{"name": "a"}')
+    return tmp_path
+
+
+def test_encode_car_header():
+    root = CID.decode("bafkreifjjcie6lypi6ny7amxnfftagclbuxndqonfipmb64f2km2devei4")
+    header = encode_car_header([root])
+
+    assert header[0] == len(header) - 1
+    assert header[1:9] == b"\xa2\x65roots\x81"
+    assert header[9:13] == b"\xd8\x2a\x58\x25"
+    assert header[13:50] == b"\x00" + root.buffer
+    assert header[50:] == b"\x67version\x01"
+
+
+def test_car_from_directory(collection: Path):
+    car = Car.from_directory(collection).build()
+    data = b"".join(car)
+    header, blocks = read_car(data)
+
+    assert len(data) == car.size
+    assert car.root.buffer in header
+    assert blocks[-1][0] == car.root.buffer
+    for cid, block in blocks:
+        assert cid[-32:] == hashlib.sha256(block).digest()
+
+    assert {path: str(cid) for path, cid in car.files.items()} == {
+        "a.json": compute_cid(collection / "a.json"),
+        "sub/b.json": compute_cid(collection / "sub" / "b.json"),
+        "sub/c.json": compute_cid(collection / "sub" / "c.json"),
+    }
+
+
+def test_car_deduplicates_blocks(collection: Path):
+    car = Car.from_directory(collection).build()
+    _, blocks = read_car(b"".join(car))
+
+    # a.json and sub/c.json share their only block
+    assert len(blocks) == 4
+    assert car.files["a.json"] == car.files["sub/c.json"]
+
+
+def test_car_from_contents():
+    contents = [Content(IMG_DIR / "han.png"), Content(IMG_DIR / "kai.png")]
+    car = Car.from_contents(contents).build()
+
+    assert set(car.files) == {"han.png", "kai.png"}
+    assert str(car.files["han.png"]) == compute_cid(IMG_DIR / "han.png")
+
+
+def test_car_from_contents_duplicate_names(tmp_path: Path):
+    (tmp_path / "sub").mkdir()
+    for path in (tmp_path / "han.png", tmp_path / "sub" / "han.png"):
+        path.write_bytes(path.parent.name.encode())
+
+    contents = [Content(tmp_path / "han.png"), Content(tmp_path / "sub" / "han.png")]
+    with pytest.raises(ValueError):
+        Car.from_contents(contents)
+
+
+def test_car_replay(collection: Path):
+    car = Car.from_directory(collection).build()
+    file = io.BytesIO()
+
+    assert car.write(file) == car.size
+    assert file.getvalue() == b"".join(car._prepare()["content"])
+
+
+def test_car_not_built(collection: Path):
+    car = Car.from_directory(collection)
+
+    with pytest.raises(ValueError) as error:
+        car._prepare()
+
+    assert error.match("Car has not been built")
+
+
+@pytest.mark.anyio
+async def test_async_car(collection: Path):
+    car = await AsyncCar.from_directory(collection).build()
+    prepared = car._prepare()
+    data = b"".join([chunk async for chunk in prepared["content"]])
+
+    assert prepared["headers"]["Content-Length"] == str(len(data))
+    assert data == b"".join(Car.from_directory(collection).build())
+
+
+@pytest.fixture
+def video(tmp_path: Path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(os.urandom(200_000))
+    return path
+
+
+@pytest.mark.parametrize("raw_leaves", (None, False))
+def test_sharded_car(video: Path, raw_leaves: bool | None):
+    options = dict(chunker="size-1000", raw_leaves=raw_leaves)
+    car = ShardedCar(video, 20_000, **options).build()
+    expected = {(b.cid.buffer, b.data) for b in build_file_dag(video, 1, **options)}
+
+    blocks = set()
+    for shard in car.shards:
+        data = b"".join(shard)
+        header, shard_blocks = read_car(data)
+
+        assert len(data) == shard.size <= 20_000
+        assert header == encode_car_header([car.root])[1:]
+        blocks.update(shard_blocks)
+
+    assert str(car.root) == compute_cid(video, **options)
+    assert blocks == expected
+    assert len(car.shards) > 10
+    assert car.size == sum(len(b"".join(shard)) for shard in car.shards)
+
+
+def test_sharded_car_single_shard(video: Path):
+    car = ShardedCar(video).build()
+
+    assert len(car.shards) == 1
+    assert str(car.root) == compute_cid(video)
+
+
+def test_sharded_car_limits(tmp_path: Path, video: Path):
+    with pytest.raises(ValueError):
+        ShardedCar(video, 1000, chunker="size-1000").build()
+
+    (empty := tmp_path / "empty").touch()
+    with pytest.raises(ValueError):
+        ShardedCar(empty).build()
+
+    with pytest.raises(ValueError):
+        ShardedCar(video).root
+
+
+@pytest.mark.anyio
+async def test_async_sharded_car(video: Path):
+    car = await AsyncShardedCar(video, 50_000, chunker="size-1000").build()
+    sync = ShardedCar(video, 50_000, chunker="size-1000").build()
+
+    for shard, expected in zip(car.shards, sync.shards, strict=True):
+        prepared = car._prepare(shard)
+        body = b"".join([chunk async for chunk in prepared["content"]])
+
+        assert body == b"".join(expected)
+        assert prepared["headers"]["Content-Length"] == str(len(body))
@@ -4,6 +4,7 @@ from pathlib import Path
 import pytest
 
 from pinnacle.ipfs.content.content import Content
+from pinnacle.ipfs.content.unixfs import compute_cid
 
 
 @pytest.fixture
@@ -40,3 +41,45 @@ def test_reopen_fail(path: Path):
 def test_close_before_open(content: Content):
     with pytest.raises(UnsupportedOperation):
         content.close()
+
+
+def test_close_release_bytes(path: Path):
+    with Content(path) as content:
+        ...
+
+    assert content._bytes is None
+
+
+def test_streaming_content(path: Path):
+    with Content(path, streaming=True, chunk_size=64) as content:
+        assert content._bytes is None
+
+        prepared = content._prepare()
+        chunks = list(prepared["content"])
+
+    assert max(len(c) for c in chunks) == 64
+    assert b"".join(chunks) == path.read_bytes()
+    assert prepared["headers"]["Content-Length"] == str(content.size)
+
+
+def test_streaming_content_multipart(path: Path):
+    with Content(path, streaming=True) as content:
+        prepared = content._prepare_multipart(data={"option": "value"})
+        body = b"".join(prepared["content"])
+
+    assert prepared["headers"]["Content-Length"] == str(len(body))
+    assert path.read_bytes() in body
+
+
+def test_streaming_content_not_opened(content: Content):
+    content.streaming = True
+
+    with pytest.raises(ValueError) as error:
+        content._prepare()
+
+    assert error.match("Content's file has not been opened")
+
+
+def test_compute_cid(content: Content, path: Path):
+    assert content.compute_cid() == compute_cid(path)
+    assert content.compute_cid(cid_version=0) == compute_cid(path, 0)
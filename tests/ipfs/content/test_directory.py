@@ -0,0 +1,107 @@
+from io import UnsupportedOperation
+from pathlib import Path
+
+import pytest
+
+from pinnacle.constants.dirs import IMG_DIR
+from pinnacle.ipfs.content import AsyncDirectoryContent
+from pinnacle.ipfs.content import Car
+from pinnacle.ipfs.content import DirectoryContent
+
+
+@pytest.fixture
+def directory(tmp_path: Path):
+    root = tmp_path / "drop"
+    (root / "sub").mkdir(parents=True)
+    (root / "a.txt").write_bytes(b"a" * 1000)
+    (root / "sub" / "b 100%.txt").write_bytes(b"b")
+    return root
+
+
+def test_directory_content(directory: Path):
+    with DirectoryContent(directory) as content:
+        assert content.opened
+        assert content.basename == "drop"
+        assert content.size == 1001
+        assert [entry.path for entry in content.entries] == [
+            "a.txt",
+            "sub",
+            "sub/b 100%.txt",
+        ]
+        assert content.files == ["a.txt", "sub/b 100%.txt"]
+
+    assert content.closed
+    with pytest.raises(ValueError):
+        content.files
+
+
+def test_directory_content_reopen(directory: Path):
+    content = DirectoryContent(directory).open()
+
+    with pytest.raises(UnsupportedOperation):
+        content.open()
+
+    content.close()
+    with pytest.raises(UnsupportedOperation):
+        content.close()
+
+
+def test_directory_content_no_raw_body(directory: Path):
+    with DirectoryContent(directory) as content:
+        with pytest.raises(UnsupportedOperation):
+            content._prepare()
+
+
+def test_directory_content_multipart(directory: Path):
+    with DirectoryContent(directory, chunk_size=64) as content:
+        prepared = content._prepare_multipart(prefix="drop")
+        body = b"".join(prepared["content"])
+
+    assert prepared["headers"]["Content-Length"] == str(len(body))
+    assert body.count(b'name="file"') == 2
+    assert b'filename="drop/a.txt"' in body
+    assert b'filename="drop/sub/b 100%.txt"' in body
+    assert b"a" * 1000 in body
+    assert b"application/x-directory" not in body
+
+
+def test_directory_content_multipart_directories(directory: Path):
+    with DirectoryContent(directory) as content:
+        prepared = content._prepare_multipart(directories=True)
+        body = b"".join(prepared["content"])
+
+    assert prepared["headers"]["Content-Length"] == str(len(body))
+    assert body.count(b'name="file"') == 3
+    assert b'filename="sub"\r\nContent-Type: application/x-directory' in body
+    # kubo unescapes filenames
+    assert b'filename="sub/b%20100%25.txt"' in body
+
+
+def test_directory_content_compute_cids():
+    car = Car.from_directory(IMG_DIR).build()
+
+    with DirectoryContent(IMG_DIR) as content:
+        root, files = content.compute_cids()
+
+    assert root == str(car.root)
+    assert files == {path: str(cid) for path, cid in car.files.items()}
+    assert DirectoryContent(IMG_DIR).compute_cids(cid_version=0)[0].startswith("Qm")
+
+
+@pytest.mark.anyio
+async def test_async_directory_content(directory: Path):
+    with DirectoryContent(directory) as content:
+        expected = content.compute_cids()
+        sync_body = content._prepare_multipart(directories=True)["content"]
+        boundary = sync_body.boundary
+        sync_bytes = b"".join(sync_body)
+
+    async with AsyncDirectoryContent(directory, chunk_size=64) as content:
+        body = content._prepare_multipart(directories=True)["content"]
+        body.boundary = boundary
+        chunks = [chunk async for chunk in body]
+
+        assert await content.compute_cids() == expected
+
+    assert content.closed
+    assert len(b"".join(chunks)) == len(sync_bytes)
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import UnsupportedOperation
+from pathlib import Path
+
+import pytest
+
+from pinnacle.ipfs.content import AsyncMappedContent
+from pinnacle.ipfs.content import MappedContent
+
+
+def test_mapped_content(path: Path):
+    with MappedContent(path, chunk_size=1024) as content:
+        assert content.opened
+        assert content._bytes is None
+        assert content.size == path.stat().st_size
+
+        chunks = list(content._prepare()["content"])
+
+    assert all(isinstance(c, memoryview) for c in chunks)
+    assert b"".join(chunks) == path.read_bytes()
+    assert content.closed
+    assert content._mmap is None
+
+
+def test_mapped_content_shared_across_threads(path: Path):
+    with MappedContent(path) as content:
+        with ThreadPoolExecutor(4) as executor:
+            bodies = executor.map(
+                lambda _: b"".join(content._prepare_multipart()["content"]),
+                range(8),
+            )
+            bodies = list(bodies)
+
+    assert all(path.read_bytes() in body for body in bodies)
+
+
+def test_mapped_content_close_with_exported_slices(path: Path):
+    content = MappedContent(path).open()
+    chunk = next(iter(content._prepare()["content"]))
+
+    content.close()
+
+    assert content.closed
+    assert bytes(chunk) == path.read_bytes()[: len(chunk)]
+
+
+def test_mapped_empty_file(tmp_path: Path):
+    empty = tmp_path / "empty"
+    empty.touch()
+
+    with MappedContent(empty) as content:
+        assert content.size == 0
+        assert list(content._prepare()["content"]) == []
+
+
+def test_mapped_content_not_opened(path: Path):
+    with pytest.raises(ValueError) as error:
+        MappedContent(path)._prepare()
+
+    assert error.match("Content's file has not been mapped")
+
+
+def test_mapped_reopen_fail(path: Path):
+    with MappedContent(path) as content:
+        with pytest.raises(UnsupportedOperation):
+            content.open()
+
+
+@pytest.mark.anyio
+async def test_async_mapped_content(path: Path):
+    async with AsyncMappedContent(path, chunk_size=1024) as content:
+        prepared = content._prepare_multipart()
+        body = b"".join([chunk async for chunk in prepared["content"]])
+
+    assert prepared["headers"]["Content-Length"] == str(len(body))
+    assert path.read_bytes() in body
+    assert content.closed
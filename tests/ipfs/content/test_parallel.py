@@ -0,0 +1,44 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from pinnacle.constants.dirs import IMG_DIR
+from pinnacle.ipfs.content import compute_cid
+from pinnacle.ipfs.content import compute_cids
+
+
+@pytest.fixture
+def paths(tmp_path: Path):
+    big = tmp_path / "big.bin"
+    big.write_bytes(os.urandom(300_000))
+    empty = tmp_path / "empty"
+    empty.touch()
+    return [big, empty, *IMG_DIR.iterdir()]
+
+
+@pytest.mark.parametrize(
+    "options",
+    (
+        {},
+        {"cid_version": 0},
+        {"chunker": "size-1000"},
+        {"cid_version": 0, "raw_leaves": True, "chunker": "size-512"},
+    ),
+)
+def test_compute_cids(paths: list[Path], options: dict):
+    # a small split size spreads every file over several workers
+    cids = dict(compute_cids(paths, 2, split_size=4096, **options))
+
+    assert cids == {path: compute_cid(path, **options) for path in paths}
+
+
+def test_compute_cids_lazy_paths(paths: list[Path]):
+    cids = dict(compute_cids(iter(paths), 1))
+
+    assert set(cids) == set(paths)
+
+
+def test_compute_cids_missing_file(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        list(compute_cids([tmp_path / "missing"], 1))
@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+from pinnacle.ipfs.content.stream import AsyncMultipartStream
+from pinnacle.ipfs.content.stream import FileStream
+from pinnacle.ipfs.content.stream import MultipartFile
+from pinnacle.ipfs.content.stream import MultipartStream
+
+DATA = b"0123456789" * 10
+BOUNDARY = "boundary"
+
+
+class AsyncBytes:
+    def __init__(self, data: bytes, chunk_size: int):
+        self.data = data
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self):
+        for i in range(0, len(self.data), self.chunk_size):
+            yield self.data[i : i + self.chunk_size]
+
+
+def test_file_stream_chunks():
+    stream = FileStream(io.BytesIO(DATA), chunk_size=30)
+    chunks = list(stream)
+
+    assert [len(c) for c in chunks] == [30, 30, 30, 10]
+    assert b"".join(chunks) == DATA
+
+
+def test_file_stream_replay():
+    stream = FileStream(io.BytesIO(DATA), chunk_size=30)
+
+    assert b"".join(stream) == b"".join(stream) == DATA
+
+
+def test_multipart_stream():
+    part = MultipartFile("test.png", FileStream(io.BytesIO(DATA), 7), len(DATA))
+    body = MultipartStream([part], {"option": "value"}, boundary=BOUNDARY)
+    raw = b"".join(body)
+
+    assert len(raw) == body.content_length
+    assert body.headers == {
+        "Content-Type": f"multipart/form-data; boundary={BOUNDARY}",
+        "Content-Length": str(len(raw)),
+    }
+    assert raw == (
+        b"--boundary\r\n"
+        b'Content-Disposition: form-data; name="option"\r\n\r\nvalue\r\n'
+        b"--boundary\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="test.png"\r\n\r\n'
+        + DATA
+        + b"\r\n--boundary--\r\n"
+    )
+
+
+def test_multipart_stream_mimetype():
+    part = MultipartFile("test.png", [DATA], len(DATA), "image/png")
+    raw = b"".join(MultipartStream([part], boundary=BOUNDARY))
+
+    assert b"Content-Type: image/png\r\n\r\n" + DATA in raw
+
+
+@pytest.mark.anyio
+async def test_async_multipart_stream():
+    part = MultipartFile("test.png", AsyncBytes(DATA, 7), len(DATA))
+    body = AsyncMultipartStream([part], {"option": "value"}, boundary=BOUNDARY)
+    raw = b"".join([chunk async for chunk in body])
+
+    assert len(raw) == body.content_length
+    assert raw == b"".join(
+        MultipartStream(
+            [MultipartFile("test.png", [DATA], len(DATA))],
+            {"option": "value"},
+            boundary=BOUNDARY,
+        )
+    )
@@ -0,0 +1,184 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from pinnacle.ipfs.content.unixfs import b58decode
+from pinnacle.ipfs.content.unixfs import b58encode
+from pinnacle.ipfs.content.unixfs import CID
+from pinnacle.ipfs.content.unixfs import compute_cid
+from pinnacle.ipfs.content.unixfs import DAG_PB
+from pinnacle.ipfs.content.unixfs import parse_chunker
+from pinnacle.ipfs.content.unixfs import RAW
+from pinnacle.ipfs.content.unixfs import UnixFSBuilder
+from pinnacle.ipfs.content.unixfs import UnsupportedChunkerError
+from pinnacle.ipfs.content.unixfs import varint
+
+# CIDs given by `ipfs add` (kubo) with default options
+HELLO_WORLD = b"hello world\n"
+HELLO_WORLD_V0 = "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+HELLO_WORLD_V1 = "bafkreifjjcie6lypi6ny7amxnfftagclbuxndqonfipmb64f2km2devei4"
+EMPTY_V0 = "QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH"
+EMPTY_V1 = "bafkreihdwdcefgh4dqkjv67uzcmw7ojee6xedzdetojuzjevtenxquvyku"
+
+
+@pytest.fixture
+def hello_world(tmp_path: Path):
+    file = tmp_path / "hello.txt"
+    file.write_bytes(HELLO_WORLD)
+    return file
+
+
+@pytest.fixture
+def empty(tmp_path: Path):
+    file = tmp_path / "empty"
+    file.touch()
+    return file
+
+
+@pytest.mark.parametrize(
+    ("n", "expected"),
+    (
+        (0, b"\x00"),
+        (1, b"\x01"),
+        (127, b"\x7f"),
+        (128, b"\x80\x01"),
+        (300, b"\xac\x02"),
+    ),
+)
+def test_varint(n, expected):
+    assert varint(n) == expected
+
+
+def test_b58_roundtrip():
+    data = b"\x00\x00multihash"
+    assert b58decode(b58encode(data)) == data
+
+
+@pytest.mark.parametrize("cid", (HELLO_WORLD_V0, HELLO_WORLD_V1, EMPTY_V0))
+def test_cid_decode_roundtrip(cid):
+    assert str(CID.decode(cid)) == cid
+
+
+def test_cid_v0_requires_dag_pb():
+    with pytest.raises(ValueError):
+        CID(0, RAW, b"")
+
+
+@pytest.mark.parametrize(
+    ("fixture", "cid_version", "expected"),
+    (
+        ("hello_world", 0, HELLO_WORLD_V0),
+        ("hello_world", 1, HELLO_WORLD_V1),
+        ("empty", 0, EMPTY_V0),
+        ("empty", 1, EMPTY_V1),
+    ),
+)
+def test_compute_cid_matches_kubo(request, fixture, cid_version, expected):
+    path = request.getfixturevalue(fixture)
+    assert compute_cid(path, cid_version) == expected
+
+
+def test_compute_cid_v0_two_chunks(tmp_path: Path):
+    """
+    A file of two chunks, its DAG encoded by hand after kubo's balanced
+    layout (go-unixfs fillNodeRec): the first leaf is typed File, the
+    second Raw, the root File with both block sizes.
+    """
+    first, second = bytes(range(256)) * 1024, b"!"
+    file = tmp_path / "big.bin"
+    file.write_bytes(first + second)
+
+    leaf_file = (
+        b"\x0a\x8a\x80\x10"  # PBNode.Data, 262154 bytes
+        + b"\x08\x02\x12\x80\x80\x10"  # Type File, Data of 262144 bytes
+        + first
+        + b"\x18\x80\x80\x10"  # filesize 262144
+    )
+    leaf_raw = b"\x0a\x07\x08\x00\x12\x01!\x18\x01"  # Type Raw, Data, filesize 1
+    links = [
+        (leaf_file, b"\x12\x2a", b"\x8e\x80\x10"),  # Tsize 262158
+        (leaf_raw, b"\x12\x28", b"\x09"),
+    ]
+    root = b"".join(
+        head + b"\x0a\x22\x12\x20" + hashlib.sha256(leaf).digest()
+        # empty Name, Tsize
+        + b"\x12\x00\x18" + tsize
+        for leaf, head, tsize in links
+    )
+    # Type File, filesize 262145, blocksizes 262144 and 1
+    root += b"\x0a\x0c\x08\x02\x18\x81\x80\x10\x20\x80\x80\x10\x20\x01"
+    expected = b58encode(b"\x12\x20" + hashlib.sha256(root).digest())
+
+    assert compute_cid(file, 0) == expected
+
+
+def test_compute_cid_v0_raw_leaves(hello_world: Path):
+    # a single raw leaf is the root, and raw blocks are always CIDv1
+    assert compute_cid(hello_world, 0, raw_leaves=True) == HELLO_WORLD_V1
+
+
+@pytest.mark.parametrize(
+    ("chunker", "expected"),
+    (("default", 262144), ("size-262144", 262144), ("size-1024", 1024)),
+)
+def test_parse_chunker(chunker, expected):
+    assert parse_chunker(chunker) == expected
+
+
+@pytest.mark.parametrize("chunker", ("rabin", "size-0", "size-", "buzhash"))
+def test_parse_chunker_fail(chunker):
+    with pytest.raises(UnsupportedChunkerError):
+        parse_chunker(chunker)
+
+
+def test_builder_single_level():
+    blocks = list(UnixFSBuilder(max_links=4).build([b"a", b"bb", b"ccc"]))
+    *leaves, root = blocks
+
+    assert [b.data for b in leaves] == [b"a", b"bb", b"ccc"]
+    assert all(b.cid.codec == RAW for b in leaves)
+    assert root.cid.codec == DAG_PB
+    for leaf in leaves:
+        assert leaf.cid.buffer in root.data
+
+
+def test_builder_balanced_layout():
+    chunks = [bytes([i]) for i in range(10)]
+    blocks = list(UnixFSBuilder(max_links=3).build(chunks))
+    nodes = [b for b in blocks if b.cid.codec == DAG_PB]
+
+    # 10 leaves with 3 links per node: 4 nodes at depth 1, 2 at depth 2, a root
+    assert len(blocks) - len(nodes) == 10
+    assert len(nodes) == 7
+    assert blocks[-1] is nodes[-1]
+
+
+def test_builder_streams_blocks():
+    def chunks():
+        for i in range(1000):
+            yield i.to_bytes(2, "big")
+
+    blocks = UnixFSBuilder(max_links=4).build(chunks())
+
+    # the first leaf comes out before the input is exhausted
+    assert next(blocks).data == b"\x00\x00"
+
+
+def test_compute_cid_deterministic(path: Path):
+    a = compute_cid(path, chunker="size-1024")
+    b = compute_cid(path, chunker="size-1024")
+
+    assert a == b
+    assert a != compute_cid(path)
+    assert compute_cid(path, 0, chunker="size-1024").startswith("Qm")
+
+
+def test_build_links_matches_build():
+    chunks = [i.to_bytes(2, "big") * 5 for i in range(400)]
+    builder = UnixFSBuilder(max_links=3)
+
+    *_, expected = builder.build(chunks)
+    *_, root = builder.build_links(builder.leaf_links(chunks))
+
+    assert root == expected
@@ -0,0 +1,83 @@
+import httpx
+import pytest
+
+from pinnacle.ipfs.breaker import CircuitBreaker
+from pinnacle.ipfs.breaker import is_outage
+
+
+def status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://localhost")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    (
+        (status_error(503), True),
+        (status_error(429), True),
+        (status_error(400), False),
+        (httpx.ConnectError("refused"), True),
+        (TimeoutError(), True),
+        (ValueError(), False),
+    ),
+)
+def test_is_outage(error, expected):
+    assert is_outage(error) is expected
+
+
+def test_opens_after_failures():
+    breaker = CircuitBreaker(3)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success(0.1)  # failures must be consecutive
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_opens_on_latency():
+    breaker = CircuitBreaker(max_latency=1.0)
+    breaker.record_success(0.5)
+    breaker.record_success(1.5)
+    assert breaker.state == "closed"  # a single slow call is averaged out
+
+    for _ in range(4):
+        breaker.record_success(3.0)
+    assert breaker.state == "open"
+
+
+def test_half_open_probe_closes():
+    breaker = CircuitBreaker(1, reset_timeout=0, probes=1)
+    breaker.record_failure()
+
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()  # a single probe at a time
+
+    breaker.record_success(0.1)
+    assert breaker.state == "closed"
+
+
+def test_half_open_probe_reopens():
+    breaker = CircuitBreaker(1, reset_timeout=60)
+    breaker._open()
+    breaker._opened_at -= 60
+
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_release_probe():
+    breaker = CircuitBreaker(1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
@@ -0,0 +1,94 @@
+import httpx
+import pytest
+import respx
+
+from pinnacle.ipfs.api import AsyncPinata
+from pinnacle.ipfs.api import Pinata
+from pinnacle.ipfs.clients import ClientRegistry
+from pinnacle.ipfs.config import Config
+
+TEST_SERVICE = "http://localhost"
+
+
+@pytest.fixture
+def registry():
+    registry = ClientRegistry()
+    yield registry
+    registry.close()
+
+
+def test_client_per_host(registry: ClientRegistry):
+    client = registry.client(Config(TEST_SERVICE))
+
+    assert registry.client(Config(f"{TEST_SERVICE}/api/v0")) is client
+    assert registry.client(Config("http://127.0.0.1")) is not client
+
+
+def test_client_per_limits(registry: ClientRegistry):
+    client = registry.client(Config(TEST_SERVICE))
+    limits = httpx.Limits(max_connections=4)
+
+    assert registry.client(Config(TEST_SERVICE, limits=limits)) is not client
+
+
+def test_client_reopened(registry: ClientRegistry):
+    client = registry.client(Config(TEST_SERVICE))
+    registry.close()
+
+    assert client.is_closed
+    assert registry.client(Config(TEST_SERVICE)) is not client
+
+
+@pytest.mark.anyio
+async def test_async_client_per_loop(registry: ClientRegistry):
+    client = registry.async_client(Config(TEST_SERVICE))
+
+    assert registry.async_client(Config(TEST_SERVICE)) is client
+    assert not registry._unbound_clients  # bound to the running loop
+
+    await registry.aclose()
+    assert client.is_closed
+
+
+def test_providers_share_client():
+    pinata, other = Pinata(), Pinata()
+
+    with pinata:
+        assert pinata.shared
+        assert pinata.api_client is other.api_client
+
+    assert not pinata.api_client.is_closed
+
+
+def test_private_client():
+    pinata = Pinata(Config(Pinata.global_config.url))
+
+    assert not pinata.shared
+    assert pinata.api_client is not Pinata().api_client
+
+
+@pytest.mark.anyio
+async def test_async_providers_share_client():
+    async with AsyncPinata() as pinata:
+        assert pinata.api_client is AsyncPinata().api_client
+
+
+@respx.mock
+def test_prewarm():
+    route = respx.head(Pinata.global_config.url).mock(
+        side_effect=[httpx.Response(200), httpx.ConnectError("down")]
+    )
+    Pinata().prewarm(2)
+
+    assert route.call_count == 2
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_async_prewarm():
+    route = respx.head(AsyncPinata.global_config.url).mock(
+        return_value=httpx.Response(405)
+    )
+    await AsyncPinata().prewarm(3)
+
+    assert route.call_count == 3
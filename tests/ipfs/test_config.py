@@ -1,6 +1,10 @@
+import logging
 from unittest import mock
 
+import httpx
 import pytest
+from httpx import AsyncHTTPTransport
+from httpx import HTTPTransport
 from httpx import Request
 
 from pinnacle.ipfs.config import _from_dot_env
@@ -8,6 +12,7 @@ from pinnacle.ipfs.config import _from_os_env
 from pinnacle.ipfs.config import AuthKeyNotFoundError
 from pinnacle.ipfs.config import BearerAuth
 from pinnacle.ipfs.config import Config
+from pinnacle.ipfs.config import DEFAULT_LIMITS
 from pinnacle.ipfs.config import ENVNotFoundError
 from pinnacle.ipfs.config import MalformedURLError
 from pinnacle.ipfs.config import sanitize_url
@@ -169,3 +174,59 @@ def test_setup_with_auth(config: Config):
     config.update_authentication(auth)
 
     assert config.setup() == dict(auth=auth)
+
+
+def test_account():
+    config = Config(TEST_SERVICE, BearerAuth(TEST_JWT))
+    other = Config(TEST_SERVICE, BearerAuth("other"))
+
+    assert config.account.startswith(f"{TEST_SERVICE}#")
+    assert TEST_JWT not in config.account
+    assert config.account != other.account
+    assert Config(TEST_SERVICE).account == TEST_SERVICE
+
+
+@mock.patch("pinnacle.ipfs.config._h2_installed", return_value=False)
+def test_client_options(h2_installed, config: Config):
+    assert config.client_options() == dict(limits=DEFAULT_LIMITS, http2=False)
+
+
+@mock.patch("pinnacle.ipfs.config._h2_installed", return_value=True)
+def test_client_options_http2(h2_installed):
+    assert Config(TEST_SERVICE).use_http2
+    assert not Config(TEST_SERVICE, http2=False).use_http2
+
+
+@mock.patch("pinnacle.ipfs.config._h2_installed", return_value=False)
+def test_client_options_http1_fallback(h2_installed, caplog):
+    with caplog.at_level(logging.DEBUG, logger="pinnacle.ipfs.config"):
+        assert not Config(TEST_SERVICE).use_http2
+    assert "HTTP/1.1" in caplog.text
+
+    caplog.clear()
+    with caplog.at_level(logging.DEBUG, logger="pinnacle.ipfs.config"):
+        assert not Config(TEST_SERVICE, http2=False).use_http2
+    assert caplog.text == ""
+
+
+@pytest.mark.parametrize("client_class", (httpx.Client, httpx.AsyncClient))
+def test_http2_client(client_class):
+    pytest.importorskip("h2")
+    config = Config(TEST_SERVICE)
+
+    client = client_class(**config.client_options())
+
+    assert config.use_http2
+    assert client._transport._pool._http2
+
+
+@pytest.mark.parametrize(
+    ("asynchronous", "transport"),
+    ((False, HTTPTransport), (True, AsyncHTTPTransport)),
+)
+def test_client_options_unix_socket(asynchronous, transport):
+    config = Config.from_multiaddr("/unix/run/ipfs.sock")
+    options = config.client_options(asynchronous)
+
+    assert config.uds == "/run/ipfs.sock"
+    assert isinstance(options["transport"], transport)
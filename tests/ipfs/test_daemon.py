@@ -0,0 +1,96 @@
+import httpx
+import pytest
+import respx
+
+from pinnacle.constants.pin_services import LOCAL_SERVICE
+from pinnacle.ipfs.daemon import api_address
+from pinnacle.ipfs.daemon import DaemonProbe
+from pinnacle.ipfs.daemon import multiaddr_to_url
+from pinnacle.ipfs.daemon import parse_multiaddr
+from pinnacle.ipfs.daemon import probe
+from pinnacle.ipfs.daemon import UNIX_SOCKET_URL
+from pinnacle.ipfs.daemon import UnsupportedMultiaddrError
+
+URL = "http://127.0.0.1:5001/api/v0"
+
+
+@pytest.mark.parametrize(
+    ("multiaddr", "expected"),
+    (
+        ("/ip4/127.0.0.1/tcp/5001", URL),
+        ("/ip6/::1/tcp/5001\n", "http://[::1]:5001/api/v0"),
+        ("/dns4/ipfs/tcp/5001/https", "https://ipfs:5001/api/v0"),
+        ("http://ipfs:5001/", "http://ipfs:5001/api/v0"),
+    ),
+)
+def test_multiaddr_to_url(multiaddr, expected):
+    assert multiaddr_to_url(multiaddr) == expected
+
+
+@pytest.mark.parametrize("multiaddr", ("/unix/run/ipfs.sock", "/ip4/127.0.0.1/udp/1"))
+def test_multiaddr_to_url_fail(multiaddr):
+    with pytest.raises(UnsupportedMultiaddrError):
+        multiaddr_to_url(multiaddr)
+
+
+def test_parse_multiaddr():
+    assert parse_multiaddr("/ip4/127.0.0.1/tcp/5001") == (URL, None)
+    assert parse_multiaddr("/unix/run/ipfs.sock\n") == (
+        UNIX_SOCKET_URL,
+        "/run/ipfs.sock",
+    )
+
+
+def test_api_address(tmp_path, monkeypatch):
+    monkeypatch.setenv("IPFS_PATH", str(tmp_path))
+    assert api_address() == (LOCAL_SERVICE, None)
+
+    (tmp_path / "api").write_text("/ip4/10.0.0.2/tcp/5002")
+    assert api_address() == ("http://10.0.0.2:5002/api/v0", None)
+
+    (tmp_path / "api").write_text("/unix/run/ipfs.sock")
+    assert api_address() == (UNIX_SOCKET_URL, "/run/ipfs.sock")
+
+
+def test_probe_shared():
+    assert probe(URL) is probe(URL)
+
+
+@respx.mock
+def test_probe_ttl():
+    daemon = DaemonProbe(URL, ttl=0)
+    route = respx.post(f"{URL}/id") % 200
+
+    with httpx.Client() as client:
+        assert daemon.active(client)
+        assert daemon.active(client)
+
+    assert route.call_count == 2
+
+
+@respx.mock
+def test_probe_invalidate():
+    daemon = DaemonProbe(URL)
+    route = respx.post(f"{URL}/id")
+    route.side_effect = [httpx.Response(200), httpx.ConnectError("down")]
+
+    with httpx.Client() as client:
+        assert daemon.active(client)
+        daemon.invalidate()
+        assert not daemon.active(client)
+        assert not daemon.active(client)
+
+    assert route.call_count == 2
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_probe_aactive():
+    daemon = DaemonProbe(URL)
+    route = respx.post(f"{URL}/id") % 405
+
+    async with httpx.AsyncClient() as client:
+        assert not await daemon.aactive(client)
+        assert not await daemon.aactive(client)
+
+    assert route.call_count == 1
@@ -0,0 +1,126 @@
+from datetime import datetime
+from pathlib import Path
+
+import anyio
+import httpx
+import pytest
+import respx
+
+from pinnacle.constants import PINATA_SERVICE
+from pinnacle.ipfs import AsyncFailoverPinAPI
+from pinnacle.ipfs import FailoverPinAPI
+from pinnacle.ipfs.api import AsyncNFTStorage
+from pinnacle.ipfs.api import AsyncPinata
+from pinnacle.ipfs.api import NFTStorage
+from pinnacle.ipfs.api import Pinata
+from pinnacle.ipfs.api.pinata import PinataAdd
+from pinnacle.ipfs.config import BearerAuth
+from pinnacle.ipfs.config import Config
+from pinnacle.ipfs.content import AsyncContent
+from pinnacle.ipfs.content import Content
+from pinnacle.ipfs.failover import ProvidersUnavailableError
+from tests.ipfs.api.conftest import CID
+from tests.ipfs.api.conftest import make_url
+
+
+def pinata_add():
+    json = PinataAdd(IpfsHash=CID, PinSize=311, Timestamp=datetime.now()).json()
+    return httpx.Response(200, content=json)
+
+
+def mock_providers(pinata, nft_storage):
+    pinata_route = respx.post(make_url(pinata, "pinning/pinFileToIPFS"))
+    nft_storage_route = respx.post(make_url(nft_storage, "upload"))
+    nft_storage_route.mock(return_value=httpx.Response(200, json={"ok": False}))
+    return pinata_route, nft_storage_route
+
+
+def test_init_empty():
+    with pytest.raises(ValueError):
+        FailoverPinAPI([])
+
+
+@respx.mock
+def test_failover_accounts(path: Path):
+    first, second = (
+        Pinata(Config(PINATA_SERVICE, BearerAuth(token)))
+        for token in ("first", "second")
+    )
+    url = make_url(first, "pinning/pinFileToIPFS")
+    respx.post(url, headers={"Authorization": "Bearer first"}).respond(500)
+    respx.post(url, headers={"Authorization": "Bearer second"}).mock(
+        return_value=pinata_add()
+    )
+
+    with FailoverPinAPI([first, second], failures=1) as failover:
+        with Content(path) as content:
+            pin = failover.add(content)
+
+    # the accounts share a service, not a breaker
+    assert pin.cid == CID
+    assert failover.breakers[first.account].state == "open"
+    assert failover.breakers[second.account].state == "closed"
+
+    with pytest.raises(ValueError):
+        FailoverPinAPI([first, first])
+
+
+@respx.mock
+def test_failover(path: Path):
+    pinata, nft_storage = Pinata(), NFTStorage()
+    pinata_route, nft_storage_route = mock_providers(pinata, nft_storage)
+    pinata_route.mock(return_value=httpx.Response(500))
+    nft_storage_route.mock(return_value=httpx.Response(503))
+
+    with FailoverPinAPI([pinata, nft_storage], failures=2) as failover:
+        with Content(path) as content:
+            for _ in range(2):
+                with pytest.raises(ProvidersUnavailableError):
+                    failover.add(content)
+
+            # both breakers are open, the services are not even tried
+            with pytest.raises(ProvidersUnavailableError) as error:
+                failover.add(content)
+
+    assert error.value.errors == {}
+    assert pinata_route.call_count == 2
+    assert failover.breakers[pinata.account].state == "open"
+
+
+@respx.mock
+def test_failover_next_healthy(path: Path):
+    pinata, nft_storage = Pinata(), NFTStorage()
+    pinata_route, nft_storage_route = mock_providers(pinata, nft_storage)
+    pinata_route.mock(return_value=pinata_add())
+
+    with FailoverPinAPI([nft_storage, pinata], failures=1) as failover:
+        with Content(path) as content:
+            pin = failover.add(content)
+
+    # a malformed answer moves on, without counting as an outage
+    assert pin.cid == CID
+    assert nft_storage_route.call_count == 1
+    assert failover.breakers[nft_storage.account].state == "closed"
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_async_failover_timeout(path: Path):
+    async def slow(request):
+        await anyio.sleep(10)
+
+    pinata, nft_storage = AsyncPinata(), AsyncNFTStorage()
+    pinata_route, nft_storage_route = mock_providers(pinata, nft_storage)
+    pinata_route.mock(return_value=pinata_add())
+    nft_storage_route.mock(side_effect=slow)
+
+    async with AsyncFailoverPinAPI([nft_storage, pinata], failures=1) as failover:
+        async with AsyncContent(path) as content:
+            with anyio.fail_after(5):
+                pin = await failover.add(content, timeout=0.1)
+            pin = await failover.add(content, timeout=0.1)
+
+    # the slow service is given up, then skipped
+    assert pin.cid == CID
+    assert pinata_route.call_count == 2
+    assert failover.breakers[nft_storage.account].state == "open"
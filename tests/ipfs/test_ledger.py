@@ -0,0 +1,124 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from pinnacle.ipfs.ledger import PinLedger
+from pinnacle.ipfs.models import Pin
+
+CID = "bafkreifjjcie6lypi6ny7amxnfftagclbuxndqonfipmb64f2km2devei4"
+PROVIDER = "http://localhost"
+OTHER_PROVIDER = "https://api.pinata.cloud"
+
+
+@pytest.fixture
+def file(tmp_path: Path):
+    file = tmp_path / "hello.txt"
+    file.write_bytes(b"hello world\n")
+    return file
+
+
+@pytest.fixture
+def ledger():
+    with PinLedger() as ledger:
+        yield ledger
+
+
+@pytest.fixture
+def pin(file: Path):
+    return Pin(cid=CID, name=file.name)
+
+
+def test_lookup_unknown(ledger: PinLedger, file: Path):
+    assert ledger.lookup(file, PROVIDER) is None
+
+
+def test_lookup_missing_file(ledger: PinLedger, tmp_path: Path):
+    assert ledger.lookup(tmp_path / "missing", PROVIDER) is None
+
+
+def test_record_and_lookup(ledger: PinLedger, file: Path, pin: Pin):
+    ledger.record(file, PROVIDER, pin)
+
+    assert ledger.lookup(file, PROVIDER) == pin
+    assert ledger.lookup(file, OTHER_PROVIDER) is None
+    assert ledger.providers(file) == {PROVIDER: CID}
+
+
+def test_lookup_other_cid_version(ledger: PinLedger, file: Path, pin: Pin):
+    ledger.record(file, PROVIDER, pin, cid_version=1)
+
+    assert ledger.lookup(file, PROVIDER, cid_version=0) is None
+
+    pin_v0 = Pin(cid="QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o")
+    ledger.record(file, PROVIDER, pin_v0, cid_version=0)
+
+    assert ledger.lookup(file, PROVIDER, cid_version=0) == pin_v0
+    assert ledger.lookup(file, PROVIDER, cid_version=1) == pin
+
+
+def test_lookup_modified_file(ledger: PinLedger, file: Path, pin: Pin):
+    ledger.record(file, PROVIDER, pin)
+    file.write_bytes(b"hello pinnacle\n")
+
+    assert ledger.lookup(file, PROVIDER) is None
+
+
+def test_lookup_touched_file(ledger: PinLedger, file: Path, pin: Pin):
+    ledger.record(file, PROVIDER, pin)
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert ledger.lookup(file, PROVIDER) == pin
+
+
+def test_lookup_touched_file_without_hashing(file: Path, pin: Pin):
+    with PinLedger(hash_content=False) as ledger:
+        ledger.record(file, PROVIDER, pin)
+        stat = file.stat()
+        os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert ledger.lookup(file, PROVIDER) is None
+
+
+def test_record_modified_file_drops_stale_pins(ledger: PinLedger, file: Path, pin: Pin):
+    ledger.record(file, PROVIDER, pin)
+    file.write_bytes(b"hello pinnacle\n")
+    ledger.record(file, OTHER_PROVIDER, pin)
+
+    assert ledger.providers(file) == {OTHER_PROVIDER: CID}
+
+
+def test_forget(ledger: PinLedger, file: Path, pin: Pin):
+    ledger.record(file, PROVIDER, pin)
+    ledger.record(file, OTHER_PROVIDER, pin)
+
+    ledger.forget(file, PROVIDER)
+    assert ledger.providers(file) == {OTHER_PROVIDER: CID}
+
+    ledger.forget(file)
+    assert ledger.providers(file) == {}
+
+
+def test_ledger_persists(tmp_path: Path, file: Path, pin: Pin):
+    database = tmp_path / "ledger.db"
+
+    with PinLedger(database) as ledger:
+        ledger.record(file, PROVIDER, pin)
+
+    with PinLedger(database) as ledger:
+        assert ledger.lookup(file, PROVIDER) == pin
+
+
+def test_cids(ledger: PinLedger, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr("pinnacle.ipfs.ledger.CID_BATCH", 2)
+    cids = [f"{CID}{index}" for index in range(5)]
+    for index, cid in enumerate(reversed(cids)):
+        file = tmp_path / f"file-{index}.txt"
+        file.write_text(cid)
+        ledger.record(file, PROVIDER, Pin(cid=cid))
+        if index % 2:
+            ledger.record(file, OTHER_PROVIDER, Pin(cid=cid))
+
+    assert list(ledger.cids()) == cids
+    assert list(ledger.cids(OTHER_PROVIDER)) == [cids[1], cids[3]]
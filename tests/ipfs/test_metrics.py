@@ -0,0 +1,123 @@
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import pytest
+import respx
+
+from pinnacle.ipfs.api import AsyncPinata
+from pinnacle.ipfs.api import Pinata
+from pinnacle.ipfs.api.pinata import PinataAdd
+from pinnacle.ipfs.content import AsyncContent
+from pinnacle.ipfs.content import Content
+from pinnacle.ipfs.metrics import endpoint_label
+from pinnacle.ipfs.metrics import Histogram
+from pinnacle.ipfs.metrics import Metrics
+from tests.ipfs.api.conftest import CID
+from tests.ipfs.api.conftest import make_url
+
+ADD_ENDPOINT = "pinning/pinFileToIPFS"
+
+
+@pytest.fixture
+def metrics(monkeypatch) -> Metrics:
+    metrics = Metrics()
+    monkeypatch.setattr(Pinata.global_config, "metrics", metrics)
+    return metrics
+
+
+def pinata_add():
+    json = PinataAdd(IpfsHash=CID, PinSize=311, Timestamp=datetime.now()).json()
+    return httpx.Response(200, content=json)
+
+
+@pytest.mark.parametrize(
+    "endpoint, label",
+    (
+        ("pinning/pinFileToIPFS", "pinning/pinFileToIPFS"),
+        ("/add?cid-version=1", "add"),
+        (f"check/{CID}", "check/{id}"),
+    ),
+)
+def test_endpoint_label(endpoint, label):
+    assert endpoint_label(endpoint) == label
+
+
+def test_histogram():
+    histogram = Histogram((0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+
+
+@pytest.mark.parametrize("streaming", (False, True))
+@respx.mock
+def test_pin_api_metrics(metrics: Metrics, path: Path, streaming: bool):
+    with Pinata() as pinata:
+        route = respx.post(make_url(pinata, ADD_ENDPOINT))
+        route.side_effect = [httpx.Response(503), pinata_add()]
+        with Content(path, streaming=streaming) as content:
+            pinata.add(content)
+
+    (series,) = metrics.snapshot()
+    assert series["provider"] == pinata.provider
+    assert (series["method"], series["endpoint"]) == ("POST", ADD_ENDPOINT)
+    assert series["requests"] == 2
+    assert series["statuses"] == {503: 1, 200: 1}
+    assert series["retries"] == 1
+    assert series["bytes_sent"] == 2 * len(route.calls.last.request.content)
+    assert series["bytes_received"] == len(route.calls.last.response.content)
+
+
+@respx.mock
+def test_pin_api_error_metrics(metrics: Metrics, path: Path):
+    with Pinata() as pinata:
+        route = respx.post(make_url(pinata, ADD_ENDPOINT))
+        route.side_effect = httpx.ConnectError("refused")
+        with Content(path) as content, pytest.raises(httpx.ConnectError):
+            pinata.add(content)
+
+    (series,) = metrics.snapshot()
+    assert series["errors"] == {"ConnectError": 4}
+    assert series["retries"] == 3
+
+
+@respx.mock
+def test_metrics_disabled(monkeypatch, path: Path):
+    monkeypatch.setattr(Pinata.global_config, "metrics", None)
+    with Pinata() as pinata:
+        respx.post(make_url(pinata, ADD_ENDPOINT)).mock(return_value=pinata_add())
+        with Content(path) as content:
+            pinata.add(content)
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_async_pin_api_metrics(metrics: Metrics, path: Path):
+    async with AsyncPinata() as pinata:
+        respx.post(make_url(pinata, ADD_ENDPOINT)).mock(return_value=pinata_add())
+        async with AsyncContent(path, streaming=True) as content:
+            await pinata.add(content)
+
+    (series,) = metrics.snapshot()
+    assert series["statuses"] == {200: 1}
+    assert series["bytes_sent"] > 0
+
+
+@respx.mock
+def test_prometheus(metrics: Metrics, path: Path):
+    with Pinata() as pinata:
+        respx.post(make_url(pinata, ADD_ENDPOINT)).mock(return_value=pinata_add())
+        with Content(path) as content:
+            pinata.add(content)
+
+    text = metrics.prometheus()
+    labels = f'provider="{pinata.provider}",method="POST",endpoint="{ADD_ENDPOINT}"'
+    assert "# TYPE pinnacle_request_duration_seconds histogram" in text
+    assert f'pinnacle_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f'pinnacle_responses_total{{{labels},status="200"}} 1' in text
+    assert f"pinnacle_request_retries_total{{{labels}}} 0" in text
+    assert text.endswith("\n")
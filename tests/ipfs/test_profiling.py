@@ -0,0 +1,106 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import pytest
+import respx
+
+from pinnacle.ipfs.api import AsyncPinata
+from pinnacle.ipfs.api import Pinata
+from pinnacle.ipfs.api.pinata import PinataAdd
+from pinnacle.ipfs.content import AsyncContent
+from pinnacle.ipfs.content import Content
+from pinnacle.ipfs.profiling import percentile
+from pinnacle.ipfs.profiling import phase
+from pinnacle.ipfs.profiling import Profiler
+from tests.ipfs.api.conftest import CID
+from tests.ipfs.api.conftest import make_url
+
+PHASES = {"open", "encode", "network", "decode", "validate"}
+
+
+def mock_pinata(pinata):
+    json = PinataAdd(IpfsHash=CID, PinSize=311, Timestamp=datetime.now()).json()
+    route = respx.post(make_url(pinata, "pinning/pinFileToIPFS"))
+    return route.mock(return_value=httpx.Response(200, content=json))
+
+
+def test_percentile():
+    values = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 95) == pytest.approx(4.8)
+    assert percentile([1.0], 99) == 1.0
+
+
+def test_phase_unprofiled():
+    with phase("open"):
+        pass
+
+
+def test_profiler_calls():
+    profiler = Profiler()
+    content = object()
+    profiler.begin(content, "file")
+    with phase("open"):
+        pass
+    profiler.begin(content, "file")
+    profiler.end(content)
+    profiler.end(content)
+
+    (call,) = profiler.calls
+    assert set(call.phases) == {"open"}
+    assert call.total >= call.phases["open"]
+    assert profiler.summary()["total"]["count"] == 1
+
+
+@respx.mock
+def test_add_many_profiled(tmp_path: Path):
+    paths = []
+    for index in range(4):
+        paths.append(tmp_path / f"{index}.txt")
+        paths[-1].write_bytes(b"content" * index)
+
+    profiler = Profiler()
+    with Pinata(profiler=profiler) as pinata:
+        mock_pinata(pinata)
+        results = list(pinata.add_many(map(Content, paths), concurrency=2))
+
+    assert all(not isinstance(result, Exception) for _, result in results)
+    assert {call.name for call in profiler.calls} == {path.name for path in paths}
+    assert all(set(call.phases) == PHASES for call in profiler.calls)
+
+    summary = profiler.summary()
+    assert set(summary) == PHASES | {"total"}
+    assert summary["network"]["count"] == 4
+    assert summary["network"]["p50"] <= summary["network"]["p99"]
+
+    dumped = json.loads(profiler.json())
+    assert len(dumped["calls"]) == 4
+    assert dumped["summary"] == summary
+
+
+@respx.mock
+def test_add_profiled_without_open(path: Path):
+    profiler = Profiler()
+    with Pinata(profiler=profiler) as pinata:
+        mock_pinata(pinata)
+        with Content(path) as content:
+            pinata.add(content)
+
+    (call,) = profiler.calls
+    assert set(call.phases) == PHASES - {"open"}
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_async_add_many_profiled(path: Path):
+    profiler = Profiler()
+    async with AsyncPinata(profiler=profiler) as pinata:
+        mock_pinata(pinata)
+        async with pinata.add_many([AsyncContent(path)]) as results:
+            async for _ in results:
+                pass
+
+    (call,) = profiler.calls
+    assert set(call.phases) == PHASES
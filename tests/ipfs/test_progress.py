@@ -0,0 +1,108 @@
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import pytest
+import respx
+
+from pinnacle.ipfs.api import AsyncPinata
+from pinnacle.ipfs.api import Pinata
+from pinnacle.ipfs.api.pinata import PinataAdd
+from pinnacle.ipfs.content import AsyncContent
+from pinnacle.ipfs.content import Content
+from pinnacle.ipfs.progress import ProgressTracker
+from pinnacle.ipfs.progress import SLICE_SIZE
+from tests.ipfs.api.conftest import CID
+from tests.ipfs.api.conftest import make_url
+
+
+def mock_pinata(pinata):
+    json = PinataAdd(IpfsHash=CID, PinSize=311, Timestamp=datetime.now()).json()
+    route = respx.post(make_url(pinata, "pinning/pinFileToIPFS"))
+    return route.mock(return_value=httpx.Response(200, content=json))
+
+
+def test_tracker():
+    reported = []
+    tracker = ProgressTracker(lambda upload: reported.append(upload.sent))
+    upload = tracker.start("file", total=10)
+    upload.advance(4)
+    upload.advance(6)
+
+    assert reported == [4, 10]
+    assert tracker.sent == 10
+    assert tracker.active == [upload]
+    assert upload.eta == 0
+
+    upload.finish()
+    upload.finish()
+    assert tracker.active == []
+
+
+def test_stalled(monkeypatch):
+    tracker = ProgressTracker()
+    upload = tracker.start("file")
+
+    assert tracker.stalled(after=60) == []
+    monkeypatch.setattr(upload, "updated", upload.updated - 60)
+    assert tracker.stalled(after=60) == [upload]
+
+    upload.finish()
+    assert not upload.stalled(after=60)
+
+
+def test_track_slices():
+    tracker = ProgressTracker()
+    body = b"0" * (2 * SLICE_SIZE + 1)
+    request = httpx.Request("POST", "http://localhost", content=body)
+    upload = tracker.track(request, "body")
+
+    assert upload.total == len(body)
+    assert b"".join(request.stream) == body
+    assert upload.sent == len(body)
+    assert upload.done
+
+
+@pytest.mark.parametrize("streaming", (False, True))
+@respx.mock
+def test_pin_api_progress(path: Path, streaming: bool):
+    uploads = []
+    tracker = ProgressTracker(uploads.append)
+    with Pinata(progress=tracker) as pinata:
+        route = mock_pinata(pinata)
+        with Content(path, streaming=streaming) as content:
+            pinata.add(content)
+
+    body = route.calls.last.request.content
+    assert {upload.name for upload in uploads} == {path.name}
+    assert uploads[-1].sent == len(body)
+    assert tracker.sent == len(body)
+    assert tracker.throughput > 0
+    assert tracker.active == []
+
+
+@respx.mock
+def test_pin_api_no_body_untracked():
+    tracker = ProgressTracker()
+    with Pinata(progress=tracker) as pinata:
+        respx.get(make_url(pinata, "data/testAuthentication")).respond(200)
+        pinata._request("GET", "data/testAuthentication")
+
+    assert tracker.started is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("streaming", (False, True))
+@respx.mock
+async def test_async_pin_api_progress(path: Path, streaming: bool):
+    uploads = []
+    tracker = ProgressTracker(uploads.append)
+    async with AsyncPinata(progress=tracker) as pinata:
+        route = mock_pinata(pinata)
+        async with AsyncContent(path, streaming=streaming) as content:
+            await pinata.add(content)
+
+    body = route.calls.last.request.content
+    assert {upload.name for upload in uploads} == {path.name}
+    assert tracker.sent == len(body)
+    assert tracker.active == []
@@ -0,0 +1,135 @@
+import time
+
+import anyio
+import pytest
+import respx
+
+from pinnacle.ipfs.api import AsyncPinata
+from pinnacle.ipfs.api import Pinata
+from pinnacle.ipfs.api.pinata import PINATA_RATE_LIMIT
+from pinnacle.ipfs.config import BearerAuth
+from pinnacle.ipfs.config import Config
+from pinnacle.ipfs.ratelimit import RateLimit
+from pinnacle.ipfs.ratelimit import RateLimiter
+from pinnacle.ipfs.ratelimit import TokenBucket
+
+TEST_SERVICE = "http://localhost"
+
+
+@pytest.fixture
+def no_rate_limit():
+    """Limiters are enabled in this module"""
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(rate=10, capacity=2)
+    delays = [bucket._reserve() for _ in range(4)]
+
+    assert delays[:2] == [0, 0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_acquire():
+    bucket = TokenBucket(rate=50)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.monotonic() - start >= 0.1
+
+
+@pytest.mark.anyio
+async def test_token_bucket_aacquire():
+    bucket = TokenBucket(rate=50)
+    start = time.monotonic()
+    async with anyio.create_task_group() as tg:
+        for _ in range(6):
+            tg.start_soon(bucket.aacquire)
+
+    assert time.monotonic() - start >= 0.1
+
+
+@pytest.mark.parametrize(
+    "limit, rate, capacity",
+    (
+        (RateLimit(30, 10, burst=5), 3, 5),
+        (RateLimit(1), 1, 1),
+        (RateLimit(1, 3), 1 / 3, 1),
+        (RateLimit(10, 1, burst=10), 10, 10),
+    ),
+)
+def test_rate_limit_bucket(limit, rate, capacity):
+    bucket = limit.bucket()
+
+    assert bucket.rate == pytest.approx(rate)
+    assert bucket.capacity == capacity
+
+
+def test_rate_limit_one_request():
+    bucket = RateLimit(1, 0.1).bucket()
+    delays = [bucket._reserve() for _ in range(3)]
+
+    assert delays[0] == 0
+    assert delays[1] == pytest.approx(0.1, abs=0.01)
+    assert delays[2] == pytest.approx(0.2, abs=0.01)
+
+
+@pytest.mark.parametrize("burst", (0, 31))
+def test_rate_limit_invalid_burst(burst):
+    with pytest.raises(ValueError):
+        RateLimit(30, 10, burst=burst)
+
+
+def test_rate_limiter_budgets():
+    upload, read = RateLimit(30, 10), RateLimit(100, 10)
+    limiter = RateLimiter(upload, read)
+    config = Config(TEST_SERVICE)
+
+    assert limiter.bucket(config, "POST") is limiter.bucket(config, "PUT")
+    assert limiter.bucket(config, "GET") is limiter.bucket(config, "DELETE")
+    assert limiter.bucket(config, "POST") is not limiter.bucket(config, "GET")
+    assert RateLimiter(upload).bucket(config, "GET") is None
+
+
+def test_rate_limiter_shared_by_credentials():
+    limiter = RateLimiter(PINATA_RATE_LIMIT, PINATA_RATE_LIMIT)
+    config = Config(TEST_SERVICE, BearerAuth("token"))
+    same = Config(TEST_SERVICE, BearerAuth("token"))
+    other = Config(TEST_SERVICE, BearerAuth("other"))
+
+    bucket = limiter.bucket(config, "POST")
+
+    assert limiter.bucket(config, "GET") is bucket  # a single budget
+    assert RateLimiter(PINATA_RATE_LIMIT).bucket(same, "POST") is bucket
+    assert limiter.bucket(other, "POST") is not bucket
+
+
+@respx.mock
+def test_request_waits_on_limiter():
+    limiter = RateLimiter(upload=RateLimit(10, 1))
+    pinata = Pinata(Config(TEST_SERVICE, rate_limit=limiter))
+    route = respx.post(f"{TEST_SERVICE}/upload") % 200
+
+    start = time.monotonic()
+    for _ in range(3):
+        pinata._post("upload")
+
+    assert route.call_count == 3
+    assert time.monotonic() - start >= 0.18
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_async_request_waits_on_limiter():
+    limiter = RateLimiter(read=RateLimit(10, 1))
+    pinata = AsyncPinata(Config(TEST_SERVICE, rate_limit=limiter))
+    route = respx.get(f"{TEST_SERVICE}/data") % 200
+
+    start = time.monotonic()
+    async with anyio.create_task_group() as tg:
+        for _ in range(3):
+            tg.start_soon(pinata._get, "data")
+
+    assert route.call_count == 3
+    assert time.monotonic() - start >= 0.18
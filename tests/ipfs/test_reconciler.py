@@ -0,0 +1,239 @@
+import json
+from datetime import datetime
+from unittest import mock
+
+import httpx
+import pytest
+import respx
+
+from pinnacle.ipfs import PinLedger
+from pinnacle.ipfs.api import AsyncLocalPin
+from pinnacle.ipfs.api import AsyncPinata
+from pinnacle.ipfs.api import AsyncPinningServiceAPI
+from pinnacle.ipfs.api import LocalPin
+from pinnacle.ipfs.api import NFTStorage
+from pinnacle.ipfs.api import Pinata
+from pinnacle.ipfs.api import PinningServiceAPI
+from pinnacle.ipfs.api.pinata import PinataPin
+from pinnacle.ipfs.config import BearerAuth
+from pinnacle.ipfs.config import Config
+from pinnacle.ipfs.models import Pin
+from pinnacle.ipfs.reconciler import AsyncReconciler
+from pinnacle.ipfs.reconciler import diff
+from pinnacle.ipfs.reconciler import PinSet
+from pinnacle.ipfs.reconciler import Reconciler
+from tests.ipfs.api.conftest import CID
+from tests.ipfs.api.conftest import make_url
+from tests.ipfs.api.pinata.conftest import list_pins as list_pinata_pins
+from tests.ipfs.api.pinning_service.conftest import list_pins
+from tests.ipfs.api.pinning_service.conftest import pin_status
+from tests.ipfs.api.pinning_service.conftest import PINNING_SERVICE
+from tests.ipfs.api.pinning_service.conftest import status_response
+
+CIDS = [f"{CID}{index}" for index in range(4)]
+EXTRA = f"{CID}x"
+HELLO_WORLD_V0 = "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+HELLO_WORLD_V1 = "bafybeicg2rebjoofv4kbyovkw7af3rpiitvnl6i7ckcywaq6xjcxnc2mby"
+
+
+@pytest.fixture
+def config() -> Config:
+    return Config(PINNING_SERVICE, BearerAuth("token"))
+
+
+def test_diff():
+    pins = [("b", "request-1"), ("b", "request-2"), ("c", "c"), ("e", "e")]
+
+    assert list(diff(["a", "b", "d"], pins)) == [
+        ("missing", "a", "a"),
+        ("extra", "c", "c"),
+        ("missing", "d", "d"),
+        ("extra", "e", "e"),
+    ]
+    assert list(diff([], [])) == []
+
+
+def test_pin_set(monkeypatch):
+    monkeypatch.setattr("pinnacle.ipfs.reconciler.INSERT_BATCH", 2)
+    pins = [("c", "c"), ("a", "request-2"), ("b", "b"), ("a", "request-1")]
+
+    with PinSet([*pins, ("c", "c")]) as pin_set:
+        assert len(pin_set) == 4
+        assert list(pin_set) == sorted(pins)
+        assert list(pin_set.cids()) == ["a", "b", "c"]
+
+
+def test_unlistable_provider():
+    with pytest.raises(ValueError):
+        Reconciler([NFTStorage()])
+    with pytest.raises(ValueError):
+        Reconciler([])
+
+
+def test_duplicate_accounts(config: Config):
+    with pytest.raises(ValueError):
+        Reconciler([Pinata(), Pinata()])
+
+    other = Config(PINNING_SERVICE, BearerAuth("other"))
+    Reconciler([PinningServiceAPI(config), PinningServiceAPI(other)])
+
+
+def mock_providers(pinning_service, pinata, local_pin) -> dict[str, respx.Route]:
+    """
+    The Pinning Services API holds CIDS[:2] and EXTRA, Pinata holds every
+    CID and EXTRA, the local daemon holds CIDS[1:3].
+    """
+    statuses = [pin_status(index) for index in (0, 1, 9)]
+    for status, cid in zip(statuses, [*CIDS[:2], EXTRA]):
+        status.pin.cid = cid
+    respx.get(make_url(pinning_service, "pins")).mock(side_effect=list_pins(statuses))
+
+    rows = [
+        PinataPin(
+            id=cid, ipfs_pin_hash=cid, size=1, date_pinned=datetime(2023, 1, 1)
+        ).dict()
+        for cid in [*CIDS, EXTRA]
+    ]
+    respx.get(make_url(pinata, "data/pinList")).mock(side_effect=list_pinata_pins(rows))
+
+    lines = [json.dumps({"Cid": cid, "Type": "recursive"}) for cid in CIDS[1:3]]
+    respx.post(make_url(local_pin, "pin/ls")).respond(200, content="\n".join(lines))
+
+    def pinned(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"Pins": request.url.params.get_list("arg")})
+
+    return {
+        "add_pin": respx.post(make_url(pinning_service, "pins")).mock(
+            return_value=status_response(pin_status(10))
+        ),
+        "remove": respx.delete(make_url(pinning_service, "pins/request-9")).respond(
+            202
+        ),
+        "pin_by_hash": respx.post(make_url(pinata, "pinning/pinByHash")).respond(200),
+        "unpin": respx.delete(make_url(pinata, f"pinning/unpin/{EXTRA}")).respond(200),
+        "pin_add": respx.post(make_url(local_pin, "pin/add")).mock(side_effect=pinned),
+        "pin_rm": respx.post(make_url(local_pin, "pin/rm")).mock(side_effect=pinned),
+    }
+
+
+def pinned_cids(route: respx.Route) -> list[str]:
+    cids = []
+    for call in route.calls:
+        request = call.request
+        if "arg" in request.url.params:
+            cids.extend(request.url.params.get_list("arg"))
+        else:
+            cids.append(Pin.parse_raw(request.read()).cid)
+    return sorted(cids)
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_reconcile(patched, config: Config):
+    patched.return_value = True
+    pin_apis = [PinningServiceAPI(config), Pinata(), LocalPin()]
+    routes = mock_providers(*pin_apis)
+    pinning_service, pinata, local_pin = (api.account for api in pin_apis)
+
+    reconciler = Reconciler(pin_apis, concurrency=2)
+    diffs = reconciler.diff(CIDS)
+
+    assert list(diffs[pinning_service].missing.cids()) == CIDS[2:]
+    assert list(diffs[pinning_service].extra) == [(EXTRA, "request-9")]
+    assert len(diffs[pinata].missing) == 0
+    assert list(diffs[local_pin].missing.cids()) == [CIDS[0], CIDS[3]]
+    assert len(diffs[local_pin].extra) == 0
+
+    repairs = list(reconciler.repair(diffs))
+    for provider_diff in diffs.values():
+        provider_diff.close()
+
+    assert sorted(repairs) == [
+        (local_pin, "missing", CIDS[0], None),
+        (local_pin, "missing", CIDS[3], None),
+        (pinning_service, "missing", CIDS[2], None),
+        (pinning_service, "missing", CIDS[3], None),
+    ]
+    assert pinned_cids(routes["add_pin"]) == CIDS[2:]
+    assert pinned_cids(routes["pin_add"]) == [CIDS[0], CIDS[3]]
+    assert not routes["remove"].called and not routes["unpin"].called
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_reconcile_unpin_extra(patched, config: Config, tmp_path):
+    patched.return_value = True
+    pin_apis = [PinningServiceAPI(config), Pinata(), LocalPin()]
+    routes = mock_providers(*pin_apis)
+    pinning_service, pinata, _ = (api.account for api in pin_apis)
+
+    with PinLedger() as ledger:
+        for cid in CIDS:
+            file = tmp_path / cid
+            file.write_text(cid)
+            ledger.record(file, pinata, Pin(cid=cid))
+
+        repairs = list(Reconciler(pin_apis).reconcile(ledger, unpin_extra=True))
+
+    assert (pinning_service, "extra", EXTRA, None) in repairs
+    assert (pinata, "extra", EXTRA, None) in repairs
+    assert routes["remove"].called and routes["unpin"].called
+    assert not routes["pin_by_hash"].called and not routes["pin_rm"].called
+
+
+@respx.mock
+def test_reconcile_failed_listing(config: Config):
+    pinning_service = PinningServiceAPI(config)
+    respx.get(make_url(pinning_service, "pins")).respond(500)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        Reconciler([pinning_service]).diff(CIDS)
+
+
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.LocalPin.ipfs_daemon_active")
+def test_reconcile_cid_versions(patched):
+    patched.return_value = True
+    pinata, local_pin = Pinata(), LocalPin()
+    row = PinataPin(
+        id="1", ipfs_pin_hash=HELLO_WORLD_V1, size=1, date_pinned=datetime(2023, 1, 1)
+    )
+    respx.get(make_url(pinata, "data/pinList")).mock(
+        side_effect=list_pinata_pins([row.dict()])
+    )
+    line = json.dumps({"Cid": HELLO_WORLD_V0, "Type": "recursive"})
+    respx.post(make_url(local_pin, "pin/ls")).respond(200, content=line)
+    unpin = respx.delete(url__startswith=make_url(pinata, "pinning/unpin"))
+    pin_rm = respx.post(make_url(local_pin, "pin/rm"))
+
+    reconciler = Reconciler([pinata, local_pin])
+    repairs = list(reconciler.reconcile([HELLO_WORLD_V0], unpin_extra=True))
+
+    # the CIDv0 and CIDv1 of the same block are the same pin
+    assert repairs == []
+    assert not unpin.called and not pin_rm.called
+
+
+@pytest.mark.anyio
+@respx.mock
+@mock.patch("pinnacle.ipfs.api.local_pin.AsyncLocalPin.ipfs_daemon_active")
+async def test_async_reconcile(patched, config: Config):
+    patched.return_value = True
+    pin_apis = [AsyncPinningServiceAPI(config), AsyncPinata(), AsyncLocalPin()]
+    routes = mock_providers(*pin_apis)
+    pinning_service, pinata, local_pin = (api.account for api in pin_apis)
+
+    reconciler = AsyncReconciler(pin_apis, concurrency=2)
+    async with reconciler.reconcile(CIDS, unpin_extra=True) as reconciled:
+        repairs = [repair async for repair in reconciled]
+
+    assert sorted(repairs) == [
+        (local_pin, "missing", CIDS[0], None),
+        (local_pin, "missing", CIDS[3], None),
+        (pinata, "extra", EXTRA, None),
+        (pinning_service, "extra", EXTRA, None),
+        (pinning_service, "missing", CIDS[2], None),
+        (pinning_service, "missing", CIDS[3], None),
+    ]
+    assert pinned_cids(routes["add_pin"]) == CIDS[2:]
+    assert pinned_cids(routes["pin_add"]) == [CIDS[0], CIDS[3]]
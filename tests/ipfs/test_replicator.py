@@ -0,0 +1,106 @@
+from datetime import datetime
+from pathlib import Path
+
+import anyio
+import httpx
+import pytest
+import respx
+
+from pinnacle.constants import PINATA_SERVICE
+from pinnacle.ipfs import Replicator
+from pinnacle.ipfs.api import AsyncNFTStorage
+from pinnacle.ipfs.api import AsyncPinata
+from pinnacle.ipfs.api import AsyncWeb3Storage
+from pinnacle.ipfs.api.pinata import PinataAdd
+from pinnacle.ipfs.config import BearerAuth
+from pinnacle.ipfs.config import Config
+from pinnacle.ipfs.content import AsyncContent
+from pinnacle.ipfs.content import AsyncMappedContent
+from pinnacle.ipfs.models import Pin
+from pinnacle.ipfs.replicator import UnsharedContentError
+from tests.ipfs.api.conftest import CID
+from tests.ipfs.api.conftest import make_url
+
+
+@pytest.fixture
+def pin_apis():
+    return [AsyncPinata(), AsyncNFTStorage(), AsyncWeb3Storage()]
+
+
+def mock_providers(pinata, nft_storage, web3_storage):
+    pinata_add = PinataAdd(IpfsHash=CID, PinSize=311, Timestamp=datetime.now())
+    respx.post(make_url(pinata, "pinning/pinFileToIPFS")).mock(
+        return_value=httpx.Response(200, content=pinata_add.json())
+    )
+    respx.post(make_url(web3_storage, "upload")).mock(
+        return_value=httpx.Response(200, json={"cid": CID, "carCid": CID})
+    )
+    return respx.post(make_url(nft_storage, "upload"))
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_replicate(pin_apis, path: Path):
+    route = mock_providers(*pin_apis)
+    route.mock(return_value=httpx.Response(500))
+
+    content = AsyncMappedContent(path)
+    async with Replicator(pin_apis) as replicator:
+        results = await replicator.replicate(content)
+
+    pinata, nft_storage, web3_storage = (api.account for api in pin_apis)
+
+    assert isinstance(results[pinata], Pin)
+    assert isinstance(results[web3_storage], Pin)
+    assert isinstance(results[nft_storage], httpx.HTTPStatusError)
+    assert content.cids == {api.provider: CID for api in (pin_apis[0], pin_apis[2])}
+    assert content.closed
+    # providers share their clients, left open for the next pins
+    assert not any(api.api_client.is_closed for api in pin_apis)
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_replicate_slow_provider(pin_apis, path: Path):
+    async def slow(request):
+        await anyio.sleep(10)
+
+    mock_providers(*pin_apis).mock(side_effect=slow)
+
+    async with Replicator(pin_apis) as replicator, AsyncContent(path) as content:
+        with anyio.fail_after(5):
+            results = await replicator.replicate(content, timeout=0.1)
+
+    assert isinstance(results[pin_apis[1].account], TimeoutError)
+    assert len(content.cids) == 2
+
+
+@pytest.mark.anyio
+async def test_replicate_streamed_content(pin_apis, path: Path):
+    with pytest.raises(UnsharedContentError):
+        await Replicator(pin_apis).replicate(AsyncContent(path, streaming=True))
+
+    with pytest.raises(ValueError):
+        Replicator([])
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_replicate_accounts(path: Path):
+    pin_apis = [
+        AsyncPinata(Config(PINATA_SERVICE, BearerAuth(token)))
+        for token in ("first", "second")
+    ]
+    pinata_add = PinataAdd(IpfsHash=CID, PinSize=311, Timestamp=datetime.now())
+    respx.post(make_url(pin_apis[0], "pinning/pinFileToIPFS")).mock(
+        return_value=httpx.Response(200, content=pinata_add.json())
+    )
+
+    async with Replicator(pin_apis) as replicator:
+        results = await replicator.replicate(AsyncMappedContent(path))
+
+    assert set(results) == {api.account for api in pin_apis}
+    assert all(isinstance(result, Pin) for result in results.values())
+
+    with pytest.raises(ValueError):
+        Replicator([pin_apis[0], pin_apis[0]])
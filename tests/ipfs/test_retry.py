@@ -0,0 +1,89 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from pinnacle.ipfs.retry import parse_retry_after
+from pinnacle.ipfs.retry import replayable
+from pinnacle.ipfs.retry import RetryPolicy
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(backoff=1, max_backoff=4)
+
+
+def test_parse_retry_after():
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert parse_retry_after("12") == 12
+    assert parse_retry_after("-1") == 0
+    assert 25 < parse_retry_after(format_datetime(later)) <= 30
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_replayable():
+    assert replayable(b"bytes")
+    assert replayable([b"a", b"b"])
+    assert not replayable(iter([b"a", b"b"]))
+
+
+@pytest.mark.parametrize(
+    ("status_code", "idempotent", "expected"),
+    (
+        (500, True, True),
+        (500, False, False),
+        (503, False, True),
+        (429, False, True),
+        (404, True, False),
+    ),
+)
+def test_retryable_status(policy, status_code, idempotent, expected):
+    response = httpx.Response(status_code)
+
+    assert policy.retryable(0, idempotent, response) is expected
+
+
+def test_retryable_per_status(policy):
+    assert policy.retryable(1, True, httpx.Response(500))
+    assert not policy.retryable(2, True, httpx.Response(500))
+    assert not policy.retryable(3, True, httpx.Response(429))  # capped by retries
+
+
+def test_retryable_error(policy):
+    assert policy.retryable(0, False, error=httpx.ConnectError("refused"))
+    assert not policy.retryable(0, False, error=httpx.ReadTimeout("timeout"))
+    assert policy.retryable(0, True, error=httpx.ReadTimeout("timeout"))
+
+
+def test_delay_full_jitter(policy):
+    delays = [policy.delay(attempt) for attempt in range(8) for _ in range(20)]
+
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert max(delays) > 1
+
+
+def test_delay_retry_after(policy):
+    response = httpx.Response(429, headers={"Retry-After": "7"})
+
+    assert policy.delay(0, response) == 7
+    assert policy.replace(respect_retry_after=False).delay(0, response) <= 1
+
+
+def test_total_time_cap(policy):
+    response = httpx.Response(503, headers={"Retry-After": "60"})
+
+    assert policy.start(True).next_delay(response) == 60
+    assert policy.replace(total=30).start(True).next_delay(response) is None
+
+
+def test_replace(policy):
+    other = policy.replace(retries=0)
+
+    assert other.retries == 0
+    assert policy.retries == 3
+    assert other.max_backoff == policy.max_backoff
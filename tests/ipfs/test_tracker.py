@@ -0,0 +1,242 @@
+import time
+from datetime import datetime
+
+import anyio
+import httpx
+import pytest
+import respx
+
+from pinnacle.ipfs.api import AsyncNFTStorage
+from pinnacle.ipfs.api import AsyncPinningServiceAPI
+from pinnacle.ipfs.api import NFTStorage
+from pinnacle.ipfs.api import PinningServiceAPI
+from pinnacle.ipfs.api.nft_storage import NFTCheck
+from pinnacle.ipfs.api.nft_storage import NFTCheckPin
+from pinnacle.ipfs.api.nft_storage import NFTStorageCheck
+from pinnacle.ipfs.config import BearerAuth
+from pinnacle.ipfs.config import Config
+from pinnacle.ipfs.models import PinResults
+from pinnacle.ipfs.models import PinStatus
+from pinnacle.ipfs.models import Status
+from pinnacle.ipfs.tracker import AsyncStatusTracker
+from pinnacle.ipfs.tracker import BaseStatusTracker
+from pinnacle.ipfs.tracker import StatusTracker
+from tests.ipfs.api.conftest import CID
+from tests.ipfs.api.conftest import make_url
+from tests.ipfs.api.pinning_service.conftest import pin_status
+from tests.ipfs.api.pinning_service.conftest import PINNING_SERVICE
+
+FAST = dict(interval=0.01, max_interval=0.05)
+
+
+class Service:
+    """Pins of a Pinning Services API, listed with the spec's filters"""
+
+    def __init__(self, count: int, distinct: bool = False) -> None:
+        self.pins = {index: pin_status(index, Status.queued) for index in range(count)}
+        if distinct:
+            for index, pin in self.pins.items():
+                pin.pin.cid = f"{CID}{index}"
+
+    def set(self, status: Status) -> None:
+        for pin in self.pins.values():
+            pin.status = status
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        pins = sorted(self.pins.values(), key=lambda pin: pin.created, reverse=True)
+        statuses = params.get("status", "pinned").split(",")
+        pins = [pin for pin in pins if pin.status in statuses]
+        if "cid" in params:
+            pins = [pin for pin in pins if pin.pin.cid in params["cid"].split(",")]
+        if "after" in params:
+            after = datetime.fromisoformat(params["after"])
+            pins = [pin for pin in pins if pin.created > after]
+
+        results = PinResults(count=len(pins), results=pins[: int(params["limit"])])
+        return httpx.Response(200, content=results.json())
+
+
+def nft_check(status: Status) -> httpx.Response:
+    check = NFTCheck(cid=CID, pin=NFTCheckPin(cid=CID, status=status))
+    return httpx.Response(200, content=NFTStorageCheck(ok=True, value=check).json())
+
+
+@pytest.fixture
+def config() -> Config:
+    return Config(PINNING_SERVICE, BearerAuth("token"))
+
+
+def test_back_off(config: Config):
+    tracker = BaseStatusTracker(
+        PinningServiceAPI(config), interval=1, max_interval=3, backoff=2
+    )
+    tracked = tracker._new(pin_status(0, Status.queued))
+    tracker._add(tracked)
+    intervals = []
+    for _ in range(3):
+        tracked.due = 0
+        tracker._back_off([tracked])
+        intervals.append(tracked.interval)
+
+    assert intervals == [2, 3, 3]
+    tracker._update(tracked.key, Status.pinning, pin_status(0, Status.pinning))
+    assert tracked.interval == 1
+
+
+def test_list_params(config: Config):
+    tracker = BaseStatusTracker(PinningServiceAPI(config))
+    due = [tracker._new(pin) for pin in Service(25, distinct=True).pins.values()]
+
+    listings = list(tracker._list_params(due))
+
+    assert [len(params["cid"]) for params in listings] == [10, 10, 5]
+    assert set().union(*(params["cid"] for params in listings)) == {
+        tracked.cid for tracked in due
+    }
+
+
+@respx.mock
+def test_status_tracker_lists_due_cids(config: Config):
+    service = Service(25, distinct=True)
+    with PinningServiceAPI(config) as api:
+        route = respx.get(make_url(api, "pins"))
+        route.side_effect = service
+        # not started, polled by hand
+        tracker = StatusTracker(api)
+        futures = [tracker.track(pin) for pin in service.pins.values()]
+
+        service.set(Status.pinned)
+        service.pins[0].status = Status.queued
+        for tracked in tracker._pending.values():
+            tracked.due = 0
+        tracker._poll()
+
+        # one listing per ten pending pins, none of the pinned ones listed again
+        assert route.call_count == 3
+        assert all(future.done() for future in futures[1:])
+
+        route.reset()
+        tracker._pending["request-0"].due = 0
+        tracker._poll()
+
+        assert route.call_count == 1
+        assert route.calls[0].request.url.params["cid"] == f"{CID}0"
+        tracker.stop()
+
+    assert futures[0].cancelled()
+
+
+@respx.mock
+def test_status_tracker(config: Config):
+    service = Service(25)
+    with PinningServiceAPI(config) as api, StatusTracker(api, **FAST) as tracker:
+        route = respx.get(make_url(api, "pins"))
+        route.side_effect = service
+        futures = [tracker.track(pin) for pin in service.pins.values()]
+
+        time.sleep(0.05)
+        assert not any(future.done() for future in futures)
+        service.set(Status.pinned)
+        results = [future.result(timeout=5) for future in futures]
+
+    assert all(isinstance(result, PinStatus) for result in results)
+    assert {result.status for result in results} == {Status.pinned}
+    assert tracker.pending == 0
+    # one listing per poll, not one request per pin
+    assert route.call_count < len(futures)
+
+
+@respx.mock
+def test_status_tracker_already_pinned(config: Config):
+    pinned = pin_status(0)
+    with StatusTracker(PinningServiceAPI(config)) as tracker:
+        assert tracker.track(pinned).result(timeout=0) == pinned
+
+
+@respx.mock
+def test_status_tracker_stop_cancels(config: Config):
+    with PinningServiceAPI(config) as api, StatusTracker(api, **FAST) as tracker:
+        respx.get(make_url(api, "pins")).side_effect = Service(1)
+        future = tracker.track(pin_status(0, Status.queued))
+
+    assert future.cancelled()
+
+
+def test_status_tracker_rejects_cid(config: Config):
+    tracker = BaseStatusTracker(PinningServiceAPI(config))
+
+    with pytest.raises(ValueError):
+        tracker._new(CID)
+
+
+@respx.mock
+def test_status_tracker_unexpected_error(config: Config):
+    with PinningServiceAPI(config) as api, StatusTracker(api, **FAST) as tracker:
+        respx.get(make_url(api, "pins")).respond(200, content=b"not json")
+        future = tracker.track(pin_status(0, Status.queued))
+
+        assert isinstance(future.exception(timeout=5), ValueError)
+        # the tracker keeps polling the pins tracked next
+        service = Service(1)
+        service.set(Status.pinned)
+        respx.get(make_url(api, "pins")).side_effect = service
+        assert tracker.track(pin_status(0, Status.queued)).result(timeout=5)
+
+
+@respx.mock
+def test_status_tracker_nft_storage():
+    with NFTStorage() as api, StatusTracker(api, **FAST) as tracker:
+        route = respx.get(make_url(api, f"check/{CID}"))
+        route.side_effect = [
+            httpx.Response(500),
+            nft_check(Status.queued),
+            nft_check(Status.pinned),
+        ]
+        result = tracker.track(CID).result(timeout=5)
+
+    assert isinstance(result, NFTCheck)
+    assert result.pin.status == Status.pinned
+    assert route.call_count == 3
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_async_status_tracker(config: Config):
+    service = Service(25)
+    async with AsyncPinningServiceAPI(config) as api:
+        route = respx.get(make_url(api, "pins"))
+        route.side_effect = service
+        async with AsyncStatusTracker(api, **FAST) as tracker:
+            tracked = [tracker.track(pin) for pin in service.pins.values()]
+            await anyio.sleep(0.05)
+            service.set(Status.failed)
+            with anyio.fail_after(5):
+                results = [await pin.wait() for pin in tracked]
+
+    assert {result.status for result in results} == {Status.failed}
+    assert route.call_count < len(tracked)
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_async_status_tracker_nft_storage():
+    async with AsyncNFTStorage() as api:
+        route = respx.get(make_url(api, f"check/{CID}"))
+        route.side_effect = [nft_check(Status.pinning), nft_check(Status.pinned)]
+        async with AsyncStatusTracker(api, **FAST) as tracker:
+            with anyio.fail_after(5):
+                result = await tracker.track(CID).wait()
+
+    assert result.pin.status == Status.pinned
+
+
+@pytest.mark.anyio
+@respx.mock
+async def test_async_status_tracker_unexpected_error(config: Config):
+    async with AsyncPinningServiceAPI(config) as api:
+        respx.get(make_url(api, "pins")).respond(200, content=b"not json")
+        async with AsyncStatusTracker(api, **FAST) as tracker:
+            tracked = tracker.track(pin_status(0, Status.queued))
+            with anyio.fail_after(5), pytest.raises(ValueError):
+                await tracked.wait()